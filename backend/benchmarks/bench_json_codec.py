@@ -0,0 +1,81 @@
+"""
+Micro-benchmark du codec JSON de samsungtvws (orjson si disponible, sinon json).
+
+Compare json (stdlib) et lib.samsungtvws.codec sur les trames les plus fréquentes :
+- select_image envoyé à chaque changement d'image du diaporama (double encodage)
+- réponse get_content_list d'une bibliothèque de 500 images (double décodage)
+- événement d2d_service_message court (image_selected)
+
+Usage : python backend/benchmarks/bench_json_codec.py [--number N]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+sys.path[:0] = [str(SRC_DIR), str(SRC_DIR / 'lib')]
+
+from lib.samsungtvws import codec  # noqa: E402
+
+
+def _content_list_frame(size: int) -> str:
+    content_list = [
+        {
+            "content_id": f"MY_F{i:04d}",
+            "category_id": "MY-C0002",
+            "width": "3840",
+            "height": "2160",
+            "matte_id": "shadowbox_polar",
+            "portrait_matte_id": "flexible_black",
+            "image_date": f"2024:05:{i % 28 + 1:02d} 12:00:00",
+            "content_type": "mobile",
+        }
+        for i in range(size)
+    ]
+    data = {"event": "get_content_list", "request_id": "b2a5", "content_list": json.dumps(content_list)}
+    return json.dumps({"event": "d2d_service_message", "data": json.dumps(data)})
+
+
+def _select_image(dumps):
+    data = {"request": "select_image", "category_id": None, "content_id": "MY_F0042", "show": True, "id": "b2a5", "request_id": "b2a5"}
+    return dumps({"method": "ms.channel.emit", "params": {"event": "art_app_request", "to": "host", "data": dumps(data)}})
+
+
+def _decode_frame(loads, frame):
+    response = loads(frame)
+    data = loads(response["data"])
+    return loads(data["content_list"]) if "content_list" in data else data
+
+
+CASES = {
+    "select_image (encode)": lambda impl, _: _select_image(impl.dumps),
+    "content_list x500 (decode)": lambda impl, frames: _decode_frame(impl.loads, frames["content_list"]),
+    "image_selected (decode)": lambda impl, frames: _decode_frame(impl.loads, frames["event"]),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    frames = {
+        "content_list": _content_list_frame(500),
+        "event": json.dumps({"event": "d2d_service_message", "data": json.dumps(
+            {"event": "image_selected", "content_id": "MY_F0042", "is_shown": "Yes", "request_id": "b2a5"})}),
+    }
+    print(f"backend codec : {codec.BACKEND}")
+    print(f"{'cas':<30}{'json (µs)':>12}{'codec (µs)':>12}{'gain':>8}")
+    for name, case in CASES.items():
+        number = args.number if 'x500' not in name else max(args.number // 20, 1)
+        results = []
+        for impl in (json, codec):
+            best = min(timeit.repeat(lambda: case(impl, frames), number=number, repeat=5))
+            results.append(best / number * 1e6)
+        print(f"{name:<30}{results[0]:>12.2f}{results[1]:>12.2f}{results[0] / results[1]:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
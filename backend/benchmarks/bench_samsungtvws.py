@@ -0,0 +1,183 @@
+"""
+Micro-benchmarks des chemins CPU de samsungtvws, comparés à une référence enregistrée.
+
+Cas mesurés :
+- SamsungTVCommand.get_payload (touche télécommande, requête art_app_request)
+- helper.process_api_response sur une trame get_content_list de 500 images
+- SamsungTVAsyncArt.process_event (événement avec callback, réponse à une requête en attente)
+- FlightRecorder.record (coût de l'enregistrement de chaque trame)
+- SamsungTVEncryptedSession.encrypt_command, Padding.pad / Padding.unpad
+- transformations de clés de l'authentificateur chiffré (AES par blocs, SamyGO)
+
+La référence (baselines/bench_samsungtvws.json) est propre à une machine : la régénérer avec
+--save sur la machine de comparaison avant une optimisation, puis relancer après.
+--check TOLERANCE renvoie un code d'erreur si un cas est plus lent que la référence
+de plus de TOLERANCE (ex. 0.2 pour 20 %).
+
+Usage : python backend/benchmarks/bench_samsungtvws.py [--number N] [--save] [--check 0.2]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / 'src'
+sys.path[:0] = [str(SRC_DIR), str(SRC_DIR / 'lib')]
+
+from lib.samsungtvws import codec, helper  # noqa: E402
+from lib.samsungtvws.async_art import ArtChannelEmitCommand, SamsungTVAsyncArt  # noqa: E402
+from lib.samsungtvws.encrypted import authenticator  # noqa: E402
+from lib.samsungtvws.encrypted.remote import SendRemoteKey as EncryptedSendRemoteKey  # noqa: E402
+from lib.samsungtvws.encrypted.session import Padding, SamsungTVEncryptedSession  # noqa: E402
+from lib.samsungtvws.event import D2D_SERVICE_MESSAGE_EVENT  # noqa: E402
+from lib.samsungtvws.flight_recorder import IN, FlightRecorder  # noqa: E402
+from lib.samsungtvws.remote import SendRemoteKey  # noqa: E402
+
+BASELINE_FILE = BENCHMARKS_DIR / 'baselines' / 'bench_samsungtvws.json'
+
+
+def _content_list_frame(size: int) -> str:
+    content_list = [
+        {
+            "content_id": f"MY_F{i:04d}",
+            "category_id": "MY-C0002",
+            "width": "3840",
+            "height": "2160",
+            "matte_id": "shadowbox_polar",
+            "portrait_matte_id": "flexible_black",
+            "image_date": f"2024:05:{i % 28 + 1:02d} 12:00:00",
+            "content_type": "mobile",
+        }
+        for i in range(size)
+    ]
+    data = {"event": "get_content_list", "request_id": "b2a5", "content_list": json.dumps(content_list)}
+    return json.dumps({"event": "d2d_service_message", "data": json.dumps(data)})
+
+
+def _d2d_response(**data) -> dict:
+    return {"event": D2D_SERVICE_MESSAGE_EVENT, "data": json.dumps(data)}
+
+
+def _art_connection(loop) -> SamsungTVAsyncArt:
+    '''Instance sans connexion : le constructeur interroge la TV (get_token)'''
+    art = SamsungTVAsyncArt.__new__(SamsungTVAsyncArt)
+    art.art_mode = None
+    art.callbacks = {"image_selected": lambda event, response: None}
+    art.pending_requests = {}
+    return art
+
+
+def _run_sync(coroutine):
+    '''process_event n'attend rien : la coroutine se termine au premier send'''
+    try:
+        coroutine.send(None)
+    except StopIteration:
+        pass
+
+
+def _samy_go_available() -> bool:
+    try:
+        import py3rijndael  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_cases() -> dict:
+    loop = asyncio.new_event_loop()
+    art = _art_connection(loop)
+    content_list = _content_list_frame(500)
+    selected = _d2d_response(event="image_selected", content_id="MY_F0042", is_shown="Yes")
+    artmode = _d2d_response(event="artmode_status", value="on", request_id="b2a5", id="b2a5")
+    art_request = {"request": "select_image", "category_id": None, "content_id": "MY_F0042", "show": True,
+                   "id": "b2a5", "request_id": "b2a5"}
+    session = SamsungTVEncryptedSession("3e9b0b5b6b5cd8a8aa1e5e1f1b1a2f4c", "7")
+    volume_up = EncryptedSendRemoteKey.click("KEY_VOLUP")
+    padded = Padding.pad(volume_up.get_payload()).encode()
+    parameter_data = bytes(range(128))
+    recorder = FlightRecorder()
+
+    def process_response():
+        art.pending_requests["b2a5"] = loop.create_future()
+        _run_sync(art.process_event(D2D_SERVICE_MESSAGE_EVENT, artmode))
+
+    cases = {
+        "get_payload (remote key)": lambda: SendRemoteKey.click("KEY_VOLUP").get_payload(),
+        "get_payload (art request)": lambda: ArtChannelEmitCommand.art_app_request(dict(art_request)).get_payload(),
+        "process_api_response (content_list x500)": lambda: helper.process_api_response(content_list),
+        "process_event (event + callback)": lambda: _run_sync(art.process_event(D2D_SERVICE_MESSAGE_EVENT, selected)),
+        "process_event (pending response)": process_response,
+        "FlightRecorder.record (large frame)": lambda: recorder.record(IN, content_list),
+        "encrypt_command": lambda: session.encrypt_command(volume_up),
+        "Padding.pad": lambda: Padding.pad('{"method": "POST", "body": {"plugin": "RemoteControl"}}'),
+        "Padding.unpad": lambda: Padding.unpad(padded),
+        "authenticator AES encrypt (128 B)": lambda: authenticator._encrypt_parameter_data_with_aes(parameter_data),
+        "authenticator AES decrypt (128 B)": lambda: authenticator._decrypt_parameter_data_with_aes(parameter_data),
+    }
+    if _samy_go_available():
+        cases["authenticator SamyGO transform"] = lambda: authenticator._apply_samy_go_key_transform(parameter_data[:16])
+    return cases
+
+
+def measure(cases: dict, number: int) -> dict:
+    results = {}
+    for name, case in cases.items():
+        # les cas lents (liste de 500 images, transformation SamyGO) sont répétés moins souvent
+        calls = max(number // 50, 1) if 'x500' in name or 'SamyGO' in name else number
+        best = min(timeit.repeat(case, number=calls, repeat=5))
+        results[name] = round(best / calls * 1e6, 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--number', type=int, default=5000)
+    parser.add_argument('--save', action='store_true', help="enregistre le résultat comme référence")
+    parser.add_argument('--check', type=float, metavar='TOLERANCE', help="échoue si un cas régresse au-delà")
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    args = parser.parse_args()
+
+    results = measure(build_cases(), args.number)
+    baseline = {}
+    if Path(args.baseline).exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+
+    print(f"backend codec : {codec.BACKEND}")
+    print(f"{'cas':<44}{'µs':>10}{'référence':>12}{'écart':>9}")
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if reference:
+            change = value / reference - 1
+            print(f"{name:<44}{value:>10.2f}{reference:>12.2f}{change * 100:>+8.0f}%")
+            if args.check is not None and change > args.check:
+                regressions.append(name)
+        else:
+            print(f"{name:<44}{value:>10.2f}{'-':>12}{'-':>9}")
+    if not _samy_go_available():
+        print("authenticator SamyGO transform : ignoré (py3rijndael absent)")
+
+    if args.save:
+        Path(args.baseline).parent.mkdir(exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "processor": platform.processor() or platform.machine(), "codec": codec.BACKEND},
+                "number": args.number,
+                "unit": "µs par appel (meilleure de 5 répétitions)",
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"référence écrite dans {args.baseline}")
+    if regressions:
+        print(f"régressions au-delà de {args.check:.0%} : {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
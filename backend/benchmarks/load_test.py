@@ -0,0 +1,259 @@
+"""
+Test de charge de bout en bout de l'API Quart contre des TVs simulées.
+
+L'application (main.app) tourne dans ce processus et reçoit ses requêtes par le client
+de test Quart ; les TVs sont celles de tools/tv_simulator.py, dans un thread dédié.
+Des clients concurrents tirent au sort leurs requêtes selon le mélange demandé :
+- status : GET /api/v1/tv/<ip>
+- power : PUT /api/v1/tv/<ip>/power?action=toggle (appui long de 3s sur KEY_POWER)
+- list : GET /api/v1/tv/<ip>/art-images?limit=50
+- thumbnail : GET /api/v1/tv/<ip>/art-images/<id>/thumbnail
+- thumbnails : GET /api/v1/tv/<ip>/art-images/thumbnails?ids=... (NDJSON, 20 ids)
+- upload : POST /api/v1/tv/<ip>/upload
+
+Résultat JSON : débit et latences p50/p95/p99/max par route, erreurs, retard de la boucle
+d'événements, configuration et compteurs des TVs simulées. --compare affiche l'écart avec
+un résultat précédent.
+
+Usage : python backend/benchmarks/load_test.py --tvs 4 --clients 32 --duration 30 --output load.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = BACKEND_DIR / 'src'
+sys.path[:0] = [str(SRC_DIR), str(SRC_DIR / 'lib'), str(BACKEND_DIR / 'tools')]
+
+from tv_simulator import TVFleet  # noqa: E402
+
+DEFAULT_MIX = "status=40,list=20,thumbnail=20,thumbnails=5,upload=5,power=2"
+LAG_INTERVAL = 0.05
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in WORKLOADS:
+            raise ValueError(f"Charge inconnue : {name} ({', '.join(WORKLOADS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: list, rank: float) -> float:
+    """Percentile au rang le plus proche, values triées."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(rank / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def summarize(values: list, elapsed: float) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "throughput": round(len(values) / elapsed, 2) if elapsed else 0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0,
+    }
+
+
+# Charges : chacune renvoie (code HTTP, octets reçus)
+async def _status(client, tv, rng, options):
+    response = await client.get(f"/api/v1/tv/{tv['ip']}")
+    return response.status_code, len(await response.get_data())
+
+
+async def _power(client, tv, rng, options):
+    response = await client.put(f"/api/v1/tv/{tv['ip']}/power", query_string={"action": "toggle"})
+    return response.status_code, len(await response.get_data())
+
+
+async def _list(client, tv, rng, options):
+    response = await client.get(f"/api/v1/tv/{tv['ip']}/art-images", query_string={"limit": 50, "category": "all"})
+    return response.status_code, len(await response.get_data())
+
+
+async def _thumbnail(client, tv, rng, options):
+    content_id = rng.choice(tv['content_ids'])
+    response = await client.get(f"/api/v1/tv/{tv['ip']}/art-images/{content_id}/thumbnail")
+    return response.status_code, len(await response.get_data())
+
+
+async def _thumbnails(client, tv, rng, options):
+    content_ids = rng.sample(tv['content_ids'], min(20, len(tv['content_ids'])))
+    response = await client.get(f"/api/v1/tv/{tv['ip']}/art-images/thumbnails", query_string={"ids": ",".join(content_ids)})
+    return response.status_code, len(await response.get_data())
+
+
+async def _upload(client, tv, rng, options):
+    from werkzeug.datastructures import FileStorage
+    image = FileStorage(io.BytesIO(options['upload_data']), filename="load_test.jpg", content_type="image/jpeg")
+    response = await client.post(f"/api/v1/tv/{tv['ip']}/upload", files={"file": image})
+    return response.status_code, len(await response.get_data())
+
+
+WORKLOADS = {
+    "status": _status,
+    "power": _power,
+    "list": _list,
+    "thumbnail": _thumbnail,
+    "thumbnails": _thumbnails,
+    "upload": _upload,
+}
+
+
+async def _monitor_loop_lag(samples: list, stop: asyncio.Event):
+    """Retard des réveils d'une tâche qui dort LAG_INTERVAL : mesure le blocage de la boucle."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, time.perf_counter() - start - LAG_INTERVAL))
+
+
+async def _client(index, client, tvs, mix, deadline, results, options):
+    rng = random.Random(options['seed'] + index)
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        tv = rng.choice(tvs)
+        start = time.perf_counter()
+        try:
+            status, size = await WORKLOADS[name](client, tv, rng, options)
+            error = None if status < 400 else f"HTTP {status}"
+        except Exception as e:
+            size, error = 0, f"{type(e).__name__}: {e}"
+        entry = results.setdefault(name, {"latencies": [], "errors": {}, "bytes": 0})
+        entry["latencies"].append(time.perf_counter() - start)
+        entry["bytes"] += size
+        if error:
+            entry["errors"][error] = entry["errors"].get(error, 0) + 1
+
+
+async def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    fleet = TVFleet(
+        args.tvs, first_host=args.first_host, latency=args.latency, jitter=args.jitter,
+        bandwidth=args.bandwidth_kbps * 1024, library_size=args.library_size,
+    ).start_in_thread()
+    tvs = [{"ip": tv.host, "content_ids": list(tv.library)} for tv in fleet.tvs]
+    options = {"seed": args.seed, "upload_data": b"\xff\xd8" + os.urandom(args.upload_kb * 1024) + b"\xff\xd9"}
+
+    from main import app
+    results, lag_samples = {}, []
+    try:
+        async with app.test_app() as test_app:
+            client = test_app.test_client()
+            # Connexion et chargement des catalogues hors mesure
+            warmup = time.perf_counter()
+            for tv in tvs:
+                await _status(client, tv, None, options)
+                await _list(client, tv, None, options)
+            warmup = time.perf_counter() - warmup
+
+            stop = asyncio.Event()
+            monitor = asyncio.create_task(_monitor_loop_lag(lag_samples, stop))
+            start = time.monotonic()
+            deadline = start + args.duration
+            await asyncio.gather(*(
+                _client(index, client, tvs, mix, deadline, results, options) for index in range(args.clients)
+            ))
+            elapsed = time.monotonic() - start
+            stop.set()
+            await monitor
+    finally:
+        fleet.stop_thread()
+
+    routes = {}
+    for name, entry in sorted(results.items()):
+        routes[name] = summarize(entry["latencies"], elapsed)
+        routes[name]["errors"] = sum(entry["errors"].values())
+        routes[name]["error_details"] = entry["errors"]
+        routes[name]["bytes"] = entry["bytes"]
+    all_latencies = [latency for entry in results.values() for latency in entry["latencies"]]
+    lag = sorted(lag_samples)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {
+            "tvs": args.tvs, "clients": args.clients, "duration": args.duration, "mix": mix,
+            "latency": args.latency, "jitter": args.jitter, "bandwidth_kbps": args.bandwidth_kbps,
+            "library_size": args.library_size, "upload_kb": args.upload_kb, "seed": args.seed,
+        },
+        "warmup_s": round(warmup, 3),
+        "elapsed_s": round(elapsed, 3),
+        "total": dict(summarize(all_latencies, elapsed), errors=sum(route["errors"] for route in routes.values())),
+        "routes": routes,
+        "event_loop_lag": {
+            "samples": len(lag),
+            "p50_ms": round(percentile(lag, 50) * 1000, 2),
+            "p95_ms": round(percentile(lag, 95) * 1000, 2),
+            "p99_ms": round(percentile(lag, 99) * 1000, 2),
+            "max_ms": round(lag[-1] * 1000, 2) if lag else 0,
+        },
+        "simulator": fleet.get_stats(),
+    }
+
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"{'route':<12}{'req':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'err':>6}")
+    rows = dict(report["routes"], total=report["total"])
+    for name, route in rows.items():
+        line = (f"{name:<12}{route['count']:>7}{route['throughput']:>9.1f}{route['p50_ms']:>10.1f}"
+                f"{route['p95_ms']:>10.1f}{route['p99_ms']:>10.1f}{route['max_ms']:>10.1f}{route['errors']:>6}")
+        previous = None
+        if baseline:
+            previous = baseline["total"] if name == "total" else baseline["routes"].get(name)
+        if previous and previous.get("p95_ms"):
+            line += f"  p95 {(route['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%"
+        print(line)
+    lag = report["event_loop_lag"]
+    print(f"retard de la boucle : p50 {lag['p50_ms']} ms, p95 {lag['p95_ms']} ms, p99 {lag['p99_ms']} ms, max {lag['max_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tvs', type=int, default=4, help="nombre de TVs simulées")
+    parser.add_argument('--clients', type=int, default=16, help="clients concurrents")
+    parser.add_argument('--duration', type=float, default=20, help="durée de la mesure (s)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="poids des charges, ex. status=40,list=20")
+    parser.add_argument('--first-host', default="127.0.0.2")
+    parser.add_argument('--latency', type=float, default=0.02, help="latence des TVs simulées (s)")
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--bandwidth-kbps', type=int, default=8192, help="débit d2d des TVs simulées (Ko/s)")
+    parser.add_argument('--library-size', type=int, default=300)
+    parser.add_argument('--upload-kb', type=int, default=512)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="fichier JSON du résultat")
+    parser.add_argument('--compare', help="résultat JSON précédent à comparer")
+    args = parser.parse_args()
+
+    # Avant l'import de l'application : journaux réduits, cache de miniatures jetable
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('THUMBNAIL_CACHE_DIR', tempfile.mkdtemp(prefix='load_test_thumbnails_'))
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"résultat écrit dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
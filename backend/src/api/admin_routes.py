@@ -0,0 +1,140 @@
+import hmac
+import logging
+import math
+import os
+from functools import wraps
+
+from quart import Blueprint, Response, jsonify, request
+from quart_cors import route_cors
+
+from api.tv_routes import tv_service
+from services.loop_monitor import loop_monitor
+from services.metrics import metrics
+from services.profiler import ProfilerBusy, profiler
+from services.tracing import tracer
+
+admin_bp = Blueprint('admin', __name__)
+logger = logging.getLogger('AdminRoutes')
+
+
+def require_admin(func):
+    """
+    Réservé aux appels portant l'en-tête X-Admin-Token égal à ADMIN_TOKEN.
+    Sans ADMIN_TOKEN configuré, les routes d'administration sont désactivées.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        expected = os.environ.get('ADMIN_TOKEN')
+        if not expected:
+            return jsonify({"success": False, "error": "Administration désactivée (ADMIN_TOKEN non défini)"}), 404
+        provided = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            logger.warning("Accès d'administration refusé pour %s", request.remote_addr)
+            return jsonify({"success": False, "error": "Jeton d'administration invalide"}), 403
+        return await func(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/api/v1/admin/event-loop', methods=['GET'])
+@route_cors(allow_origin="*")
+@require_admin
+async def get_event_loop_stats():
+    """Retard de la boucle d'événements et appels bloquants détectés (triés par durée cumulée)."""
+    return jsonify({"success": True, "data": loop_monitor.get_stats()})
+
+
+@admin_bp.route('/api/v1/admin/event-loop', methods=['DELETE'])
+@route_cors(allow_origin="*")
+@require_admin
+async def reset_event_loop_stats():
+    loop_monitor.reset()
+    return jsonify({"success": True})
+
+
+@admin_bp.route('/api/v1/admin/art-requests', methods=['GET'])
+@route_cors(allow_origin="*")
+@require_admin
+async def get_art_request_stats():
+    """
+    Aller-retour et issues des requêtes du canal Art par type, avec les timeouts configurés
+    (ART_REQUEST_TIMEOUTS) et le nombre de requêtes en attente par TV.
+    """
+    return jsonify({
+        "success": True,
+        "data": {
+            "requests": metrics.art_request_summary(),
+            "timeouts": tv_service.art_request_timeouts,
+            "pending": {labels[0]: value for labels, value in metrics.art_pending_requests.values.items()},
+        }
+    })
+
+
+@admin_bp.route('/api/v1/admin/traces', methods=['GET'])
+@route_cors(allow_origin="*")
+@require_admin
+async def list_traces():
+    """Dernières traces terminées, de la plus récente à la plus ancienne. Query: limit (50)"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({"success": False, "error": "limit doit être un entier"}), 400
+    return jsonify({"success": True, "traces": tracer.get_traces(limit)})
+
+
+@admin_bp.route('/api/v1/admin/traces/<trace_id>', methods=['GET'])
+@route_cors(allow_origin="*")
+@require_admin
+async def get_trace(trace_id):
+    """Cascade des spans d'une trace (routes, appels aux TVs, erreurs)."""
+    waterfall = tracer.get_waterfall(trace_id)
+    if waterfall is None:
+        return jsonify({"success": False, "error": "Trace introuvable (expirée ou inconnue)"}), 404
+    return jsonify({"success": True, "trace": waterfall})
+
+
+@admin_bp.route('/api/v1/admin/tv/<ip_address>/frames', methods=['GET'])
+@route_cors(allow_origin="*")
+@require_admin
+async def get_tv_frames(ip_address):
+    """
+    Enregistreur de vol : dernières trames websocket (remote et art) de la TV, jetons masqués,
+    et derniers timeouts du canal art avec les trames qui les précédaient. Query: limit
+    """
+    tv_control = tv_service.tv_controls.get(ip_address)
+    if tv_control is None:
+        return jsonify({"success": False, "error": f"Aucune connexion à la TV {ip_address}"}), 404
+    return jsonify({"success": True, "data": tv_control.get_frames(request.args.get('limit', type=int))})
+
+
+@admin_bp.route('/api/v1/admin/profile', methods=['GET'])
+@route_cors(allow_origin="*")
+@require_admin
+async def get_profile():
+    """
+    Profil par échantillonnage du processus pendant `duration` secondes (plafonné par PROFILER_MAX_DURATION).
+    Query: duration (s, 10), interval_ms (10), mode (wall|cpu), format (collapsed|json).
+    Le format replié se donne tel quel à flamegraph.pl ou speedscope.
+    """
+    try:
+        duration = float(request.args.get('duration', 10))
+        interval = float(request.args.get('interval_ms', 10)) / 1000
+        if not (math.isfinite(duration) and math.isfinite(interval)):
+            raise ValueError()
+    except ValueError:
+        return jsonify({"success": False, "error": "duration et interval_ms doivent être des nombres finis"}), 400
+    output = request.args.get('format', 'collapsed')
+    if output not in ('collapsed', 'json'):
+        return jsonify({"success": False, "error": f"Format inconnu : {output} (collapsed, json)"}), 400
+    try:
+        profile = await profiler.profile(duration, interval, request.args.get('mode', 'wall'))
+    except ProfilerBusy:
+        return jsonify({"success": False, "error": "Un profil est déjà en cours"}), 409
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if output == 'json':
+        return jsonify({"success": True, "data": profile})
+    return Response(profiler.collapsed(profile), mimetype='text/plain', headers={
+        "Cache-Control": "no-store",
+        "X-Profile-Samples": str(profile["samples"]),
+        "X-Profile-Overhead": str(profile["overhead"]),
+    })
@@ -1,14 +1,54 @@
-from quart import Blueprint, jsonify, request
+from quart import Blueprint, Response, g, jsonify, request
 from services.tv_service import TVService
+from services.art_catalog import SORT_KEYS, decode_cursor
+from services.event_bus import event_bus, format_sse
+from services.logging_service import log_perf
+from services.tracing import tracer
 import time
 import os
+import json
+import base64
 import logging
 from quart_cors import cors, route_cors
 
 
 tv_bp = Blueprint('tv', __name__)
+logger = logging.getLogger('TVRoutes')
+# Un content_id supprimé puis réutilisé changera d'ETag : revalidation après une journée
+THUMBNAIL_CACHE_CONTROL = "private, max-age=86400"
+MAX_STREAMED_THUMBNAILS = 500
+# Commentaire SSE envoyé sans événement : garde la connexion ouverte à travers les proxys
+EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))
 tv_service = TVService()
 
+@tv_bp.before_request
+async def start_request_trace():
+    # Une trace par requête : X-Request-ID (ou traceparent W3C) repris s'il est fourni
+    route = request.url_rule.rule if request.url_rule else request.path
+    g.trace = tracer.start_trace(
+        f"{request.method} {route}",
+        request_id=request.headers.get('X-Request-ID'),
+        traceparent=request.headers.get('traceparent'),
+        **{"http.method": request.method, "http.route": route, "tv": (request.view_args or {}).get('ip_address', '')}
+    )
+
+@tv_bp.after_request
+async def tag_request_trace(response):
+    span = g.get('trace')
+    if span is not None:
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_error(f"HTTP {response.status_code}")
+        response.headers['X-Request-ID'] = span.attributes["request.id"]
+        response.headers['traceparent'] = span.traceparent
+    return response
+
+@tv_bp.teardown_request
+async def end_request_trace(exception):
+    span = g.pop('trace', None)
+    if span is not None:
+        tracer.end_trace(span, exception)
+
 @tv_bp.route('/api/v1/tv/<ip_address>', methods=['GET'])
 @route_cors(allow_origin="*")
 async def get_tv_info(ip_address):
@@ -37,8 +77,7 @@ async def power_control(ip_address):
     await tv_service.stop_custom_slideshow(ip_address)
     
     result = await tv_service.power_control(ip_address, action)
-    duration = time.time() - start
-    print(f"[PERF] power_control({ip_address}, action={action}) : {duration:.3f}s")
+    log_perf(logger, "power_control", start, tv=ip_address, action=action)
     return jsonify(result)
 
 @tv_bp.route('/api/v1/tv/<ip_address>/art-mode', methods=['PUT'])
@@ -56,8 +95,7 @@ async def set_art_mode(ip_address):
     await tv_service.stop_custom_slideshow(ip_address)
     
     result = await tv_service.set_art_mode(ip_address, action)
-    duration = time.time() - start
-    print(f"[PERF] set_art_mode({ip_address}, action={action}) : {duration:.3f}s")
+    log_perf(logger, "set_art_mode", start, tv=ip_address, action=action)
     return jsonify(result)
 
 @tv_bp.route('/api/v1/tv/<ip_address>/upload', methods=['POST'])
@@ -75,24 +113,132 @@ async def upload_photo(ip_address):
     # Arrêter le diaporama avant de télécharger une nouvelle image
     await tv_service.stop_custom_slideshow(ip_address)
     
-    result = await tv_service.upload_photo(ip_address, file_bytes, file_type, matte, portrait_matte)
+    result = await tv_service.upload_photo(ip_address, file_bytes, file_type, matte, portrait_matte, file.filename)
     if not result.get("success"):
         return jsonify(result), 500
     return jsonify(result)
 
-@tv_bp.route('/api/v1/tv/<ip_address>/upload-folder', methods=['POST'])
+@tv_bp.route('/api/v1/tv/<ip_address>/upload-queue', methods=['GET'])
 @route_cors(allow_origin="*")
-async def upload_folder(ip_address):
+async def get_upload_queue(ip_address):
+    return jsonify(tv_service.get_upload_queue_status(ip_address))
+
+@tv_bp.route('/api/v1/tv/<ip_address>/connection', methods=['GET'])
+@route_cors(allow_origin="*")
+async def get_connection(ip_address):
+    """
+    Journal des connexions de la TV (ouvertures, fermetures, reconnexions, échecs par canal)
+    et état actuel de ses canaux. Query: limit (nombre d'événements, les plus récents d'abord)
+    """
+    limit = request.args.get('limit', type=int)
+    return jsonify({"success": True, "data": tv_service.get_connection_status(ip_address, limit)})
+
+def _event_stream(ip_addresses, tv=None):
+    """
+    Flux text/event-stream : un événement snapshot par TV (état connu) puis les événements
+    state, content et connection au fil de l'eau. Les TVs sont suivies tant que le flux est ouvert.
+    """
+    last_event_id = request.headers.get('Last-Event-ID')
+
+    async def generate():
+        # Abonnement pris au démarrage du flux : si la requête est abandonnée avant,
+        # il n'y a rien à libérer
+        subscription = event_bus.subscribe(tv, last_event_id)
+        watched = []
+        try:
+            for ip_address in ip_addresses:
+                tv_service.watch(ip_address)
+                watched.append(ip_address)
+            yield "retry: 3000\n\n"
+            for ip_address in ip_addresses:
+                yield f"event: snapshot\ndata: {json.dumps(dict(event_bus.get_state(ip_address), tv=ip_address))}\n\n"
+            while True:
+                event = await subscription.get(EVENTS_HEARTBEAT)
+                yield format_sse(event) if event else ": ping\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+            for ip_address in watched:
+                tv_service.unwatch(ip_address)
+
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+    response.timeout = None  # flux sans fin
+    return response
+
+@tv_bp.route('/api/v1/tv/<ip_address>/events', methods=['GET'])
+@route_cors(allow_origin="*")
+async def tv_events(ip_address):
+    """Événements de la TV (Server-Sent Events) : remplace l'interrogation périodique de GET /api/v1/tv/<ip>."""
+    return _event_stream([ip_address], ip_address)
+
+@tv_bp.route('/api/v1/tvs/events', methods=['GET'])
+@route_cors(allow_origin="*")
+async def fleet_events():
+    """Événements de toutes les TVs configurées (Server-Sent Events)."""
+    ip_addresses = [tv["ip"] for tv in tv_service.config_service.get_tvs() if tv.get("ip")]
+    return _event_stream(ip_addresses)
+
+@tv_bp.route('/api/v1/tv/<ip_address>/thumbnails/status', methods=['GET'])
+@route_cors(allow_origin="*")
+async def get_thumbnail_status(ip_address):
+    return jsonify(tv_service.get_thumbnail_status(ip_address))
+
+def _get_image_folder_settings():
+    """
+    Lit TV_IMAGE_FOLDER et TV_IMAGE_EXTENSIONS.
+    Retourne (dossier, extensions, None) ou (None, None, message_erreur)
+    """
     folder_path = os.environ.get('TV_IMAGE_FOLDER')
     extensions_env = os.environ.get('TV_IMAGE_EXTENSIONS')
     if not folder_path:
-        return jsonify({"success": False, "error": "La variable d'environnement TV_IMAGE_FOLDER n'est pas définie."}), 400
+        return None, None, "La variable d'environnement TV_IMAGE_FOLDER n'est pas définie."
     if not extensions_env:
-        return jsonify({"success": False, "error": "La variable d'environnement TV_IMAGE_EXTENSIONS n'est pas définie."}), 400
+        return None, None, "La variable d'environnement TV_IMAGE_EXTENSIONS n'est pas définie."
     extensions = tuple(f'.{ext.strip().lower()}' for ext in extensions_env.split(','))
     if not os.path.isdir(folder_path):
-        return jsonify({"success": False, "error": f"Dossier introuvable : {folder_path}"}), 400
-    logger = logging.getLogger("upload-folder")
+        return None, None, f"Dossier introuvable : {folder_path}"
+    return folder_path, extensions, None
+
+@tv_bp.route('/api/v1/tvs/upload', methods=['POST'])
+@route_cors(allow_origin="*")
+async def broadcast_upload():
+    start = time.time()
+    files = await request.files
+    if 'file' not in files:
+        return jsonify({"success": False, "error": "Aucun fichier reçu"}), 400
+    form = await request.form
+    ips = request.args.get('ips') or form.get('ips', '')
+    ip_addresses = [ip.strip() for ip in ips.split(',') if ip.strip()]
+    if not ip_addresses:
+        # Par défaut, toutes les TVs configurées
+        ip_addresses = [tv["ip"] for tv in tv_service.config_service.get_tvs()]
+    if not ip_addresses:
+        return jsonify({"success": False, "error": "Aucune TV cible"}), 400
+    try:
+        max_concurrency = int(request.args.get('max_concurrency', 5))
+    except ValueError:
+        max_concurrency = 0
+    if max_concurrency < 1:
+        return jsonify({"success": False, "error": "max_concurrency doit être un entier positif"}), 400
+
+    file = files['file']
+    file_bytes = file.read()
+    file_type = file.filename.split('.')[-1]
+    matte = request.args.get('matte', '')
+    portrait_matte = request.args.get('portrait_matte', '')
+
+    result = await tv_service.broadcast_upload(
+        ip_addresses, file_bytes, file_type, matte, portrait_matte, max_concurrency
+    )
+    log_perf(logger, "broadcast_upload", start, tvs=len(ip_addresses))
+    return jsonify(result)
+
+@tv_bp.route('/api/v1/tv/<ip_address>/upload-folder', methods=['POST'])
+@route_cors(allow_origin="*")
+async def upload_folder(ip_address):
+    folder_path, extensions, error = _get_image_folder_settings()
+    if error:
+        return jsonify({"success": False, "error": error}), 400
     results = []
     
     # Arrêter le diaporama avant de télécharger un dossier d'images
@@ -100,11 +246,10 @@ async def upload_folder(ip_address):
     
     for filename in os.listdir(folder_path):
         if filename.lower().endswith(extensions):
-            with open(os.path.join(folder_path, filename), 'rb') as f:
-                file_bytes = f.read()
+            # Le fichier est transmis par son chemin : il n'est pas chargé en mémoire
             file_type = filename.split('.')[-1]
-            result = await tv_service.upload_photo(ip_address, file_bytes, file_type)
-            logger.info(f"[UPLOAD DEBUG] Fichier: {filename} | Résultat: {result}")
+            result = await tv_service.upload_photo(ip_address, os.path.join(folder_path, filename), file_type)
+            logger.debug("[UPLOAD DEBUG] Fichier: %s | Résultat: %s", filename, result)
             results.append({
                 "filename": filename,
                 "success": result.get("success", False),
@@ -114,37 +259,165 @@ async def upload_folder(ip_address):
             })
     return jsonify(results)
 
+@tv_bp.route('/api/v1/tv/<ip_address>/sync', methods=['POST'])
+@route_cors(allow_origin="*")
+async def sync_folder(ip_address):
+    start = time.time()
+    folder_path, extensions, error = _get_image_folder_settings()
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+
+    # Arrêter le diaporama avant de synchroniser le dossier
+    await tv_service.stop_custom_slideshow(ip_address)
+
+    result = await tv_service.sync_folder(ip_address, folder_path, extensions)
+    log_perf(logger, "sync_folder", start, tv=ip_address)
+    return jsonify(result)
+
+@tv_bp.route('/api/v1/tv/<ip_address>/sync', methods=['GET'])
+@route_cors(allow_origin="*")
+async def get_sync_status(ip_address):
+    return jsonify(tv_service.get_folder_sync_status(ip_address))
+
+@tv_bp.route('/api/v1/tv/<ip_address>/sync/watch', methods=['PUT'])
+@route_cors(allow_origin="*")
+async def watch_folder(ip_address):
+    action = request.args.get('action', 'start')
+    if action not in ['start', 'stop']:
+        return jsonify({
+            "success": False,
+            "error": f"Action '{action}' non supportée. Utilisez 'start' ou 'stop'"
+        }), 400
+    folder_path, extensions, error = _get_image_folder_settings()
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+    result = await tv_service.watch_folder(ip_address, folder_path, extensions, action == 'start')
+    return jsonify({"success": True, "data": result})
+
 @tv_bp.route('/api/v1/tv/<ip_address>/art-images', methods=['GET'])
 @route_cors(allow_origin="*")
 async def list_art_images(ip_address):
+    """
+    Liste paginée des images.
+    Paramètres : limit (1-500, défaut 100), cursor, sort (image_date|content_id),
+    order (asc|desc), category (défaut MY-C0002, 'all' pour toutes), favourite (true|false),
+    since / until (préfixe de date 'AAAA:MM:JJ'), fields (liste séparée par des virgules)
+    """
     start = time.time()
-    result = await tv_service.list_art_images(ip_address)
-    duration = time.time() - start
-    print(f"[PERF] list_art_images({ip_address}) : {duration:.3f}s")
+    args = request.args
+    try:
+        limit = int(args.get('limit', 100))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= 500:
+        return jsonify({"success": False, "error": "limit doit être un entier entre 1 et 500"}), 400
+    sort = args.get('sort', 'image_date')
+    if sort not in SORT_KEYS:
+        return jsonify({"success": False, "error": f"Tri '{sort}' non supporté. Utilisez {', '.join(SORT_KEYS)}"}), 400
+    order = args.get('order', 'desc')
+    if order not in ['asc', 'desc']:
+        return jsonify({"success": False, "error": "order doit valoir 'asc' ou 'desc'"}), 400
+    favourite = args.get('favourite')
+    if favourite not in [None, 'true', 'false']:
+        return jsonify({"success": False, "error": "favourite doit valoir 'true' ou 'false'"}), 400
+    category = args.get('category', 'MY-C0002')
+    fields = args.get('fields')
+    cursor = args.get('cursor')
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"success": False, "error": "Curseur invalide"}), 400
+
+    result = await tv_service.query_art_images(
+        ip_address,
+        category=None if category == 'all' else category,
+        sort=sort,
+        descending=order == 'desc',
+        cursor=cursor,
+        limit=limit,
+        favourite=None if favourite is None else favourite == 'true',
+        since=args.get('since'),
+        until=args.get('until'),
+        fields=[field.strip() for field in fields.split(',') if field.strip()] if fields else None
+    )
+    log_perf(logger, "list_art_images", start, tv=ip_address)
     if not result.get("success"):
         return jsonify(result), 500
     return jsonify(result)
 
+@tv_bp.route('/api/v1/tv/<ip_address>/art-images/thumbnails', methods=['GET'])
+@route_cors(allow_origin="*")
+async def stream_thumbnails(ip_address):
+    """
+    Diffuse les miniatures demandées (?ids=id1,id2,...) en NDJSON, une ligne par
+    miniature dès sa réception depuis la TV :
+    {"content_id", "content_type", "etag", "data" (base64)}
+    La dernière ligne récapitule : {"done": true, "count", "missing"}.
+    """
+    content_ids = list(dict.fromkeys(filter(None, request.args.get('ids', '').split(','))))
+    if not content_ids:
+        return jsonify({"success": False, "error": "Paramètre ids manquant"}), 400
+    if len(content_ids) > MAX_STREAMED_THUMBNAILS:
+        return jsonify({"success": False, "error": f"Au plus {MAX_STREAMED_THUMBNAILS} miniatures par requête"}), 400
+
+    async def generate():
+        start = time.time()
+        remaining = set(content_ids)
+        async for content_id, thumbnail in tv_service.iter_thumbnails(ip_address, content_ids):
+            remaining.discard(content_id)
+            yield json.dumps({
+                "content_id": content_id,
+                "content_type": thumbnail.content_type,
+                "etag": thumbnail.etag,
+                "data": base64.b64encode(thumbnail.data).decode()
+            }).encode() + b"\n"
+        yield json.dumps({"done": True, "count": len(content_ids) - len(remaining), "missing": sorted(remaining)}).encode() + b"\n"
+        log_perf(logger, "stream_thumbnails", start, tv=ip_address, thumbnails=len(content_ids))
+
+    return Response(generate(), mimetype='application/x-ndjson', headers={"Cache-Control": "no-store"})
+
+@tv_bp.route('/api/v1/tv/<ip_address>/art-images/<content_id>/thumbnail', methods=['GET'])
+@route_cors(allow_origin="*")
+async def get_thumbnail(ip_address, content_id):
+    start = time.time()
+    thumbnail = await tv_service.get_thumbnail(ip_address, content_id)
+    log_perf(logger, "get_thumbnail", start, tv=ip_address)
+    if thumbnail is None:
+        return jsonify({"success": False, "error": f"Miniature introuvable pour {content_id}"}), 404
+    headers = {"ETag": thumbnail.etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    if thumbnail.etag in request.headers.get('If-None-Match', ''):
+        return Response(status=304, headers=headers)
+    return Response(thumbnail.data, mimetype=thumbnail.content_type, headers=headers)
+
 @tv_bp.route('/api/v1/tv/<ip_address>/art-images', methods=['DELETE'])
 @route_cors(allow_origin="*")
 async def delete_art_images(ip_address):
-    data = await request.get_json(force=True)
-    content_ids = data.get('content_ids') if data else None
-    # Si content_ids est vide ou absent, on supprime toutes les images
-    if not content_ids:
-        # On récupère d'abord la liste complète
-        images_result = await tv_service.list_art_images(ip_address)
-        if not images_result.get('success'):
-            return jsonify(images_result), 500
-        content_ids = [img['content_id'] for img in images_result['images']]
+    data = await request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Corps JSON invalide"}), 400
+    # Supprimer toute la bibliothèque doit être demandé explicitement : {"all": true}
+    delete_all = data.get('all') is True
+    content_ids = data.get('content_ids')
+    if isinstance(content_ids, str):
+        content_ids = [content_ids]
+    if not delete_all and (not isinstance(content_ids, list) or not content_ids
+                           or not all(isinstance(content_id, str) for content_id in content_ids)):
+        return jsonify({
+            "success": False,
+            "error": "content_ids doit être une liste non vide d'identifiants (ou {\"all\": true} pour tout supprimer)"
+        }), 400
     
     # Arrêter le diaporama avant de supprimer des images
     await tv_service.stop_custom_slideshow(ip_address)
     
-    result = await tv_service.delete_art_images(ip_address, content_ids)
-    if not result.get('success'):
-        return jsonify(result), 500
-    return jsonify(result)
+    result = await tv_service.delete_art_images(ip_address, None if delete_all else content_ids, delete_all)
+    if "results" in result:
+        if result["success"]:
+            return jsonify(result), 200
+        # Succès partiel : le détail par image est renvoyé avec un 207 ; rien de supprimé : erreur
+        return jsonify(result), 207 if result["deleted"] else 500
+    return jsonify(result), 500
 
 @tv_bp.route('/api/v1/tvs', methods=['GET'])
 @route_cors(allow_origin="*")
@@ -176,8 +449,7 @@ async def custom_slideshow(ip_address):
         }), 400
     
     result = await tv_service.custom_slideshow(ip_address, duration_seconds, shuffle, category)
-    execution_time = time.time() - start
-    print(f"[PERF] custom_slideshow({ip_address}, duration={duration_seconds}, shuffle={shuffle}, category={category}) : {execution_time:.3f}s")
+    log_perf(logger, "custom_slideshow", start, tv=ip_address)
     return jsonify(result)
 
 @tv_bp.route('/api/v1/tv/<ip_address>/art-images/custom-slideshow/stop', methods=['PUT'])
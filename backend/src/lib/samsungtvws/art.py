@@ -10,7 +10,6 @@ SPDX-License-Identifier: LGPL-3.0
 
 from datetime import datetime
 import os
-import json
 import logging
 import random
 import socket
@@ -19,7 +18,7 @@ import uuid
 
 import websocket
 
-from . import exceptions, helper
+from . import codec, exceptions, helper
 from .command import SamsungTVCommand
 from .connection import SamsungTVWSConnection
 from .event import D2D_SERVICE_MESSAGE_EVENT, MS_CHANNEL_READY_EVENT
@@ -41,7 +40,7 @@ class ArtChannelEmitCommand(SamsungTVCommand):
             {
                 "event": "art_app_request",
                 "to": "host",
-                "data": json.dumps(data),
+                "data": codec.dumps(data),
             }
         )
 
@@ -99,7 +98,7 @@ class SamsungTVArt(SamsungTVWSConnection):
             self._websocket_event(event, response)
             _LOGGING.debug('event: {}'.format(event))
             if event == D2D_SERVICE_MESSAGE_EVENT:
-                return json.loads(response["data"])
+                return codec.loads(response["data"])
         except websocket.WebSocketTimeoutException as e:
             raise exceptions.TimeoutError('Websocket Time out: {}'.format(e))
         return {}
@@ -113,7 +112,7 @@ class SamsungTVArt(SamsungTVWSConnection):
                 _LOGGING.debug('sub_event: {}, wait_for_event: {}'.format(sub_event, wait_for_event))
                 if sub_event == "error":
                     raise exceptions.ResponseError(
-                        f"{json.loads(data['request_data'])['request']} request failed "
+                        f"{codec.loads(data['request_data'])['request']} request failed "
                         f"with error number {data['error_code']}"
                     )
                 # Check sub event, return if found or not defined
@@ -167,7 +166,7 @@ class SamsungTVArt(SamsungTVWSConnection):
             {"request": "get_content_list", "category": category}
         )
         assert data
-        return [ v for v in json.loads(data["content_list"]) if v['category_id'] == category] if category else json.loads(data["content_list"])
+        return [ v for v in codec.loads(data["content_list"]) if v['category_id'] == category] if category else codec.loads(data["content_list"])
 
     def get_current(self):
         data = self._send_art_request(
@@ -196,7 +195,7 @@ class SamsungTVArt(SamsungTVWSConnection):
         )
         assert data
         if 'data' in data.keys():
-            data = json.loads(data["data"])
+            data = codec.loads(data["data"])
             return next(iter(item for item in data if item['item'] == setting), data)
         return data
 
@@ -288,7 +287,7 @@ class SamsungTVArt(SamsungTVWSConnection):
             }
         )
         assert data
-        conn_info = json.loads(data["conn_info"])
+        conn_info = codec.loads(data["conn_info"])
         art_socket_raw = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         art_socket = get_ssl_context().wrap_socket(art_socket_raw) if conn_info.get('secured', False) else art_socket_raw
         art_socket.connect((conn_info["ip"], int(conn_info["port"])))
@@ -297,7 +296,7 @@ class SamsungTVArt(SamsungTVWSConnection):
         thumbnail_data_dict = {}
         while current_thumb+1 < total_num_thumbnails:
             header_len = int.from_bytes(art_socket.recv(4), "big")
-            header = json.loads(art_socket.recv(header_len))
+            header = codec.loads(art_socket.recv(header_len))
             thumbnail_data_len = int(header["fileLength"])
             current_thumb = int(header["num"])
             total_num_thumbnails = int(header["total"])
@@ -327,12 +326,12 @@ class SamsungTVArt(SamsungTVWSConnection):
                 }
             )
             assert data
-            conn_info = json.loads(data["conn_info"])
+            conn_info = codec.loads(data["conn_info"])
 
             art_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             art_socket.connect((conn_info["ip"], int(conn_info["port"])))
             header_len = int.from_bytes(art_socket.recv(4), "big")
-            header = json.loads(art_socket.recv(header_len))
+            header = codec.loads(art_socket.recv(header_len))
 
             thumbnail_data_len = int(header["fileLength"])
             thumbnail_data = bytearray()
@@ -378,8 +377,8 @@ class SamsungTVArt(SamsungTVWSConnection):
             wait_for_event="ready_to_use"
         )
         assert data
-        conn_info = json.loads(data["conn_info"])
-        header = json.dumps(
+        conn_info = codec.loads(data["conn_info"])
+        header = codec.dumps(
             {
                 "num": 0,
                 "total": 1,
@@ -414,7 +413,7 @@ class SamsungTVArt(SamsungTVWSConnection):
             {"request": "delete_image_list", "content_id_list": content_id_list}
         )
         assert data
-        return content_id_list == json.loads(data['content_id_list'])
+        return content_id_list == codec.loads(data['content_id_list'])
 
     def select_image(self, content_id, category=None, show=True):
         self._send_art_request(
@@ -455,7 +454,7 @@ class SamsungTVArt(SamsungTVWSConnection):
             {"request": "get_photo_filter_list"}
         )
         assert data
-        return json.loads(data["filter_list"])
+        return codec.loads(data["filter_list"])
 
     def set_photo_filter(self, content_id, filter_id):
         self._send_art_request(
@@ -471,7 +470,7 @@ class SamsungTVArt(SamsungTVWSConnection):
             {"request": "get_matte_list"}
         )
         assert data
-        return (json.loads(data["matte_type_list"]), json.loads(data.get("matte_color_list"))) if include_colour else json.loads(data["matte_type_list"])
+        return (codec.loads(data["matte_type_list"]), codec.loads(data.get("matte_color_list"))) if include_colour else codec.loads(data["matte_type_list"])
 
     def change_matte(self, content_id, matte_id=None, portrait_matte=None):
         '''
@@ -9,26 +9,57 @@ SPDX-License-Identifier: LGPL-3.0
 """
 
 from datetime import datetime
+import collections
 import os
-import json
 import logging
+import mmap
 import random
+import socket
+import time
 import asyncio
 import aiohttp
 from typing import Any, Dict, List, Optional, Union, Callable, Awaitable
 import uuid
 
-from . import exceptions, helper
+from . import codec, exceptions, helper
 from .command import SamsungTVCommand
 from .async_connection import SamsungTVWSAsyncConnection
 from .remote import SamsungTVWS
 from .event import D2D_SERVICE_MESSAGE_EVENT, MS_CHANNEL_READY_EVENT
 from .async_rest import SamsungTVAsyncRest
+from .flight_recorder import IN
 from .helper import get_ssl_context
 
 _LOGGING = logging.getLogger(__name__)
 
 ART_ENDPOINT = "com.samsung.art-app"
+D2D_CHUNK_SIZE = 256 * 1024
+D2D_MIN_BANDWIDTH = 512 * 1024     #bytes/s used to derive the default transfer deadline
+DELETE_CHUNK_SIZE = 50
+DEFAULT_REQUEST_TIMEOUT = 2
+TIMEOUT_FRAMES = 20     #latest frames kept with each timeout
+
+
+class ArtImage:
+    '''
+    Image ready to be uploaded, either held in memory (data) or on disk (path).
+    Files on disk are never loaded in memory: they are sent with sendfile,
+    or through an mmap backed memoryview when the d2d socket uses TLS.
+    '''
+    def __init__(self, data=None, path=None, file_type="png", date=None):
+        if path is not None:
+            file_type = os.path.splitext(path)[1][1:] or file_type
+            self.file_size = os.path.getsize(path)
+        else:
+            self.file_size = len(data)
+        self.data = data
+        self.path = path
+        self.file_type = "jpg" if file_type.lower() == "jpeg" else file_type.lower()
+        self.date = date or datetime.now().strftime("%Y:%m:%d %H:%M:%S")
+
+    @classmethod
+    def from_file(cls, path, date=None) -> "ArtImage":
+        return cls(path=path, date=date)
 
 
 class ArtChannelEmitCommand(SamsungTVCommand):
@@ -41,7 +72,7 @@ class ArtChannelEmitCommand(SamsungTVCommand):
             {
                 "event": "art_app_request",
                 "to": "host",
-                "data": json.dumps(data),
+                "data": codec.dumps(data),
             }
         )
 
@@ -56,7 +87,19 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
         timeout=None,
         key_press_delay=1,
         name="SamsungTvRemote",
+        metrics=None,
+        tracer=None,
+        request_timeouts=None,
     ):
+        '''
+        metrics: optional hook object with art_request(host, request, outcome, rtt),
+        art_pending(host, count) and art_upload(host, report) methods
+        (outcome is "ok", "timeout" or "error")
+        tracer: optional hook object with start_span(name, attributes), returning
+        a span with set_attribute(key, value) and end(error=None) methods
+        request_timeouts: {request type: seconds}, overrides the timeout passed
+        by the caller for that request type
+        '''
         super().__init__(
             host,
             endpoint=ART_ENDPOINT,
@@ -68,12 +111,19 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             name=name,
         )
         self.art_uuid = str(uuid.uuid4())
+        self.metrics = metrics
+        self.tracer = tracer
+        self.request_timeouts = dict(request_timeouts or {})
+        self._api_version_request = None    #get_api_version or api_version, whichever the tv answered
         self._rest_api: Optional[SamsungTVAsyncRest] = None
         self.art_mode = None
         self.session = None
         self.lock = asyncio.Lock()
+        self.upload_lock = asyncio.Lock()   #one d2d upload at a time, image_added is keyed by event name
+        self.delete_lock = asyncio.Lock()   #one delete chunk at a time, image_deleted is keyed by event name
         self.pending_requests = {}
         self.callbacks = {}
+        self.timeouts = collections.deque(maxlen=5)     #latest timeouts with the frames that preceded them
         self.get_token()
             
     def get_token(self):
@@ -82,12 +132,13 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
         '''
         tv = SamsungTVWS(self.host, port=self.port, token=self.token, token_file=self.token_file, timeout=self.timeout)
 
-    async def open(self):
-        await super().open()
+    async def _open(self):
+        await super()._open()
 
         # Override base class to wait for MS_CHANNEL_READY_EVENT
         assert self.connection
         data = await self.connection.recv()
+        self.recorder.record(IN, data)
         response = helper.process_api_response(data)
         event = response.get("event", "*")
         self._websocket_event(event, response)
@@ -100,6 +151,8 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
 
     async def close(self):
         if self.session:
+            if not self.session.closed:
+                self._connection_event("session_close")
             await self.session.close()
         await super().close()
    
@@ -123,13 +176,13 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             if request_uuid not in self.pending_requests.keys():
                 self.pending_requests[request_uuid] = asyncio.Future()
             response = await asyncio.wait_for(self.pending_requests[request_uuid], timeout)
-            data = json.loads(response["data"])
+            data = codec.loads(response["data"])
         except asyncio.exceptions.TimeoutError:
             pass
         self.pending_requests.pop(request_uuid, None)
         if data and data.get("event", "*") == "error":
             raise exceptions.ResponseError(
-                f"{json.loads(data['request_data'])['request']} request failed "
+                f"{codec.loads(data['request_data'])['request']} request failed "
                 f"with error number {data['error_code']}"
             )
         return data
@@ -138,19 +191,75 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
         self,
         request_data: Dict[str, Any],
         wait_for_event: Optional[str] = None,
-        timeout: int = 2
+        timeout: float = DEFAULT_REQUEST_TIMEOUT
     ) -> Optional[Dict[str, Any]]:
+        '''
+        returns the response data, or None when no response arrived within the timeout
+        (request_timeouts[request type] when configured)
+        '''
         if not request_data.get("id"):
             request_data["id"] = self.get_uuid()            #old api
         request_data["request_id"] = request_data["id"]     #new api
+        request = str(request_data.get("request"))
+        timeout = self.request_timeouts.get(request, timeout)
+        span = None
+        if self.tracer:
+            span = self.tracer.start_span(
+                "art." + request,
+                {"tv": self.host, "art.request_id": request_data["id"], "art.wait_for_event": wait_for_event or "",
+                 "art.timeout": timeout}
+            )
         self.pending_requests[wait_for_event or request_data["id"]] = asyncio.Future()
-        await self.start_listening()
-        await self.send_command(ArtChannelEmitCommand.art_app_request(request_data))
-        return await self.wait_for_response(wait_for_event or request_data["id"], timeout)
+        start = time.monotonic()
+        error = None
+        data = None
+        try:
+            await self.start_listening()
+            if self.metrics:
+                self.metrics.art_pending(self.host, len(self.pending_requests))
+            #no key press delay: the response is awaited below
+            await self.send_command(ArtChannelEmitCommand.art_app_request(request_data), key_press_delay=0)
+            data = await self.wait_for_response(wait_for_event or request_data["id"], timeout)
+        except Exception as e:
+            error = e
+            self.pending_requests.pop(wait_for_event or request_data["id"], None)
+            raise
+        finally:
+            outcome = "error" if error else "timeout" if data is None else "ok"
+            if self.metrics:
+                self.metrics.art_request(self.host, request, outcome, time.monotonic() - start)
+                self.metrics.art_pending(self.host, len(self.pending_requests))
+            if outcome == "timeout":
+                frames = self._record_timeout(request, request_data["id"], timeout)
+            if span:
+                span.set_attribute("art.outcome", outcome)
+                if outcome == "timeout":
+                    span.set_attribute("art.frames", frames)
+                    error = asyncio.TimeoutError("no response after {}s".format(timeout))
+                span.end(error)
+        return data
+
+    def _record_timeout(self, request, request_id, timeout):
+        '''
+        keeps the latest frames with the timed out request (see timeouts), returns them
+        '''
+        frames = self.recorder.dump(TIMEOUT_FRAMES)
+        self.timeouts.append({
+            "ts": time.time(),
+            "request": request,
+            "request_id": request_id,
+            "timeout": timeout,
+            "frames": frames,
+        })
+        _LOGGING.warning(
+            "%s: %s request %s got no response after %ss, %d recent frames kept",
+            self.host, request, request_id, timeout, len(frames)
+        )
+        return frames
         
     async def process_event(self, event=None, response=None):
         if event == D2D_SERVICE_MESSAGE_EVENT:
-            data = json.loads(response["data"])
+            data = codec.loads(response["data"])
             sub_event = data.get("event", "*")
             if 'artmode_status' in sub_event:
                 self.art_mode = data['value'] == 'on'
@@ -161,10 +270,11 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             elif 'wakeup' in sub_event:
                 asyncio.create_task(self.get_artmode())
                 
-            if sub_event in self.callbacks.keys():
-                awaitable = self.callbacks[sub_event](event, response)
-                if awaitable:
-                    asyncio.create_task(awaitable)
+            for trigger in (sub_event, "*"):
+                if trigger in self.callbacks:
+                    awaitable = self.callbacks[trigger](event, response)
+                    if awaitable:
+                        asyncio.create_task(awaitable)
                 
             request_id = data.get('request_id', data.get('id'))
             try:
@@ -176,6 +286,9 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
                 pass
                 
     def set_callback(self, trigger, callback=None):
+        '''
+        callback(event, response) for the d2d event named trigger, "*" for every d2d event
+        '''
         if not callback:
             self.callbacks.pop(trigger, None)
         else:
@@ -184,6 +297,7 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
     def get_session(self):
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession()
+            self._connection_event("session_open")
             self._rest_api = None
         return self.session
 
@@ -217,13 +331,19 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
         return await self.on() and await self.get_artmode() == 'on'
         
     async def get_api_version(self):
-        data = await self._send_art_request(
-            {"request": "get_api_version"}
-        )
-        if not data:
+        '''
+        older tv's only answer api_version: once known, the other request is not tried again
+        '''
+        data = None
+        for request in ([self._api_version_request] if self._api_version_request else ["get_api_version", "api_version"]):
             data = await self._send_art_request(
-                {"request": "api_version"}
+                {"request": request}
             )
+            if data:
+                self._api_version_request = request
+                break
+        else:
+            self._api_version_request = None
         assert data
         return data["version"]
 
@@ -243,7 +363,7 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             timeout=timeout
         )
         assert data
-        return [ v for v in json.loads(data["content_list"]) if v['category_id'] == category] if category else json.loads(data["content_list"])
+        return [ v for v in codec.loads(data["content_list"]) if v['category_id'] == category] if category else codec.loads(data["content_list"])
 
     async def get_current(self):
         data = await self._send_art_request(
@@ -271,7 +391,7 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             {"request": "get_artmode_settings"}
         )
         assert data
-        data = json.loads(data['data'])
+        data = codec.loads(data['data'])
         return next(iter(item for item in data if item['item'] == setting), data)
 
     async def get_auto_rotation_status(self):
@@ -353,6 +473,16 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
         return data
  
     async def get_thumbnail_list(self, content_id_list=[]):
+        thumbnail_data_dict = {}
+        async for filename, thumbnail_data in self.iter_thumbnail_list(content_id_list):
+            thumbnail_data_dict[filename] = thumbnail_data
+        return thumbnail_data_dict
+
+    async def iter_thumbnail_list(self, content_id_list=[]):
+        '''
+        async iterator over (filename, data) pairs, yielded as each thumbnail
+        is read from the single d2d connection
+        '''
         if isinstance(content_id_list, str):
             content_id_list=[content_id_list]
         content_id_list=[{"content_id": id} for id in content_id_list]
@@ -368,22 +498,22 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             }
         )
         assert data
-        conn_info = json.loads(data["conn_info"])
+        conn_info = codec.loads(data["conn_info"])
         ssl_context = get_ssl_context() if conn_info.get('secured', False) else None
         reader, writer = await asyncio.open_connection(conn_info['ip'], int(conn_info['port']), ssl=ssl_context)
-        total_num_thumbnails = 1
-        current_thumb = -1
-        thumbnail_data_dict = {}
-        while current_thumb+1 < total_num_thumbnails:
-            header_len = int.from_bytes(await reader.readexactly(4), "big")
-            header = json.loads(await reader.readexactly(header_len))
-            thumbnail_data_len = int(header["fileLength"])
-            current_thumb = int(header["num"])
-            total_num_thumbnails = int(header["total"])
-            filename = "{}.{}".format(header["fileID"], header["fileType"])
-            thumbnail_data_dict[filename] = await reader.readexactly(thumbnail_data_len)
-        writer.close()
-        return thumbnail_data_dict
+        try:
+            total_num_thumbnails = 1
+            current_thumb = -1
+            while current_thumb+1 < total_num_thumbnails:
+                header_len = int.from_bytes(await reader.readexactly(4), "big")
+                header = codec.loads(await reader.readexactly(header_len))
+                thumbnail_data_len = int(header["fileLength"])
+                current_thumb = int(header["num"])
+                total_num_thumbnails = int(header["total"])
+                filename = "{}.{}".format(header["fileID"], header["fileType"])
+                yield filename, await reader.readexactly(thumbnail_data_len)
+        finally:
+            writer.close()
 
     async def get_thumbnail(self, content_id_list=[], as_dict=False):
         if isinstance(content_id_list, str):
@@ -403,10 +533,10 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
                 }
             )
             assert data
-            conn_info = json.loads(data["conn_info"])
+            conn_info = codec.loads(data["conn_info"])
             reader, writer = await asyncio.open_connection(conn_info['ip'], int(conn_info['port']))
             header_len = int.from_bytes(await reader.readexactly(4), "big")
-            header = json.loads(await reader.readexactly(header_len))
+            header = codec.loads(await reader.readexactly(header_len))
             thumbnail_data_len = int(header["fileLength"])
             thumbnail_data = await reader.readexactly(thumbnail_data_len)
             writer.close()
@@ -416,61 +546,173 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
 
     async def upload(self, file, matte="none", portrait_matte="flexible_black", file_type="png", date=None, timeout=10):
         '''
-        NOTE: both id's and request_id have to be the same
+        file can be bytes, a file path (sent without loading it in memory) or an ArtImage
+        returns the new content_id, or None (see upload_image for the failure details)
         '''
-        if isinstance(file, str):
-            file_name, file_extension = os.path.splitext(file)
-            file_type = file_extension[1:]
-            with open(file, 'rb') as f:
-                file = f.read()
-                
-        file_size = len(file)
-        file_type = file_type.lower()
-        if file_type == "jpeg":
-            file_type = "jpg"
-            
-        if date is None:
-            date = datetime.now().strftime("%Y:%m:%d %H:%M:%S")
-        data = await self._send_art_request(
-            {
-                "request": "send_image",
-                "file_type": file_type,
-                "request_id" : self.get_uuid(),
-                "id": self.art_uuid,
-                "conn_info": {
-                    "d2d_mode": "socket",
-                    "connection_id": random.randrange(4 * 1024 * 1024 * 1024),
-                    "id": self.art_uuid,
-                },
-                "image_date": date,
-                "matte_id": matte or 'none',
-                "portrait_matte_id": portrait_matte or 'none',
-                "file_size": file_size,
-            }
-        )
-        assert data
-        conn_info = json.loads(data["conn_info"])
-        header = json.dumps(
-            {
-                "num": 0,
-                "total": 1,
-                "fileLength": file_size,
-                "fileName": "dummy",
-                "fileType": file_type,
-                "secKey": conn_info["key"],
-                "version": "0.0.1",
-            }
+        report = await self.upload_image(
+            file, matte=matte, portrait_matte=portrait_matte, file_type=file_type, date=date, confirm_timeout=timeout
         )
+        return report["content_id"]
 
-        ssl_context = get_ssl_context() if conn_info.get('secured', False) else None
-        reader, writer = await asyncio.open_connection(conn_info['ip'], int(conn_info['port']), ssl=ssl_context)  
-        writer.write(len(header).to_bytes(4, "big"))
-        writer.write(header.encode("ascii"))
-        writer.write(file)
-        await writer.drain()
-        writer.close()
-        data = await self.wait_for_response("image_added", timeout=timeout)
-        return data["content_id"] if data else None
+    async def upload_image(self, file, **kwargs) -> Dict[str, Any]:
+        async with self.upload_lock:
+            report = await self._upload_image(file, **kwargs)
+        if self.metrics:
+            self.metrics.art_upload(self.host, report)
+        return report
+
+    async def _upload_image(
+        self,
+        file,
+        matte="none",
+        portrait_matte="flexible_black",
+        file_type="png",
+        date=None,
+        negotiate_timeout=2,
+        negotiate_retries=2,
+        transfer_timeout=None,
+        confirm_timeout=10,
+    ) -> Dict[str, Any]:
+        '''
+        Upload in three timed phases, each with its own deadline:
+        negotiate (send_image on the websocket, retried on timeout as nothing was sent yet),
+        transfer (d2d socket, default deadline derived from D2D_MIN_BANDWIDTH)
+        and confirm (wait for image_added).
+        Returns a report: content_id (None on failure), failed_phase, error,
+        negotiate_attempts, phases (seconds per phase), bytes, throughput (bytes/s) and duration.
+        NOTE: both id's and request_id have to be the same
+        '''
+        if isinstance(file, ArtImage):
+            image = file
+        elif isinstance(file, str):
+            image = ArtImage(path=file, date=date)
+        else:
+            image = ArtImage(data=file, file_type=file_type, date=date)
+        if transfer_timeout is None:
+            transfer_timeout = 5 + image.file_size / D2D_MIN_BANDWIDTH
+
+        report = {
+            "content_id": None,
+            "failed_phase": None,
+            "error": None,
+            "negotiate_attempts": 0,
+            "phases": {},
+            "bytes": image.file_size,
+            "throughput": None,
+            "duration": None,
+        }
+        start = phase_start = time.monotonic()
+        phase = "negotiate"
+        try:
+            data = None
+            while data is None and report["negotiate_attempts"] <= negotiate_retries:
+                report["negotiate_attempts"] += 1
+                data = await self._send_art_request(
+                    {
+                        "request": "send_image",
+                        "file_type": image.file_type,
+                        "request_id" : self.get_uuid(),
+                        "id": self.art_uuid,
+                        "conn_info": {
+                            "d2d_mode": "socket",
+                            "connection_id": random.randrange(4 * 1024 * 1024 * 1024),
+                            "id": self.art_uuid,
+                        },
+                        "image_date": image.date,
+                        "matte_id": matte or 'none',
+                        "portrait_matte_id": portrait_matte or 'none',
+                        "file_size": image.file_size,
+                    },
+                    timeout=negotiate_timeout,
+                )
+            if data is None:
+                raise asyncio.TimeoutError()
+            conn_info = codec.loads(data["conn_info"])
+            header = codec.dumps(
+                {
+                    "num": 0,
+                    "total": 1,
+                    "fileLength": image.file_size,
+                    "fileName": "dummy",
+                    "fileType": image.file_type,
+                    "secKey": conn_info["key"],
+                    "version": "0.0.1",
+                }
+            )
+            header = len(header).to_bytes(4, "big") + header.encode("ascii")
+            # register before sending, image_added can arrive before the transfer returns
+            self.pending_requests["image_added"] = asyncio.Future()
+
+            report["phases"][phase] = time.monotonic() - phase_start
+            phase, phase_start = "transfer", time.monotonic()
+            await asyncio.wait_for(self._send_d2d_image(conn_info, header, image), transfer_timeout)
+            transfer_time = time.monotonic() - phase_start
+            report["phases"][phase] = transfer_time
+            report["throughput"] = image.file_size / transfer_time if transfer_time else None
+
+            phase, phase_start = "confirm", time.monotonic()
+            data = await self.wait_for_response("image_added", timeout=confirm_timeout)
+            report["phases"][phase] = time.monotonic() - phase_start
+            if data is None:
+                raise asyncio.TimeoutError()
+            report["content_id"] = data["content_id"]
+        except asyncio.TimeoutError:
+            report["phases"][phase] = time.monotonic() - phase_start
+            report["failed_phase"] = phase
+            report["error"] = "{} phase timed out".format(phase)
+            if phase != "negotiate":    #negotiate timeouts are kept by _send_art_request
+                timeout = transfer_timeout if phase == "transfer" else confirm_timeout
+                self._record_timeout("upload_" + phase, self.art_uuid, timeout)
+        except Exception as e:
+            report["phases"][phase] = time.monotonic() - phase_start
+            report["failed_phase"] = phase
+            report["error"] = "{} phase failed: {}".format(phase, e)
+        finally:
+            if report["failed_phase"]:
+                self.pending_requests.pop("image_added", None)
+        report["duration"] = time.monotonic() - start
+        _LOGGING.debug("upload report: %s", report)
+        return report
+
+    async def _send_d2d_image(self, conn_info, header, image):
+        address = (conn_info['ip'], int(conn_info['port']))
+        secured = conn_info.get('secured', False)
+        if image.path is not None and not secured:
+            # zero copy: the kernel sends the file straight to the socket
+            loop = asyncio.get_running_loop()
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                await loop.sock_sendall(sock, header)
+                with open(image.path, 'rb') as f:
+                    await loop.sock_sendfile(sock, f, count=image.file_size)
+            finally:
+                sock.close()
+            return
+
+        ssl_context = get_ssl_context() if secured else None
+        reader, writer = await asyncio.open_connection(*address, ssl=ssl_context)
+        try:
+            writer.write(header)
+            if image.path is None:
+                writer.write(image.data)
+                await writer.drain()
+            elif image.file_size:
+                # TLS prevents sendfile: stream chunks of an mmap view, constant memory
+                with open(image.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    try:
+                        for offset in range(0, image.file_size, D2D_CHUNK_SIZE):
+                            writer.write(memoryview(mapped)[offset:offset + D2D_CHUNK_SIZE])
+                            await writer.drain()
+                        # the transport must release its views before the mmap is closed
+                        writer.close()
+                        await writer.wait_closed()
+                    except BaseException:
+                        writer.transport.abort()
+                        raise
+        finally:
+            writer.close()
 
     async def delete(self, content_id):
         await self.delete_list([content_id])
@@ -483,6 +725,46 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             }
         )
 
+    async def delete_images(self, content_ids, chunk_size=DELETE_CHUNK_SIZE, timeout=10, on_chunk=None) -> Dict[str, str]:
+        '''
+        Delete in chunks of chunk_size, each confirmed by its image_deleted event
+        before the next one is sent.
+        on_chunk(outcomes) is called after each chunk.
+        Returns {content_id: "deleted" | "not_deleted" | "timeout" | "error"}
+        '''
+        outcomes = {}
+        content_ids = list(dict.fromkeys(content_ids))
+        for start in range(0, len(content_ids), chunk_size):
+            chunk = content_ids[start:start + chunk_size]
+            chunk_outcomes = await self._delete_chunk(chunk, timeout)
+            outcomes.update(chunk_outcomes)
+            if on_chunk:
+                on_chunk(chunk_outcomes)
+        return outcomes
+
+    async def _delete_chunk(self, content_ids, timeout) -> Dict[str, str]:
+        async with self.delete_lock:
+            try:
+                data = await self._send_art_request(
+                    {   "request": "delete_image_list",
+                        "content_id_list": [{"content_id": item} for item in content_ids]
+                    },
+                    wait_for_event="image_deleted",
+                    timeout=timeout
+                )
+            except exceptions.ResponseError as e:
+                _LOGGING.warning("delete_image_list failed: %s", e)
+                return dict.fromkeys(content_ids, "error")
+        if not data:
+            return dict.fromkeys(content_ids, "timeout")
+        deleted = data.get("content_id_list") or []
+        if isinstance(deleted, str):
+            deleted = codec.loads(deleted)
+        deleted = {item["content_id"] if isinstance(item, dict) else item for item in deleted}
+        if data.get("content_id"):
+            deleted.add(data["content_id"])
+        return {content_id: "deleted" if content_id in deleted else "not_deleted" for content_id in content_ids}
+
     async def select_image(self, content_id, category=None, show=True):
         await self._send_art_request(
             {
@@ -522,7 +804,7 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             {"request": "get_photo_filter_list"}
         )
         assert data
-        return json.loads(data["filter_list"])
+        return codec.loads(data["filter_list"])
 
     async def set_photo_filter(self, content_id, filter_id):
         await self._send_art_request(
@@ -538,7 +820,7 @@ class SamsungTVAsyncArt(SamsungTVWSAsyncConnection):
             {"request": "get_matte_list"}
         )
         assert data
-        return (json.loads(data["matte_type_list"]), json.loads(data.get("matte_color_list"))) if include_colour else json.loads(data["matte_type_list"])
+        return (codec.loads(data["matte_type_list"]), codec.loads(data.get("matte_color_list"))) if include_colour else codec.loads(data["matte_type_list"])
 
     async def change_matte(self, content_id, matte_id=None, portrait_matte=None):
         '''
@@ -8,8 +8,9 @@ SPDX-License-Identifier: LGPL-3.0
 
 import asyncio
 import contextlib
-import json
+import contextvars
 import logging
+import time
 from types import TracebackType
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
 
@@ -17,8 +18,9 @@ from websockets.client import WebSocketClientProtocol, connect
 from websockets.exceptions import ConnectionClosed
 from websockets.protocol import State
 
-from . import connection, exceptions, helper
+from . import codec, connection, exceptions, helper
 from .command import SamsungTVCommand, SamsungTVSleepCommand
+from .flight_recorder import IN, OUT, FlightRecorder
 from .event import (
     IGNORE_EVENTS_AT_STARTUP,
     MS_CHANNEL_CONNECT_EVENT,
@@ -33,6 +35,20 @@ _LOGGING = logging.getLogger(__name__)
 class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
     connection: Optional[WebSocketClientProtocol]
     _recv_loop: Optional["asyncio.Task[None]"]
+    # optional hook called as on_connection_event(event, details) with event
+    # "open" (duration), "failure" (duration, error) or "close" (code, reason,
+    # requested, uptime); SamsungTVAsyncArt adds "session_open" and
+    # "session_close" for its REST session
+    on_connection_event: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    _opened_at: Optional[float] = None
+    _closing = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # latest frames sent and received, see flight_recorder
+        self.recorder = FlightRecorder()
+        # concurrent callers (listening, requests) share the connection being opened
+        self._open_lock = asyncio.Lock()
 
     async def __aenter__(self) -> "SamsungTVWSAsyncConnection":
         return self
@@ -46,10 +62,24 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
         await self.close()
 
     async def open(self) -> WebSocketClientProtocol:
-        if self.is_alive():
-            # someone else already created a new connection
-            return self.connection
-
+        async with self._open_lock:
+            if self.is_alive():
+                # someone else already created a new connection
+                return self.connection
+
+            start = time.monotonic()
+            try:
+                connection = await self._open()
+            except Exception as err:
+                self._connection_event(
+                    "failure", duration=time.monotonic() - start, error=f"{type(err).__name__}: {err}"
+                )
+                raise
+            self._opened_at = time.monotonic()
+            self._connection_event("open", duration=self._opened_at - start)
+            return connection
+
+    async def _open(self) -> WebSocketClientProtocol:
         url = self._format_websocket_url(self.endpoint)
 
         _LOGGING.debug("WS url %s", url)
@@ -61,6 +91,7 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
         event: Optional[str] = None
         while event is None or event in IGNORE_EVENTS_AT_STARTUP:
             data = await connection.recv()
+            self.recorder.record(IN, data)
             response = helper.process_api_response(data)
             event = response.get("event", "*")
             assert event
@@ -90,8 +121,11 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
             if not self.is_alive():
                 self.connection = await self.open()
 
-            self._recv_loop = asyncio.ensure_future(
-                self._do_start_listening(callback, self.connection)
+            # fresh context: the receive loop outlives the caller and must not
+            # inherit its context variables (e.g. the caller's tracing span)
+            self._recv_loop = asyncio.create_task(
+                self._do_start_listening(callback, self.connection),
+                context=contextvars.Context(),
             )
             return True
         return False
@@ -106,6 +140,7 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
         with contextlib.suppress(ConnectionClosed):
             while True:
                 data = await connection.recv()
+                self.recorder.record(IN, data)
                 response = helper.process_api_response(data)
                 event = response.get("event", "*")
                 self._websocket_event(event, response)
@@ -115,16 +150,44 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
                         await awaitable
         _LOGGING.debug("Listening Connection closed")
         self._recv_loop = None
+        self._connection_closed(connection)
 
     async def close(self) -> None:
         if self.is_alive():
-            await self.connection.close()
-            if self._recv_loop:
-                await self._recv_loop
+            self._closing = True
+            try:
+                await self.connection.close()
+                if self._recv_loop:
+                    await self._recv_loop
+                else:
+                    self._connection_closed(self.connection)
+            finally:
+                self._closing = False
 
         self.connection = None
         _LOGGING.debug("Connection closed.")
 
+    def _connection_closed(self, connection: WebSocketClientProtocol) -> None:
+        if self._opened_at is None:
+            # closed while opening: already reported as a failure
+            return
+        uptime = time.monotonic() - self._opened_at
+        self._opened_at = None
+        self._connection_event(
+            "close",
+            code=connection.close_code,
+            reason=connection.close_reason,
+            requested=self._closing,
+            uptime=uptime,
+        )
+
+    def _connection_event(self, event: str, **details: Any) -> None:
+        if self.on_connection_event:
+            try:
+                self.on_connection_event(event, details)
+            except Exception:
+                _LOGGING.exception("Connection event hook failed")
+
     async def send_commands(
         self,
         commands: Sequence[Union[SamsungTVCommand, Dict[str, Any]]],
@@ -136,7 +199,7 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
         delay = self.key_press_delay if key_press_delay is None else key_press_delay
 
         for command in commands:
-            await self._send_command(self.connection, command, delay)
+            await self._send_command(self.connection, command, delay, self.recorder)
 
     async def send_command(
         self,
@@ -158,6 +221,7 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
         connection: WebSocketClientProtocol,
         command: Union[SamsungTVCommand, Dict[str, Any]],
         delay: float,
+        recorder: Optional[FlightRecorder] = None,
     ) -> None:
         if isinstance(command, SamsungTVSleepCommand):
             await asyncio.sleep(command.delay)
@@ -166,8 +230,10 @@ class SamsungTVWSAsyncConnection(connection.SamsungTVWSBaseConnection):
         if isinstance(command, SamsungTVCommand):
             payload = command.get_payload()
         else:
-            payload = json.dumps(command)
+            payload = codec.dumps(command)
         _LOGGING.debug("SamsungTVWS websocket command: %s", payload)
+        if recorder:
+            recorder.record(OUT, payload)
         await connection.send(payload)
 
         await asyncio.sleep(delay)
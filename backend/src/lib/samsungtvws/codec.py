@@ -0,0 +1,34 @@
+"""
+SamsungTVWS - Samsung Smart TV WS API wrapper
+
+JSON codec shared by every frame and command: orjson when it is installed,
+stdlib json otherwise.
+
+SPDX-License-Identifier: LGPL-3.0
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    BACKEND = "orjson"
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> str:
+        '''
+        returns str so websocket payloads stay text frames
+        '''
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    BACKEND = "json"
+    loads = json.loads
+    dumps = json.dumps
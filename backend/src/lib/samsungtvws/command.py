@@ -6,9 +6,10 @@ Copyright (C) 2019 DSR! <xchwarze@gmail.com>
 SPDX-License-Identifier: LGPL-3.0
 """
 
-import json
 from typing import Any, Dict
 
+from . import codec
+
 
 class SamsungTVCommand:
     def __init__(self, method: str, params: Dict[str, Any]) -> None:
@@ -22,7 +23,7 @@ class SamsungTVCommand:
         }
 
     def get_payload(self) -> str:
-        return json.dumps(self.as_dict())
+        return codec.dumps(self.as_dict())
 
 
 class SamsungTVSleepCommand(SamsungTVCommand):
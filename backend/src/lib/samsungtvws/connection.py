@@ -6,7 +6,6 @@ Copyright (C) 2019 DSR! <xchwarze@gmail.com>
 SPDX-License-Identifier: LGPL-3.0
 """
 
-import json
 import logging
 import ssl
 import threading
@@ -16,7 +15,7 @@ from typing import Any, Callable, Dict, List, Optional, Union
 
 import websocket
 
-from . import exceptions, helper
+from . import codec, exceptions, helper
 from .command import SamsungTVCommand, SamsungTVSleepCommand
 from .event import (
     IGNORE_EVENTS_AT_STARTUP,
@@ -252,7 +251,7 @@ class SamsungTVWSConnection(SamsungTVWSBaseConnection):
         if isinstance(command, SamsungTVCommand):
             payload = command.get_payload()
         else:
-            payload = json.dumps(command)
+            payload = codec.dumps(command)
         _LOGGING.debug("SamsungTVWS websocket command: %s", payload)
         connection.send(payload)
 
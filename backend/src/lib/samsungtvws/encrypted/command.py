@@ -1,8 +1,9 @@
 """SamsungTV Encrypted."""
 
-import json
 from typing import Any, Dict
 
+from .. import codec
+
 
 class SamsungTVEncryptedCommand:
     def __init__(self, method: str, body: Dict[str, Any]) -> None:
@@ -16,7 +17,7 @@ class SamsungTVEncryptedCommand:
         }
 
     def get_payload(self) -> str:
-        return json.dumps(self.as_dict())
+        return codec.dumps(self.as_dict())
 
 
 class SamsungTVEncryptedPostCommand(SamsungTVEncryptedCommand):
@@ -0,0 +1,68 @@
+"""
+SamsungTVWS - Samsung Smart TV WS API wrapper
+
+Always-on record of the latest websocket frames of a connection, for
+debugging request timeouts without DEBUG logging of every frame.
+
+SPDX-License-Identifier: LGPL-3.0
+"""
+
+import collections
+import re
+import time
+from typing import Any, Dict, List, Optional, Union
+
+IN = "in"
+OUT = "out"
+
+# "key": "value" pairs, also inside the JSON encoded "data" strings (\"key\": \"value\")
+_LABEL = re.compile(r'\\*"(event|method|request|request_id|id)\\*"\s*:\s*\\*"([^"\\]+)')
+_TOKEN = re.compile(r'(\\*"token\\*"\s*:\s*\\*")[^"\\]+')
+
+
+class FlightRecorder:
+    '''
+    Fixed-size ring buffer of the latest websocket frames of a connection.
+    record() only keeps the time, direction, size and a truncated payload;
+    event names are parsed and tokens redacted when the frames are dumped.
+    '''
+
+    def __init__(self, size: int = 100, payload_limit: int = 512) -> None:
+        self.payload_limit = payload_limit
+        self.frames: collections.deque = collections.deque(maxlen=size)
+
+    def record(self, direction: str, payload: Union[str, bytes]) -> None:
+        self.frames.append((time.time(), direction, payload[:self.payload_limit], len(payload)))
+
+    def clear(self) -> None:
+        self.frames.clear()
+
+    def dump(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        '''
+        oldest first, at most limit frames (the latest ones)
+        '''
+        frames = list(self.frames)
+        if limit is not None:
+            frames = frames[-limit:] if limit > 0 else []
+        return [self._describe(*frame) for frame in frames]
+
+    @staticmethod
+    def _describe(ts: float, direction: str, payload: Union[str, bytes], size: int) -> Dict[str, Any]:
+        truncated = size > len(payload)
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8", errors="replace")
+        labels: Dict[str, List[str]] = {}
+        for key, value in _LABEL.findall(payload):
+            labels.setdefault(key, []).append(value)
+        ids = labels.get("request_id") or labels.get("id") or [None]
+        return {
+            "ts": ts,
+            "direction": direction,
+            # outer event (or method) first, then the art event carried in "data"
+            "event": " / ".join(dict.fromkeys(labels.get("method", []) + labels.get("event", []))) or None,
+            "request": (labels.get("request") or [None])[0],
+            "request_id": ids[0],
+            "size": size,
+            "truncated": truncated,
+            "payload": _TOKEN.sub(r"\1***", payload),
+        }
@@ -7,12 +7,11 @@ SPDX-License-Identifier: LGPL-3.0
 """
 
 import base64
-import json
 import logging
 import ssl
 from typing import Any, Dict, Optional, Union
 
-from . import exceptions
+from . import codec, exceptions
 
 _LOGGING = logging.getLogger(__name__)
 _SSL_CONTEXT: Optional[ssl.SSLContext] = None
@@ -28,8 +27,8 @@ def serialize_string(string: Union[str, bytes]) -> str:
 def process_api_response(response: Union[str, bytes]) -> Dict[str, Any]:
     _LOGGING.debug("Processing API response: %s", response)
     try:
-        return json.loads(response)  # type:ignore[no-any-return]
-    except json.JSONDecodeError as err:
+        return codec.loads(response)  # type:ignore[no-any-return]
+    except codec.JSONDecodeError as err:
         raise exceptions.ResponseError(
             "Failed to parse response from TV. Maybe feature not supported on this model"
         ) from err
@@ -8,7 +8,7 @@ SPDX-License-Identifier: LGPL-3.0
 
 import logging
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 import warnings
 
 from samsungtvws.event import ED_INSTALLED_APP_EVENT, parse_installed_app
@@ -20,6 +20,16 @@ _LOGGING = logging.getLogger(__name__)
 
 REMOTE_ENDPOINT = "samsung.remote.control"
 
+REMOTE_KEY_CMDS = ("Click", "Press", "Release")
+# Keys used by the library, their payloads are serialized at import time
+KNOWN_KEYS = (
+    "KEY_POWER", "KEY_HOME", "KEY_MENU", "KEY_SOURCE", "KEY_GUIDE", "KEY_TOOLS", "KEY_INFO",
+    "KEY_UP", "KEY_DOWN", "KEY_LEFT", "KEY_RIGHT", "KEY_ENTER", "KEY_RETURN", "KEY_CH_LIST",
+    "KEY_CHUP", "KEY_CHDOWN", "KEY_VOLUP", "KEY_VOLDOWN", "KEY_MUTE",
+    "KEY_RED", "KEY_GREEN", "KEY_YELLOW", "KEY_BLUE", "KEY_FACTORY",
+) + tuple("KEY_{}".format(digit) for digit in range(10))
+MAX_DYNAMIC_KEY_COMMANDS = 1024
+
 
 class RemoteControlCommand(SamsungTVCommand):
     def __init__(self, params: Dict[str, Any]) -> None:
@@ -59,38 +69,59 @@ class ChannelEmitCommand(SamsungTVCommand):
 
 
 class SendRemoteKey(RemoteControlCommand):
+    '''
+    Instances are shared per (cmd, key) and serialize their payload once:
+    treat them as immutable
+    '''
+    _commands: Dict[Tuple[str, str], "SendRemoteKey"] = {}
+
+    def __init__(self, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        self._payload: Optional[str] = None
+
+    def get_payload(self) -> str:
+        if self._payload is None:
+            self._payload = super().get_payload()
+        return self._payload
+
+    @classmethod
+    def command(cls, cmd: str, key: str) -> "SendRemoteKey":
+        '''
+        cached command for cmd (Click, Press or Release) and key,
+        known keys are precompiled, other keys are cached on first use
+        '''
+        command = cls._commands.get((cmd, key))
+        if command is None:
+            command = cls(
+                {
+                    "Cmd": cmd,
+                    "DataOfCmd": key,
+                    "Option": "false",
+                    "TypeOfRemote": "SendRemoteKey",
+                }
+            )
+            command.get_payload()
+            if len(cls._commands) < len(KNOWN_KEYS) * len(REMOTE_KEY_CMDS) + MAX_DYNAMIC_KEY_COMMANDS:
+                cls._commands[(cmd, key)] = command
+        return command
+
+    @classmethod
+    def precompile(cls, keys) -> None:
+        for key in keys:
+            for cmd in REMOTE_KEY_CMDS:
+                cls.command(cmd, key)
+
     @staticmethod
     def click(key: str) -> "SendRemoteKey":
-        return SendRemoteKey(
-            {
-                "Cmd": "Click",
-                "DataOfCmd": key,
-                "Option": "false",
-                "TypeOfRemote": "SendRemoteKey",
-            }
-        )
+        return SendRemoteKey.command("Click", key)
 
     @staticmethod
     def press(key: str) -> "SendRemoteKey":
-        return SendRemoteKey(
-            {
-                "Cmd": "Press",
-                "DataOfCmd": key,
-                "Option": "false",
-                "TypeOfRemote": "SendRemoteKey",
-            }
-        )
+        return SendRemoteKey.command("Press", key)
 
     @staticmethod
     def release(key: str) -> "SendRemoteKey":
-        return SendRemoteKey(
-            {
-                "Cmd": "Release",
-                "DataOfCmd": key,
-                "Option": "false",
-                "TypeOfRemote": "SendRemoteKey",
-            }
-        )
+        return SendRemoteKey.command("Release", key)
 
     @staticmethod
     def hold(key: str, seconds: float) -> List["SamsungTVCommand"]:
@@ -216,6 +247,9 @@ class SendRemoteKey(RemoteControlCommand):
         return SendRemoteKey.click("KEY_FACTORY")
 
 
+SendRemoteKey.precompile(KNOWN_KEYS)
+
+
 class SamsungTVWS(connection.SamsungTVWSConnection):
     def __init__(
         self,
@@ -271,17 +305,7 @@ class SamsungTVWS(connection.SamsungTVWSConnection):
     ) -> None:
         for _ in range(times):
             _LOGGING.debug("Sending key %s", key)
-            self._ws_send(
-                RemoteControlCommand(
-                    {
-                        "Cmd": cmd,
-                        "DataOfCmd": key,
-                        "Option": "false",
-                        "TypeOfRemote": "SendRemoteKey",
-                    }
-                ),
-                key_press_delay,
-            )
+            self._ws_send(SendRemoteKey.command(cmd, key), key_press_delay)
 
     def hold_key(self, key: str, seconds: float) -> None:
         self.send_command(SendRemoteKey.hold(key, seconds))
@@ -1,21 +1,24 @@
 import logging
-from quart import Quart, jsonify, request
+import dotenv
+
+dotenv.load_dotenv()
+
+# Configuration des logs (avant l'import des services, qui journalisent dès leur création)
+from services.logging_service import setup_logging
+setup_logging()
+
+from quart import Quart, Response, jsonify, request
 from api.tv_routes import tv_bp, tv_service
+from api.admin_routes import admin_bp
+from services.loop_monitor import loop_monitor
+from services.metrics import metrics
 from functools import wraps
 import asyncio
 import signal
 import sys
-import dotenv
 import os
 from quart_cors import cors
 
-dotenv.load_dotenv()
-
-# Configuration des logs
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 app = Quart(__name__)
@@ -26,6 +29,7 @@ app = cors(
 
 # Enregistrement du blueprint
 app.register_blueprint(tv_bp)
+app.register_blueprint(admin_bp)
 
 @app.route('/')
 async def index():
@@ -47,8 +51,19 @@ async def health():
         "version": "1.0.0"
     })
 
+@app.route('/metrics')
+async def prometheus_metrics():
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.before_serving
+async def start_monitoring():
+    # Surveillance de la boucle d'événements (LOOP_MONITOR=0 pour la désactiver)
+    if os.environ.get('LOOP_MONITOR', '1') != '0':
+        loop_monitor.start()
+
 # Ajout du hook Quart pour la fermeture propre
 @app.after_serving
 async def shutdown():
     logger.info("Arrêt du service (after_serving)...")
+    await loop_monitor.stop()
     await tv_service.close_all() 
\ No newline at end of file
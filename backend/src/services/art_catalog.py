@@ -0,0 +1,303 @@
+import asyncio
+import base64
+import bisect
+import contextvars
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .logging_service import log_perf
+
+logger = logging.getLogger('ArtCatalog')
+
+MY_PICTURES_CATEGORY = 'MY-C0002'
+FAVOURITES_CATEGORY = 'MY-C0004'
+SORT_KEYS = ('image_date', 'content_id')
+
+
+def encode_cursor(position: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Position (valeur de tri, content_id) encodée dans le curseur ; ValueError si le curseur est invalide."""
+    try:
+        value, content_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError) as e:  # base64, UTF-8 ou JSON invalide, mauvais nombre d'éléments
+        raise ValueError(f"Curseur invalide : {e}") from e
+    if not isinstance(value, str) or not isinstance(content_id, str):
+        raise ValueError("Curseur invalide : position attendue (valeur, content_id)")
+    return value, content_id
+
+
+def deleted_content_ids(data: dict) -> List[str]:
+    """Extrait les content_id d'un événement image_deleted."""
+    content_ids = data.get("content_id_list") or []
+    if isinstance(content_ids, str):
+        content_ids = json.loads(content_ids)
+    content_ids = [item["content_id"] if isinstance(item, dict) else item for item in content_ids]
+    if data.get("content_id"):
+        content_ids.append(data["content_id"])
+    return content_ids
+
+
+class ArtCatalog:
+    """
+    Catalogue en mémoire des œuvres d'une TV, indexé par content_id et par catégorie.
+    Chargé une seule fois via get_content_list, puis mis à jour à partir des
+    événements image_added / image_deleted / favorite_changed, et réconcilié
+    périodiquement en arrière-plan.
+    """
+
+    def __init__(self, ip_address: str, fetch: Callable[[], Awaitable[List[dict]]], reconcile_interval: float = 300):
+        self.ip_address = ip_address
+        self._fetch = fetch
+        self.reconcile_interval = reconcile_interval
+        self.items: Dict[str, dict] = {}
+        self.categories: Dict[str, Dict[str, None]] = {}  # catégorie -> ensemble ordonné de content_id
+        # Index triés construits à la demande : (catégorie, clé de tri) -> [(valeur, content_id)]
+        self._sorted: Dict[Tuple[Optional[str], str], List[Tuple[str, str]]] = {}
+        self.loaded_at: Optional[float] = None
+        self._load_lock = asyncio.Lock()
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._pending_reconcile: Optional[asyncio.TimerHandle] = None
+        self.listeners: List[Callable[[List[str]], None]] = []  # notifiés des nouveaux content_id
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def _index(self, item: dict):
+        content_id = item['content_id']
+        if content_id not in self.items:
+            self.items[content_id] = item
+            self._add_sorted(None, content_id)
+        category_ids = self.categories.setdefault(item.get('category_id'), {})
+        if content_id not in category_ids:
+            category_ids[content_id] = None
+            self._add_sorted(item.get('category_id'), content_id)
+
+    def _sort_entry(self, content_id: str, sort_key: str) -> Tuple[str, str]:
+        return (self.items[content_id].get(sort_key) or '', content_id)
+
+    def _add_sorted(self, category: Optional[str], content_id: str):
+        for sort_key in SORT_KEYS:
+            index = self._sorted.get((category, sort_key))
+            if index is not None:
+                bisect.insort(index, self._sort_entry(content_id, sort_key))
+
+    def _remove_sorted(self, category: Optional[str], content_id: str):
+        for sort_key in SORT_KEYS:
+            index = self._sorted.get((category, sort_key))
+            if index is not None:
+                entry = self._sort_entry(content_id, sort_key)
+                position = bisect.bisect_left(index, entry)
+                if position < len(index) and index[position] == entry:
+                    del index[position]
+
+    def _get_sorted(self, category: Optional[str], sort_key: str) -> List[Tuple[str, str]]:
+        index = self._sorted.get((category, sort_key))
+        if index is None:
+            content_ids = self.items if category is None else self.categories.get(category, {})
+            index = sorted(self._sort_entry(content_id, sort_key) for content_id in content_ids)
+            self._sorted[(category, sort_key)] = index
+        return index
+
+    def _notify_added(self, content_ids: List[str]):
+        for listener in self.listeners:
+            try:
+                listener(content_ids)
+            except Exception as e:
+                logger.warning("Erreur dans un écouteur du catalogue de la TV %s : %s", self.ip_address, e)
+
+    def replace(self, items: List[dict]):
+        previous = self.items if self.loaded else None
+        self.items = {}
+        self.categories = {}
+        self._sorted = {}
+        for item in items:
+            self._index(item)
+        self.loaded_at = time.time()
+        if previous is not None:
+            added = [content_id for content_id in self.items if content_id not in previous]
+            if added:
+                self._notify_added(added)
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if not self.loaded:
+                await self.reconcile()
+
+    async def reconcile(self):
+        """Recharge le catalogue complet depuis la TV."""
+        start = time.time()
+        items = await self._fetch()
+        self.replace(items)
+        log_perf(logger, "ArtCatalog.reconcile", start, tv=self.ip_address, images=len(self.items))
+
+    def get(self, content_id: str) -> Optional[dict]:
+        return self.items.get(content_id)
+
+    def list(self, category: Optional[str] = None) -> List[dict]:
+        if category is None:
+            return list(self.items.values())
+        return [self.items[content_id] for content_id in self.categories.get(category, ())]
+
+    def content_ids(self, category: Optional[str] = None) -> List[str]:
+        if category is None:
+            return list(self.items)
+        return list(self.categories.get(category, ()))
+
+    def add(self, item: dict):
+        is_new = item['content_id'] not in self.items
+        self._index(item)
+        if is_new:
+            self._notify_added([item['content_id']])
+
+    def remove(self, content_id: str):
+        if content_id not in self.items:
+            return
+        for category, content_ids in self.categories.items():
+            if content_id in content_ids:
+                self._remove_sorted(category, content_id)
+                del content_ids[content_id]
+        self._remove_sorted(None, content_id)
+        del self.items[content_id]
+
+    def set_favourite(self, content_id: str, favourite: bool):
+        favourites = self.categories.setdefault(FAVOURITES_CATEGORY, {})
+        if favourite and content_id in self.items and content_id not in favourites:
+            favourites[content_id] = None
+            self._add_sorted(FAVOURITES_CATEGORY, content_id)
+        elif not favourite and content_id in favourites:
+            self._remove_sorted(FAVOURITES_CATEGORY, content_id)
+            del favourites[content_id]
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        sort: str = 'image_date',
+        descending: bool = True,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        favourite: Optional[bool] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Renvoie une page d'images à partir de l'index trié (catégorie, clé de tri).
+        Le coût d'une page dépend de sa taille et de la sélection, non du nombre d'images :
+        - favourite=True parcourt l'index des favoris (MY-C0004) plutôt que celui de la catégorie ;
+        - since / until sont résolus par dichotomie dans l'index par image_date ; pour un autre
+          tri, seules les images de l'intervalle sont triées ;
+        - le curseur est résolu par dichotomie.
+        """
+        base = FAVOURITES_CATEGORY if favourite else category
+        # Favoris d'une autre catégorie : filtrés pendant le parcours (les favoris sont peu nombreux)
+        in_category = self.categories.get(category, {}) if favourite and category not in (None, FAVOURITES_CATEGORY) else None
+        favourites = self.categories.get(FAVOURITES_CATEGORY, {})
+        if (since or until) and sort != 'image_date':
+            dates = self._get_sorted(base, 'image_date')
+            low, high = self._date_range(dates, since, until)
+            index = sorted(self._sort_entry(content_id, sort) for _, content_id in dates[low:high])
+            low, high = 0, len(index)
+        else:
+            index = self._get_sorted(base, sort)
+            low, high = self._date_range(index, since, until) if sort == 'image_date' else (0, len(index))
+        if cursor:
+            position = decode_cursor(cursor)
+            if descending:
+                high = min(high, bisect.bisect_left(index, position))
+            else:
+                low = max(low, bisect.bisect_right(index, position))
+        positions = range(high - 1, low - 1, -1) if descending else range(low, high)
+
+        page = []
+        last_entry = None
+        has_more = False
+        for position in positions:
+            entry = index[position]
+            content_id = entry[1]
+            if in_category is not None and content_id not in in_category:
+                continue
+            if favourite is False and content_id in favourites:
+                continue
+            item = self.items[content_id]
+            if len(page) == limit:
+                has_more = True
+                break
+            page.append({field: item.get(field) for field in fields} if fields else item)
+            last_entry = entry
+        return {
+            "images": page,
+            "next_cursor": encode_cursor(last_entry) if has_more else None,
+            "total": len(self.items) if category is None else len(self.categories.get(category, ()))
+        }
+
+    @staticmethod
+    def _date_range(index: List[Tuple[str, str]], since: Optional[str], until: Optional[str]) -> Tuple[int, int]:
+        """Bornes [low, high) des entrées d'un index par image_date comprises entre since et until (préfixes)."""
+        low = bisect.bisect_left(index, (since, '')) if since else 0
+        high = bisect.bisect_left(index, (until + '\uffff', '')) if until else len(index)
+        return low, max(low, high)
+
+    def on_art_event(self, event: str, response: dict):
+        """Callback SamsungTVAsyncArt : applique un événement au catalogue."""
+        if not self.loaded:
+            return
+        data = json.loads(response["data"])
+        sub_event = data.get("event")
+        if sub_event == "image_added":
+            self.add({
+                "content_id": data["content_id"],
+                "category_id": data.get("category_id", MY_PICTURES_CATEGORY),
+                "image_date": time.strftime("%Y:%m:%d %H:%M:%S")
+            })
+            # Les métadonnées complètes (taille, matte...) arrivent avec la prochaine réconciliation
+            self.schedule_reconcile()
+        elif sub_event == "image_deleted":
+            for content_id in deleted_content_ids(data):
+                self.remove(content_id)
+        elif sub_event == "favorite_changed":
+            self.set_favourite(data["content_id"], data.get("status") == "on")
+
+    def schedule_reconcile(self, delay: float = 5):
+        """Regroupe les réconciliations déclenchées par une rafale d'événements."""
+        if self._pending_reconcile:
+            self._pending_reconcile.cancel()
+        loop = asyncio.get_running_loop()
+        # Contexte vierge : la réconciliation ne s'ajoute pas à la trace de la requête en cours
+        self._pending_reconcile = loop.call_later(
+            delay, lambda: asyncio.ensure_future(self._safe_reconcile()), context=contextvars.Context()
+        )
+
+    async def _safe_reconcile(self):
+        try:
+            await self.reconcile()
+        except Exception as e:
+            logger.warning("Échec de la réconciliation du catalogue de la TV %s : %s", self.ip_address, e)
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            await self._safe_reconcile()
+
+    def start(self):
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop(), context=contextvars.Context())
+
+    async def stop(self):
+        if self._pending_reconcile:
+            self._pending_reconcile.cancel()
+            self._pending_reconcile = None
+        if self._reconcile_task and not self._reconcile_task.done():
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+        self._reconcile_task = None
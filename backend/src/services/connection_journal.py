@@ -0,0 +1,105 @@
+import collections
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger('ConnectionJournal')
+
+
+class ConnectionJournal:
+    """
+    Journal des connexions par TV : ouvertures, fermetures (demandées ou subies),
+    reconnexions et échecs, avec durées et causes, pour chaque canal : connexion
+    complète (tv, TVControl.connect), websockets remote et art, session HTTP du
+    canal art (art.session, aiohttp) et appels REST synchrones (rest, port 8001).
+    Mémoire bornée : `size` derniers événements par TV, `max_tvs` TVs au plus
+    (la moins récemment active est oubliée).
+    """
+
+    def __init__(self, size: int = 200, max_tvs: int = 64):
+        self.size = size
+        self.max_tvs = max_tvs
+        self._tvs: "collections.OrderedDict[str, dict]" = collections.OrderedDict()
+
+    def _tv(self, tv: str) -> dict:
+        entry = self._tvs.get(tv)
+        if entry is None:
+            if len(self._tvs) >= self.max_tvs:
+                self._tvs.popitem(last=False)
+            entry = self._tvs[tv] = {"events": collections.deque(maxlen=self.size), "channels": {}}
+        else:
+            self._tvs.move_to_end(tv)
+        return entry
+
+    def record(self, tv: str, channel: str, event: str, duration: Optional[float] = None,
+               cause: Optional[str] = None, **details: Any) -> dict:
+        """
+        Ajoute un événement. `event` : open, close, drop (fermeture non demandée), failure.
+        Une ouverture après une précédente sur le même canal est notée reconnect.
+        """
+        entry = self._tv(tv)
+        state = entry["channels"].setdefault(channel, {
+            "state": "closed", "since": None, "opens": 0, "reconnects": 0, "closes": 0, "drops": 0,
+            "failures": 0, "last_cause": None,
+        })
+        if event == "open":
+            if state["opens"]:
+                event = "reconnect"
+                state["reconnects"] += 1
+            state["opens"] += 1
+            state["state"] = "open"
+        elif event in ("close", "drop"):
+            state["closes" if event == "close" else "drops"] += 1
+            state["state"] = "closed"
+        elif event == "failure":
+            state["failures"] += 1
+            state["state"] = "failed"
+        now = time.time()
+        state["since"] = now
+        if cause:
+            state["last_cause"] = cause
+        record = {"ts": now, "channel": channel, "event": event}
+        if duration is not None:
+            record["duration_ms"] = round(duration * 1000, 1)
+        if cause:
+            record["cause"] = cause
+        record.update((key, value) for key, value in details.items() if value is not None)
+        entry["events"].append(record)
+        if event in ("drop", "failure"):
+            logger.warning("TV %s, canal %s : %s (%s)", tv, channel, event, cause)
+        else:
+            logger.debug("TV %s, canal %s : %s", tv, channel, event)
+        return record
+
+    def connection_event(self, tv: str, channel: str, event: str, details: Dict[str, Any]):
+        """Hook on_connection_event de samsungtvws, lié à une TV et un canal."""
+        if event == "open":
+            self.record(tv, channel, "open", details.get("duration"))
+        elif event == "failure":
+            self.record(tv, channel, "failure", details.get("duration"), details.get("error"))
+        elif event == "close":
+            code, reason = details.get("code"), details.get("reason")
+            cause = "fermeture demandée" if details.get("requested") else f"fermée par la TV ou le réseau (code {code}{', ' + reason if reason else ''})"
+            uptime = details.get("uptime")
+            self.record(tv, channel, "close" if details.get("requested") else "drop", cause=cause, code=code,
+                        uptime_s=round(uptime, 1) if uptime is not None else None)
+        elif event == "session_open":
+            self.record(tv, channel + ".session", "open")
+        elif event == "session_close":
+            self.record(tv, channel + ".session", "close", cause="fermeture demandée")
+
+    def get(self, tv: str, limit: Optional[int] = None) -> dict:
+        entry = self._tvs.get(tv)
+        if entry is None:
+            return {"channels": {}, "events": []}
+        events = list(entry["events"])
+        if limit is not None:
+            events = events[-limit:] if limit > 0 else []
+        return {
+            "channels": {channel: dict(state) for channel, state in entry["channels"].items()},
+            "events": events[::-1],
+        }
+
+
+connection_journal = ConnectionJournal(size=int(os.environ.get('CONNECTION_JOURNAL_SIZE', 200)))
@@ -0,0 +1,108 @@
+import asyncio
+import collections
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('EventBus')
+
+
+class Subscription:
+    """File d'événements d'un abonné (une TV ou toutes si tv est None), bornée : les plus anciens sont écartés."""
+
+    def __init__(self, tv: Optional[str], size: int):
+        self.tv = tv
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+    def matches(self, event: dict) -> bool:
+        return self.tv is None or event["tv"] == self.tv
+
+    def put(self, event: dict):
+        if self.queue.full():
+            # Abonné trop lent : on garde les événements récents
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Prochain événement, None après `timeout` secondes sans événement."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """
+    Diffuse les changements des TVs aux abonnés (flux SSE) sans interroger les TVs :
+    - state : champs d'état modifiés (tv_on, art_mode, current_artwork, slideshow, connected)
+    - content : image_added, image_deleted, favorite_changed
+    - connection : ouvertures, fermetures et échecs des canaux (voir ConnectionJournal)
+    L'état connu de chaque TV est conservé pour l'envoyer dès l'abonnement ; les `history`
+    derniers événements permettent de reprendre un flux après reconnexion (Last-Event-ID).
+    """
+
+    def __init__(self, queue_size: int = 256, history: int = 500):
+        self.queue_size = queue_size
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: List[Subscription] = []
+        self._history: collections.deque = collections.deque(maxlen=history)
+        self._next_id = 1
+
+    def publish(self, tv: str, event_type: str, data: Dict[str, Any]) -> dict:
+        event = {"id": self._next_id, "tv": tv, "type": event_type, "ts": time.time(), "data": data}
+        self._next_id += 1
+        self._history.append(event)
+        for subscription in self._subscribers:
+            if subscription.matches(event):
+                subscription.put(event)
+        return event
+
+    def update_state(self, tv: str, **fields) -> Optional[dict]:
+        """Met à jour l'état connu de la TV ; publie un événement state avec les seuls champs modifiés."""
+        state = self.states.setdefault(tv, {})
+        changed = {key: value for key, value in fields.items() if key not in state or state[key] != value}
+        if not changed:
+            return None
+        state.update(changed)
+        state["updated_at"] = time.time()
+        return self.publish(tv, "state", changed)
+
+    def get_state(self, tv: str) -> Dict[str, Any]:
+        return dict(self.states.get(tv, {}))
+
+    def subscribe(self, tv: Optional[str] = None, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Abonnement aux événements d'une TV (ou de toutes). Avec last_event_id, les événements
+        manqués encore en mémoire sont rejoués.
+        """
+        subscription = Subscription(tv, self.queue_size)
+        if last_event_id and last_event_id.isdigit():
+            for event in self._history:
+                if event["id"] > int(last_event_id) and subscription.matches(event):
+                    subscription.put(event)
+        self._subscribers.append(subscription)
+        logger.debug("Abonnement aux événements (%s), %d abonnés", tv or "toutes les TVs", len(self._subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+        if subscription.dropped:
+            logger.warning("Abonné %s trop lent : %d événements écartés", subscription.tv or "flotte", subscription.dropped)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def format_sse(event: dict) -> str:
+    """Événement au format text/event-stream : id, type et données JSON."""
+    data = json.dumps({"tv": event["tv"], "ts": event["ts"], **event["data"]})
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+event_bus = EventBus(queue_size=int(os.environ.get('EVENT_QUEUE_SIZE', 256)))
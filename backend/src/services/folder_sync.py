@@ -0,0 +1,378 @@
+import asyncio
+import contextvars
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+logger = logging.getLogger('FolderSync')
+
+# Constantes inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_hash(path: str) -> str:
+    """Calcule le SHA-256 d'un fichier par blocs (mémoire constante)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncManifest:
+    """
+    Manifeste persistant de la synchronisation d'un dossier vers une TV.
+    Chaque entrée est indexée par le nom du fichier source :
+    {"size", "mtime", "hash", "content_id"}, plus "stale_content_ids" : versions précédentes
+    encore sur la TV, leur suppression ayant échoué.
+    """
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        self.entries: Dict[str, dict] = {}
+        self.load()
+
+    def load(self):
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.entries.get(name)
+
+    def set(self, name: str, entry: dict):
+        self.entries[name] = entry
+
+    def remove(self, name: str) -> Optional[dict]:
+        return self.entries.pop(name, None)
+
+    def names(self) -> Set[str]:
+        return set(self.entries)
+
+
+class FolderWatcher:
+    """
+    Surveille les modifications d'un dossier (non récursif).
+    Utilise inotify sous Linux et se replie sur un polling des métadonnées sinon.
+    Les noms de fichiers modifiés sont regroupés par lots (debounce).
+    Les modifications sont relevées dès start() et mises en attente jusqu'à leur lecture par changes().
+    """
+
+    def __init__(self, folder: str, poll_interval: float = 10, debounce: float = 1):
+        self.folder = folder
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.mode = None
+        self._fd = None
+        self._pending: Set[str] = set()
+        self._overflow = False
+        self._event = asyncio.Event()
+        self._snapshot: Dict[str, tuple] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def _start_inotify(self) -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return False
+            if libc.inotify_add_watch(fd, os.fsencode(self.folder), _INOTIFY_MASK) < 0:
+                os.close(fd)
+                return False
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify indisponible, repli sur le polling : %s", e)
+            return False
+        self._fd = fd
+        asyncio.get_running_loop().add_reader(fd, self._read_inotify)
+        return True
+
+    def _read_inotify(self):
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(buffer):
+            _, mask, _, name_len = _INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += _INOTIFY_EVENT.size
+            name = buffer[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("File inotify saturée pour %s : des modifications ont été perdues", self.folder)
+                self._overflow = True
+            elif mask & IN_DELETE_SELF:
+                logger.warning("Dossier surveillé supprimé : %s", self.folder)
+            elif name:
+                self._pending.add(os.fsdecode(name))
+        if self._pending or self._overflow:
+            self._event.set()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            snapshot = await asyncio.to_thread(self._scan)
+            changed = {
+                name for name in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(name) != self._snapshot.get(name)
+            }
+            self._snapshot = snapshot
+            if changed:
+                self._pending |= changed
+                self._event.set()
+
+    async def start(self):
+        """Commence à relever les modifications : watch inotify ou instantané initial du polling."""
+        if self.mode is not None:
+            return
+        if self._start_inotify():
+            self.mode = 'inotify'
+        else:
+            self.mode = 'polling'
+            self._snapshot = await asyncio.to_thread(self._scan)
+            self._poll_task = asyncio.create_task(self._poll())
+        logger.info("Surveillance de %s en mode %s", self.folder, self.mode)
+
+    async def changes(self):
+        """
+        Itérateur asynchrone renvoyant des lots de noms de fichiers modifiés,
+        ou None si des modifications ont été perdues (file inotify saturée) :
+        une passe complète est alors nécessaire.
+        """
+        await self.start()
+        try:
+            while True:
+                await self._event.wait()
+                await asyncio.sleep(self.debounce)
+                self._event.clear()
+                overflow, self._overflow = self._overflow, False
+                batch, self._pending = self._pending, set()
+                yield None if overflow else batch
+        finally:
+            self.close()
+
+    def close(self):
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+
+class FolderSyncService:
+    """
+    Synchronise un dossier local (source de vérité) avec "Mes images" d'une TV.
+    Seuls les fichiers nouveaux ou modifiés sont envoyés, et le contenu TV dont
+    le fichier source a disparu est supprimé.
+    """
+
+    def __init__(self, tv_control, folder: str, extensions: tuple, manifest_path: Path,
+                 matte: str = "none", portrait_matte: str = "flexible_black"):
+        self.tv_control = tv_control
+        self.folder = folder
+        self.extensions = extensions
+        self.matte = matte
+        self.portrait_matte = portrait_matte
+        self.manifest = SyncManifest(manifest_path)
+        self.watcher: Optional[FolderWatcher] = None
+        self.watch_task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+        self.last_result: Optional[dict] = None
+
+    def _is_candidate(self, name: str) -> bool:
+        return name.lower().endswith(self.extensions) and not name.startswith('.')
+
+    def _list_folder(self) -> Set[str]:
+        return {name for name in os.listdir(self.folder)
+                if self._is_candidate(name) and os.path.isfile(os.path.join(self.folder, name))}
+
+    async def _sync_file(self, name: str, stats: dict):
+        path = os.path.join(self.folder, name)
+        entry = self.manifest.get(name)
+        try:
+            stat = os.stat(path) if self._is_candidate(name) else None
+        except FileNotFoundError:
+            stat = None
+
+        if stat is None:
+            if entry:
+                if entry.get("content_id"):
+                    entry["stale_content_ids"] = entry.get("stale_content_ids", []) + [entry["content_id"]]
+                    entry["content_id"] = None
+                if not await self._delete_stale(name, entry, stats):
+                    return
+                self.manifest.remove(name)
+                stats["deleted"] += 1
+            return
+
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            stats["unchanged"] += 1
+            # Anciennes versions dont la suppression avait échoué
+            await self._delete_stale(name, entry, stats)
+            return
+
+        digest = await asyncio.to_thread(file_hash, path)
+        if entry and entry["hash"] == digest:
+            entry.update(size=stat.st_size, mtime=stat.st_mtime_ns)
+            stats["unchanged"] += 1
+            await self._delete_stale(name, entry, stats)
+            return
+
+        file_type = name.split('.')[-1]
+        result = await self.tv_control.upload_photo(path, file_type, self.matte, self.portrait_matte)
+        if not result.get("success"):
+            stats["errors"].append({"filename": name, "error": result.get("error")})
+            return
+
+        new_entry = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+            "content_id": result.get("content_id"),
+        }
+        stale = entry.get("stale_content_ids", []) if entry else []
+        if entry and entry.get("content_id"):
+            # Le fichier a changé : l'ancienne version est supprimée de la TV
+            stale = stale + [entry["content_id"]]
+            stats["updated"] += 1
+        else:
+            stats["uploaded"] += 1
+        if stale:
+            new_entry["stale_content_ids"] = stale
+        self.manifest.set(name, new_entry)
+        await self._delete_stale(name, new_entry, stats)
+
+    async def _delete_stale(self, name: str, entry: dict, stats: dict) -> bool:
+        """
+        Supprime de la TV les content_id de entry["stale_content_ids"] (versions remplacées ou
+        fichier disparu). Ceux dont la suppression échoue restent dans le manifeste et seront
+        retentés à la prochaine passe. Renvoie False s'il en reste.
+        """
+        stale = entry.get("stale_content_ids")
+        if not stale:
+            return True
+        result = await self.tv_control.delete_art_images(stale)
+        if result.get("success"):
+            del entry["stale_content_ids"]
+            return True
+        outcomes = result.get("results") or {}
+        entry["stale_content_ids"] = [content_id for content_id in stale if outcomes.get(content_id) != "deleted"]
+        stats["errors"].append({
+            "filename": name,
+            "error": f"Suppression de {', '.join(entry['stale_content_ids'])} échouée : {result.get('error') or 'non confirmée par la TV'}"
+        })
+        return False
+
+    async def sync_files(self, names: Iterable[str]) -> dict:
+        """
+        Synchronise uniquement les fichiers indiqués.
+        Le coût dépend du nombre de fichiers modifiés, pas de la taille du dossier.
+        """
+        async with self.lock:
+            start = time.time()
+            stats = {"uploaded": 0, "updated": 0, "deleted": 0, "unchanged": 0, "errors": []}
+            for name in sorted(set(names)):
+                try:
+                    await self._sync_file(name, stats)
+                except Exception as e:
+                    logger.error("Erreur lors de la synchronisation de %s : %s", name, e)
+                    stats["errors"].append({"filename": name, "error": str(e)})
+            self.manifest.save()
+            stats["duration"] = round(time.time() - start, 3)
+            stats["success"] = not stats["errors"]
+            self.last_result = stats
+            logger.info(
+                "Synchronisation %s : %s ajoutée(s), %s mise(s) à jour, %s supprimée(s), %s erreur(s) en %.3fs",
+                self.tv_control.ip_address, stats['uploaded'], stats['updated'], stats['deleted'],
+                len(stats['errors']), stats['duration']
+            )
+            return stats
+
+    async def sync(self) -> dict:
+        """
+        Passe de réconciliation complète : compare le dossier au manifeste.
+        Les fichiers dont la taille et la date sont inchangées ne sont ni relus ni hachés.
+        """
+        names = await asyncio.to_thread(self._list_folder)
+        return await self.sync_files(names | self.manifest.names())
+
+    async def _watch(self):
+        watcher = self.watcher
+        try:
+            # Surveillance démarrée avant la passe complète : les modifications faites
+            # pendant celle-ci sont mises en attente puis synchronisées ensuite
+            await watcher.start()
+            await self.sync()
+            async for names in watcher.changes():
+                await (self.sync() if names is None else self.sync_files(names))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Arrêt inattendu de la surveillance de %s : %s", self.folder, e)
+        finally:
+            watcher.close()
+
+    def start_watching(self):
+        if self.watch_task and not self.watch_task.done():
+            return
+        self.watcher = FolderWatcher(self.folder)
+        # Contexte vierge : la surveillance survit à la requête qui l'a démarrée et ne s'ajoute pas à sa trace
+        self.watch_task = asyncio.create_task(self._watch(), context=contextvars.Context())
+
+    async def stop_watching(self):
+        if self.watch_task and not self.watch_task.done():
+            self.watch_task.cancel()
+            try:
+                await self.watch_task
+            except asyncio.CancelledError:
+                pass
+        self.watch_task = None
+        self.watcher = None
+
+    def get_status(self) -> dict:
+        watching = bool(self.watch_task and not self.watch_task.done())
+        return {
+            "folder": self.folder,
+            "watching": watching,
+            "watch_mode": self.watcher.mode if watching and self.watcher else None,
+            "tracked_files": len(self.manifest.entries),
+            "last_result": self.last_result,
+        }
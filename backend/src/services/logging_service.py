@@ -0,0 +1,184 @@
+import atexit
+import fnmatch
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .tracing import TraceContextFilter
+
+# Attributs standard d'un LogRecord : tout le reste vient de extra= et part dans le JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'event'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def parse_sampling(spec: str) -> List[Tuple[str, float]]:
+    """
+    Règles d'échantillonnage "motif=taux,motif=taux".
+    Le motif (fnmatch) porte sur l'événement du message : la valeur de extra={"event": ...}
+    ou, à défaut, "<logger>:<gabarit du message>" (ex. "TVControl:[PERF]*=0.1").
+    """
+    rules = []
+    for rule in filter(None, (part.strip() for part in spec.split(','))):
+        pattern, _, rate = rule.rpartition('=')
+        rules.append((pattern, min(max(float(rate), 0.0), 1.0)))
+    return rules
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Échantillonnage par événement, déterministe : un message sur 1/taux est conservé.
+    Appliqué côté producteur, un message écarté ne coûte ni formatage ni mise en file.
+    Les avertissements et erreurs ne sont jamais échantillonnés.
+    Au plus `max_keys` événements suivis (messages construits par f-string compris) :
+    au-delà, le plus ancien est oublié.
+    """
+
+    def __init__(self, rules: List[Tuple[str, float]], max_keys: int = 1024):
+        super().__init__()
+        self.rules = rules
+        self.max_keys = max_keys
+        self._periods: Dict[str, int] = {}  # événement -> période (0 = jamais conservé)
+        self._counters: Dict[str, int] = {}
+        self.dropped = 0
+
+    def _period(self, key: str) -> int:
+        period = self._periods.get(key)
+        if period is None:
+            period = 1
+            for pattern, rate in self.rules:
+                if fnmatch.fnmatchcase(key, pattern):
+                    period = round(1 / rate) if rate else 0
+                    break
+            if len(self._periods) >= self.max_keys:
+                oldest = next(iter(self._periods))
+                del self._periods[oldest]
+                self._counters.pop(oldest, None)
+            self._periods[key] = period
+        return period
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rules:
+            return True
+        key = getattr(record, 'event', None) or f"{record.name}:{record.msg}"
+        period = self._period(key)
+        if period == 1:
+            return True
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        if period and count % period == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+# Arguments qui ne peuvent pas changer entre l'appel et le formatage par le QueueListener
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui ne formate pas le message côté producteur quand ses arguments sont
+    immuables (chaînes, nombres) : le gabarit et ses arguments sont transmis tels quels et
+    formatés par le thread du QueueListener. Avec un argument modifiable (dict, liste,
+    objet d'état), le message est formaté à l'appel, sans quoi il pourrait montrer un état
+    modifié entre-temps.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        # Un dict seul en argument devient record.args : c'est l'objet de l'appelant
+        if args and (isinstance(args, dict) or not all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par message, avec les champs passés via extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        event = getattr(record, 'event', None)
+        if event:
+            entry["event"] = event
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None, sampling: Optional[str] = None):
+    """
+    Configure la journalisation de l'application (une seule fois) :
+    les handlers sont servis par un QueueListener dans un thread dédié,
+    la boucle d'événements ne fait que déposer les messages dans une file.
+    Paramètres par défaut issus de LOG_LEVEL, LOG_FORMAT (json|text) et LOG_SAMPLING.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'json')
+    sampling = sampling if sampling is not None else os.environ.get('LOG_SAMPLING', '')
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    # Informations non utilisées par les formats ci-dessus : leur collecte coûte à chaque appel
+    # (cf. "Optimization" dans le Logging HOWTO)
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+    queue_handler.addFilter(TraceContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_perf(logger: logging.Logger, operation: str, start: float, **fields):
+    """
+    Mesure de performance structurée : durée depuis start, plus les champs fournis
+    (tv, outcome...). Événement "perf.<operation>", échantillonnable via LOG_SAMPLING.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        duration = time.time() - start
+        logger.info(
+            "[PERF] %s - done in %.3fs", operation, duration,
+            extra={"event": "perf." + operation, "duration": round(duration, 3), **fields}
+        )
@@ -0,0 +1,163 @@
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger('LoopMonitor')
+
+# Le code de l'application (services, api, lib) : le premier de ses cadres en partant du haut
+# de la pile désigne l'appel bloquant, même si le blocage est au fond de requests ou de socket
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+SITE_PACKAGES = ('site-packages', 'dist-packages')
+MAX_OFFENDERS = 100
+MAX_STACK_FRAMES = 20
+MAX_SAMPLES_PER_BLOCK = 50
+
+
+def _is_app_frame(filename: str) -> bool:
+    return filename.startswith(APP_DIR) and not any(part in filename for part in SITE_PACKAGES)
+
+
+def _display_path(filename: str) -> str:
+    return os.path.relpath(filename, APP_DIR) if _is_app_frame(filename) else filename
+
+
+class LoopMonitor:
+    """
+    Mesure en continu le retard de la boucle d'événements : une tâche dort `interval`
+    et mesure l'écart au réveil. Un thread de surveillance vérifie que la tâche se réveille ;
+    tant que la boucle reste bloquée plus de `threshold`, il échantillonne la pile du thread
+    de la boucle. Chaque blocage est attribué à l'appel de l'application le plus présent dans
+    ces échantillons (fichier:ligne fonction), avec nombre, durée cumulée et maximale.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, history: int = 1200):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: collections.deque = collections.deque(maxlen=history)  # derniers retards (s)
+        self.offenders: Dict[str, dict] = {}
+        self.blocks = 0
+        self.max_lag = 0.0
+        self.started_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._samples: List[List[traceback.FrameSummary]] = []  # piles du blocage en cours
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.started_at = time.time()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="LoopMonitor")
+        self._watchdog = threading.Thread(target=self._watch, name="LoopWatchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("Surveillance de la boucle démarrée (seuil %.0f ms)", self.threshold * 1000)
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._heartbeat = time.monotonic()
+            self._record(max(0.0, loop.time() - start - self.interval))
+
+    def _watch(self):
+        # Réveils assez fréquents pour échantillonner tout blocage dépassant le seuil d'un quart
+        period = max(self.threshold / 4, 0.005)
+        while not self._stop.wait(period):
+            if time.monotonic() - self._heartbeat <= self.interval + self.threshold:
+                continue
+            if len(self._samples) < MAX_SAMPLES_PER_BLOCK:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._samples.append(traceback.extract_stack(frame))
+                del frame
+
+    def _record(self, lag: float):
+        self.lags.append(lag)
+        metrics.loop_lag(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+        samples, self._samples = self._samples, []
+        if lag < self.threshold:
+            return
+        self.blocks += 1
+        location, function, stack = "inconnu", "", None
+        if samples:
+            culprits = {}
+            for sample in samples:
+                # le cadre le plus profond du code de l'application, à défaut le plus profond de la pile
+                frame = next((frame for frame in reversed(sample) if _is_app_frame(frame.filename)), sample[-1])
+                key = f"{_display_path(frame.filename)}:{frame.lineno}"
+                count, _, _ = culprits.get(key, (0, None, None))
+                culprits[key] = (count + 1, frame.name, sample)
+            location = max(culprits, key=lambda key: culprits[key][0])
+            _, function, stack = culprits[location]
+        offender = self.offenders.get(location)
+        if offender is None:
+            if len(self.offenders) >= MAX_OFFENDERS:
+                least = min(self.offenders, key=lambda key: self.offenders[key]["count"])
+                del self.offenders[least]
+            offender = self.offenders[location] = {
+                "location": location, "function": function, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            }
+        offender["count"] += 1
+        offender["total_ms"] = round(offender["total_ms"] + lag * 1000, 1)
+        offender["max_ms"] = round(max(offender["max_ms"], lag * 1000), 1)
+        offender["last_seen"] = time.time()
+        if stack:
+            offender["stack"] = [f"{_display_path(frame.filename)}:{frame.lineno} {frame.name}" for frame in stack[-MAX_STACK_FRAMES:]]
+        logger.warning("Boucle d'événements bloquée %.0f ms par %s (%s)", lag * 1000, location, function)
+
+    def get_stats(self) -> dict:
+        lags = sorted(self.lags)
+
+        def percentile(rank):
+            return round(lags[min(len(lags) - 1, int(rank / 100 * len(lags)))] * 1000, 2) if lags else 0.0
+
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "since": self.started_at,
+            "lag_ms": {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99),
+                       "max_recent": round(lags[-1] * 1000, 2) if lags else 0.0, "max": round(self.max_lag * 1000, 2)},
+            "blocks": self.blocks,
+            "offenders": sorted(self.offenders.values(), key=lambda offender: offender["total_ms"], reverse=True),
+        }
+
+    def reset(self):
+        self.lags.clear()
+        self.offenders.clear()
+        self.blocks = 0
+        self.max_lag = 0.0
+
+
+loop_monitor = LoopMonitor(
+    interval=int(os.environ.get('LOOP_MONITOR_INTERVAL_MS', 50)) / 1000,
+    threshold=int(os.environ.get('LOOP_BLOCK_THRESHOLD_MS', 100)) / 1000
+)
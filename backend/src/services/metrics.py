@@ -0,0 +1,227 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Bornes des histogrammes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+THROUGHPUT_BUCKETS = (64 * 1024, 256 * 1024, 512 * 1024, 1024 ** 2, 2 * 1024 ** 2, 5 * 1024 ** 2, 10 * 1024 ** 2, 25 * 1024 ** 2)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    labels = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self.values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Tuple, list] = {}  # labels -> [compteurs par borne..., somme, total]
+
+    def observe(self, *labels, value: float):
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+            position = bisect.bisect_left(self.buckets, value)
+            if position < len(self.buckets):
+                series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def quantile(self, series: list, q: float) -> Optional[float]:
+        """Borne supérieure de l'intervalle contenant le quantile q (None au-delà de la dernière borne)."""
+        total = series[-1]
+        if not total:
+            return None
+        rank, cumulative = q * total, 0
+        for bound, count in zip(self.buckets, series):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return None
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, labels, 'le="%s"' % _format_value(float(bound)))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _format_labels(self.label_names, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(float(series[-2]))}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {series[-1]}")
+        return lines
+
+
+class TVMetrics:
+    """
+    Métriques des TVs, rendues au format texte Prometheus par /metrics.
+    Sert aussi de hook pour SamsungTVAsyncArt (art_request, art_pending, art_upload).
+    """
+
+    def __init__(self):
+        self.operation_duration = Histogram(
+            'samsungtv_operation_duration_seconds',
+            "Durée des opérations sur les TVs (connect, get_status, power, art_mode, list, thumbnail).",
+            ('operation', 'tv', 'outcome')
+        )
+        self.upload_throughput = Histogram(
+            'samsungtv_upload_throughput_bytes_per_second',
+            "Débit des transferts d2d d'images vers les TVs.",
+            ('tv', 'outcome'),
+            buckets=THROUGHPUT_BUCKETS
+        )
+        self.reconnects = Counter('samsungtv_reconnects_total', "Reconnexions aux TVs après une première connexion.", ('tv',))
+        self.timeouts = Counter('samsungtv_timeouts_total', "Requêtes du canal Art restées sans réponse.", ('tv', 'request'))
+        self.connection_state = Gauge(
+            'samsungtv_connection_state',
+            "État de la connexion à la TV (1 connectée, 0 déconnectée).",
+            ('tv',)
+        )
+        self.event_loop_lag = Histogram(
+            'samsungtv_event_loop_lag_seconds',
+            "Retard de réveil de la boucle d'événements (mesuré par LoopMonitor).",
+            buckets=LOOP_LAG_BUCKETS
+        )
+        self.art_request_duration = Histogram(
+            'samsungtv_art_request_duration_seconds',
+            "Aller-retour des requêtes du canal Art, par type de requête et issue (ok, timeout, error).",
+            ('request', 'tv', 'outcome')
+        )
+        self.art_pending_requests = Gauge(
+            'samsungtv_art_pending_requests',
+            "Requêtes du canal Art en attente de réponse.",
+            ('tv',)
+        )
+        self._metrics = (self.operation_duration, self.upload_throughput, self.reconnects, self.timeouts,
+                         self.connection_state, self.event_loop_lag, self.art_request_duration,
+                         self.art_pending_requests)
+
+    def observe(self, operation: str, tv: str, outcome: str, duration: float):
+        self.operation_duration.observe(operation, tv, outcome, value=duration)
+
+    def reconnect(self, tv: str):
+        self.reconnects.inc(tv)
+
+    def set_connected(self, tv: str, connected: bool):
+        self.connection_state.set(tv, value=1 if connected else 0)
+
+    def loop_lag(self, lag: float):
+        self.event_loop_lag.observe(value=lag)
+
+    # Hooks SamsungTVAsyncArt
+    def art_request(self, tv: str, request: str, outcome: str, rtt: float):
+        self.art_request_duration.observe(request or 'unknown', tv, outcome, value=rtt)
+        if outcome == "timeout":
+            self.timeouts.inc(tv, request or 'unknown')
+
+    def art_pending(self, tv: str, count: int):
+        self.art_pending_requests.set(tv, value=count)
+
+    def art_upload(self, tv: str, report: dict):
+        if report.get("throughput"):
+            self.upload_throughput.observe(tv, "ok" if report.get("content_id") else "failed", value=report["throughput"])
+        # Les timeouts de négociation sont comptés par art_request (send_image)
+        if report.get("failed_phase") in ("transfer", "confirm") and str(report.get("error")).endswith("timed out"):
+            self.timeouts.inc(tv, 'upload_' + report["failed_phase"])
+
+    def art_request_summary(self) -> Dict[str, dict]:
+        """
+        Par type de requête Art, toutes TVs confondues : nombre par issue, taux de timeout
+        et aller-retour des réponses reçues (moyenne, p50/p95/p99 par intervalle d'histogramme).
+        """
+        histogram = self.art_request_duration
+        outcomes: Dict[str, Dict[str, int]] = {}
+        successes: Dict[str, list] = {}
+        with histogram._lock:
+            for (request, tv, outcome), series in histogram.series.items():
+                counts = outcomes.setdefault(request, {"ok": 0, "timeout": 0, "error": 0})
+                counts[outcome] = counts.get(outcome, 0) + series[-1]
+                if outcome == "ok":
+                    merged = successes.setdefault(request, [0] * len(series))
+                    for index, value in enumerate(series):
+                        merged[index] += value
+        summary = {}
+        for request, counts in sorted(outcomes.items()):
+            total = sum(counts.values())
+            merged = successes.get(request)
+            rtt = None
+            if merged and merged[-1]:
+                rtt = {"mean_ms": round(merged[-2] / merged[-1] * 1000, 1)}
+                for q in (0.5, 0.95, 0.99):
+                    bound = histogram.quantile(merged, q)
+                    # None : au-delà de la dernière borne de l'histogramme
+                    rtt[f"p{round(q * 100)}_ms"] = None if bound is None else bound * 1000
+            summary[request] = {
+                "count": total,
+                "outcomes": counts,
+                "timeout_rate": round(counts["timeout"] / total, 4) if total else 0,
+                "rtt": rtt,
+            }
+        return summary
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = TVMetrics()
@@ -0,0 +1,218 @@
+import asyncio
+import collections
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from .loop_monitor import _display_path
+
+logger = logging.getLogger('Profiler')
+
+# Nom par défaut des tâches asyncio (Task-123) : remplacé par la coroutine pour regrouper les piles
+_DEFAULT_TASK_NAME = re.compile(r'^Task-\d+$')
+MAX_STACK_DEPTH = 64
+
+
+class ProfilerBusy(Exception):
+    """Un profil est déjà en cours."""
+
+
+def _short_path(filename: str) -> str:
+    """Chemin relatif au dossier de sys.path qui le contient (asyncio/events.py), sinon celui de l'application."""
+    path = _display_path(filename)
+    if path != filename:
+        return path
+    prefixes = [entry for entry in sys.path if entry and filename.startswith(entry.rstrip(os.sep) + os.sep)]
+    return os.path.relpath(filename, max(prefixes, key=len)) if prefixes else filename
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # ';' sépare les cadres dans le format replié
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{frame.f_lineno})".replace(';', ',')
+
+
+def _is_handle_run(frame) -> bool:
+    """Handle._run d'asyncio : les cadres suivants sont ceux de la tâche en cours."""
+    code = frame.f_code
+    return code.co_name == '_run' and code.co_filename.endswith(os.path.join('asyncio', 'events.py'))
+
+
+def _task_label(task: asyncio.Task) -> str:
+    name = task.get_name()
+    if _DEFAULT_TASK_NAME.match(name):
+        coro = task.get_coro()
+        name = getattr(coro, '__qualname__', None) or type(coro).__name__
+    return "task " + name.replace(';', ',')
+
+
+def _thread_cpu_clock(thread_id: int) -> Optional[int]:
+    """Horloge CPU du thread (Unix), None si indisponible."""
+    try:
+        return time.pthread_getcpuclockid(thread_id)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class SamplingProfiler:
+    """
+    Profileur par échantillonnage : un thread relève la pile de chaque thread du processus
+    toutes les `interval` secondes, pendant `duration` secondes au plus `max_duration`.
+    Sur le thread de la boucle d'événements, la tâche asyncio en cours apparaît comme un cadre
+    "task <nom>" au-dessus de sa coroutine.
+    En mode "cpu", seuls les threads dont l'horloge CPU a avancé depuis l'échantillon précédent
+    sont comptés (attente réseau et select exclus) ; en mode "wall", tous les échantillons.
+    Le résultat est au format replié (collapsed stacks) de flamegraph.pl et speedscope.
+    Un seul profil à la fois : le coût reste borné, l'application n'est jamais arrêtée.
+    """
+
+    def __init__(self, max_duration: float = 30.0, min_interval: float = 0.001):
+        self.max_duration = max_duration
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self.last_profile: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, duration: float, interval: float = 0.01, mode: str = 'wall') -> dict:
+        """
+        Profile le processus pendant `duration` secondes. Lève ProfilerBusy si un profil est en cours.
+        Si l'appelant est annulé, l'échantillonnage s'arrête au prochain échantillon ; le verrou
+        n'est libéré que par le thread d'échantillonnage, à sa sortie.
+        """
+        if mode not in ('wall', 'cpu'):
+            raise ValueError(f"Mode inconnu : {mode} (wall, cpu)")
+        if not (math.isfinite(duration) and math.isfinite(interval)):
+            raise ValueError("duration et interval doivent être des nombres finis")
+        interval = min(max(interval, self.min_interval), self.max_duration)
+        duration = min(max(duration, interval), self.max_duration)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._run, args=(done, stop, loop, threading.get_ident(), duration, interval, mode),
+            name="profiler", daemon=True
+        )
+        try:
+            thread.start()
+        except BaseException:
+            self._lock.release()
+            raise
+        logger.info("Profil %s démarré pour %.1fs (intervalle %.0f ms)", mode, duration, interval * 1000)
+        try:
+            result = await done
+        except asyncio.CancelledError:
+            stop.set()
+            logger.info("Profil interrompu : appelant annulé")
+            raise
+        logger.info("Profil terminé : %d échantillons, %d piles distinctes", result["samples"], len(result["stacks"]))
+        self.last_profile = result
+        return result
+
+    def _run(self, done: asyncio.Future, stop: threading.Event, loop: asyncio.AbstractEventLoop, *args):
+        """Corps du thread d'échantillonnage : libère le verrou en sortant, puis transmet le résultat."""
+        result, error = None, None
+        try:
+            result = self._sample(stop, loop, *args)
+        except BaseException as e:
+            error = e
+        finally:
+            self._lock.release()
+
+        def resolve():
+            if done.done():  # appelant annulé
+                return
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(result)
+        try:
+            loop.call_soon_threadsafe(resolve)
+        except RuntimeError:  # boucle fermée
+            pass
+
+    def _sample(self, stop: threading.Event, loop: asyncio.AbstractEventLoop, loop_thread_id: int,
+                duration: float, interval: float, mode: str) -> dict:
+        own_id = threading.get_ident()
+        stacks: Dict[str, int] = collections.Counter()
+        cpu_clocks: Dict[int, Optional[int]] = {}
+        cpu_last: Dict[int, float] = {}
+        samples = 0
+        sampling_time = 0.0
+        start = time.monotonic()
+        deadline = start + duration
+        next_tick = start
+        while not stop.is_set():
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now < next_tick:
+                if stop.wait(min(next_tick, deadline) - now):
+                    break
+                continue
+            next_tick += interval
+            tick = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            task = asyncio.current_task(loop)
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if mode == 'cpu' and not self._on_cpu(thread_id, cpu_clocks, cpu_last):
+                    continue
+                frames = []
+                task_depth = None
+                while frame is not None and len(frames) < MAX_STACK_DEPTH:
+                    if task_depth is None and _is_handle_run(frame):
+                        task_depth = len(frames)
+                    frames.append(_frame_label(frame))
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread {thread_id}").replace(';', ','))
+                if thread_id == loop_thread_id and task is not None:
+                    # la tâche s'intercale entre la boucle (Handle._run) et sa coroutine
+                    frames.insert(task_depth if task_depth is not None else len(frames) - 1, _task_label(task))
+                stacks[';'.join(reversed(frames))] += 1
+            samples += 1
+            sampling_time += time.perf_counter() - tick
+        elapsed = time.monotonic() - start
+        return {
+            "mode": mode,
+            "duration_s": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "samples": samples,
+            # part du temps passé à échantillonner, tenant le GIL
+            "overhead": round(sampling_time / elapsed, 4) if elapsed else 0.0,
+            "started_at": time.time() - elapsed,
+            "stacks": dict(stacks.most_common()),
+        }
+
+    @staticmethod
+    def _on_cpu(thread_id: int, clocks: Dict[int, Optional[int]], last: Dict[int, float]) -> bool:
+        if thread_id not in clocks:
+            clocks[thread_id] = _thread_cpu_clock(thread_id)
+        clock = clocks[thread_id]
+        if clock is None:
+            return True
+        try:
+            cpu = time.clock_gettime(clock)
+        except OSError:  # thread terminé
+            return False
+        previous = last.get(thread_id)
+        last[thread_id] = cpu
+        return previous is not None and cpu > previous
+
+    @staticmethod
+    def collapsed(profile: dict) -> str:
+        """Profil au format replié : une pile par ligne, cadres séparés par ';', suivie du nombre d'échantillons."""
+        return ''.join(f"{stack} {count}\n" for stack, count in profile["stacks"].items())
+
+
+profiler = SamplingProfiler(max_duration=float(os.environ.get('PROFILER_MAX_DURATION', 30)))
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger('ThumbnailCache')
+
+DEFAULT_MEMORY_LIMIT = 32 * 1024 * 1024  # octets
+DEFAULT_DISK_LIMIT = 512 * 1024 * 1024  # octets
+
+
+def guess_content_type(data: bytes) -> str:
+    if data.startswith(b'\x89PNG'):
+        return 'image/png'
+    return 'image/jpeg'
+
+
+class Thumbnail:
+    __slots__ = ('data', 'etag', 'content_type')
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+        self.content_type = guess_content_type(data)
+
+
+class ThumbnailCache:
+    """
+    Cache des miniatures à deux niveaux, indexé par (TV, content_id) :
+    un LRU en mémoire borné en octets, puis un répertoire sur disque borné en taille
+    (éviction des fichiers les moins récemment utilisés).
+    """
+
+    def __init__(self, cache_dir: Path, memory_limit: int = DEFAULT_MEMORY_LIMIT, disk_limit: int = DEFAULT_DISK_LIMIT):
+        self.cache_dir = Path(cache_dir)
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory: OrderedDict = OrderedDict()  # clé -> Thumbnail
+        self._memory_size = 0
+        self._disk: OrderedDict = OrderedDict()  # chemin -> taille, du moins au plus récemment utilisé
+        self._disk_size = 0
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load_disk_index()
+
+    def _load_disk_index(self):
+        files = []
+        for path in self.cache_dir.glob('*/*'):
+            if path.suffix == '.tmp':
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, str(path), stat.st_size))
+        for _, path, size in sorted(files):
+            self._disk[path] = size
+            self._disk_size += size
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        ip_address, content_id = key
+        return str(self.cache_dir / ip_address.replace('.', '_') / content_id)
+
+    def _remember(self, key: Tuple[str, str], thumbnail: Thumbnail):
+        previous = self._memory.pop(key, None)
+        if previous:
+            self._memory_size -= len(previous.data)
+        self._memory[key] = thumbnail
+        self._memory_size += len(thumbnail.data)
+        while self._memory_size > self.memory_limit and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.data)
+
+    def contains(self, ip_address: str, content_id: str) -> bool:
+        key = (ip_address, content_id)
+        return key in self._memory or self._path(key) in self._disk
+
+    async def get(self, ip_address: str, content_id: str) -> Optional[Thumbnail]:
+        key = (ip_address, content_id)
+        thumbnail = self._memory.get(key)
+        if thumbnail:
+            self._memory.move_to_end(key)
+            self.hits["memory"] += 1
+            return thumbnail
+        path = self._path(key)
+        if path in self._disk:
+            try:
+                data = await asyncio.to_thread(Path(path).read_bytes)
+            except OSError:
+                self._forget_disk(path)
+            else:
+                self._disk.move_to_end(path)
+                thumbnail = Thumbnail(data)
+                self._remember(key, thumbnail)
+                self.hits["disk"] += 1
+                return thumbnail
+        self.misses += 1
+        return None
+
+    async def put(self, ip_address: str, content_id: str, data: bytes) -> Thumbnail:
+        key = (ip_address, content_id)
+        thumbnail = Thumbnail(data)
+        self._remember(key, thumbnail)
+        path = self._path(key)
+        try:
+            await asyncio.to_thread(self._write, path, data)
+        except OSError as e:
+            logger.warning("Impossible d'écrire la miniature %s sur disque : %s", content_id, e)
+            return thumbnail
+        self._forget_disk(path)
+        self._disk[path] = len(data)
+        self._disk_size += len(data)
+        evicted = []
+        while self._disk_size > self.disk_limit and len(self._disk) > 1:
+            old_path, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            evicted.append(old_path)
+        if evicted:
+            await asyncio.to_thread(self._unlink, evicted)
+        return thumbnail
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _unlink(paths):
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _forget_disk(self, path: str):
+        size = self._disk.pop(path, None)
+        if size is not None:
+            self._disk_size -= size
+
+    def invalidate(self, ip_address: str, content_id: str):
+        key = (ip_address, content_id)
+        thumbnail = self._memory.pop(key, None)
+        if thumbnail:
+            self._memory_size -= len(thumbnail.data)
+        path = self._path(key)
+        if path in self._disk:
+            self._forget_disk(path)
+            self._unlink([path])
+
+    def get_stats(self) -> dict:
+        return {
+            "memory": {"entries": len(self._memory), "bytes": self._memory_size, "limit": self.memory_limit},
+            "disk": {"entries": len(self._disk), "bytes": self._disk_size, "limit": self.disk_limit},
+            "hits": self.hits,
+            "misses": self.misses
+        }
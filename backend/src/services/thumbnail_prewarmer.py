@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger('ThumbnailPrewarmer')
+
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_BANDWIDTH = 256 * 1024  # octets/s
+IDLE_CHECK_INTERVAL = 0.5  # secondes
+
+
+class ThumbnailPrewarmer:
+    """
+    Préchauffe en tâche de fond le cache des miniatures d'une TV pour les
+    nouvelles images du catalogue (upload, synchronisation de dossier...).
+    Basse priorité : les lots (get_thumbnail_list) ne partent que lorsque le
+    canal Art est inactif, et le débit moyen reste sous le budget de la TV.
+    """
+
+    def __init__(self, tv_control, batch_size: int = DEFAULT_BATCH_SIZE, bandwidth: int = DEFAULT_BANDWIDTH):
+        self.tv_control = tv_control
+        self.batch_size = batch_size
+        self.bandwidth = bandwidth
+        self.pending: Dict[str, None] = {}  # ensemble ordonné de content_id à préchauffer
+        self.worker: Optional[asyncio.Task] = None
+        self.warmed = 0
+        self.bytes = 0
+        self.yielded = 0
+
+    def enqueue(self, content_ids: Iterable[str]):
+        """Callback du catalogue : nouvelles images à préchauffer."""
+        for content_id in content_ids:
+            self.pending[content_id] = None
+        if self.pending and (self.worker is None or self.worker.done()):
+            # Contexte vierge : le préchauffage ne s'ajoute pas à la trace de la requête qui l'a déclenché
+            self.worker = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    def discard(self, content_ids: Iterable[str]):
+        for content_id in content_ids:
+            self.pending.pop(content_id, None)
+
+    async def _wait_idle(self):
+        while self.tv_control.art_busy():
+            self.yielded += 1
+            await asyncio.sleep(IDLE_CHECK_INTERVAL)
+
+    def _next_batch(self) -> list:
+        cache = self.tv_control.thumbnail_cache
+        batch = []
+        while self.pending and len(batch) < self.batch_size:
+            content_id = next(iter(self.pending))
+            del self.pending[content_id]
+            if not cache.contains(self.tv_control.ip_address, content_id):
+                batch.append(content_id)
+        return batch
+
+    async def _run(self):
+        try:
+            while self.pending:
+                await self._wait_idle()
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                start = time.time()
+                size = 0
+                async for _, thumbnail in self.tv_control.iter_thumbnails(batch):
+                    size += len(thumbnail.data)
+                    self.warmed += 1
+                self.bytes += size
+                duration = time.time() - start
+                logger.debug("[PERF] Préchauffage de %s miniatures (%s octets) sur %s en %.3fs", len(batch), size, self.tv_control.ip_address, duration)
+                # Respect du budget de débit : pause proportionnelle au volume transféré
+                await asyncio.sleep(max(size / self.bandwidth - duration, 0))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Arrêt du préchauffage des miniatures de la TV %s : %s", self.tv_control.ip_address, e)
+
+    def get_status(self) -> dict:
+        return {
+            "running": bool(self.worker and not self.worker.done()),
+            "pending": len(self.pending),
+            "warmed": self.warmed,
+            "bytes": self.bytes,
+            "yielded": self.yielded,
+            "bandwidth": self.bandwidth
+        }
+
+    async def stop(self):
+        self.pending.clear()
+        if self.worker and not self.worker.done():
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+        self.worker = None
@@ -0,0 +1,280 @@
+import collections
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('Tracing')
+
+# traceparent W3C : version-traceid-parentid-flags
+_TRACEPARENT = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """
+    Étape chronométrée d'une trace, au format des spans OpenTelemetry
+    (traceId, spanId, parentSpanId, horodatages en nanosecondes, attributs, statut).
+    """
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes',
+                 'status', 'status_message', 'token')
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = 'UNSET'
+        self.status_message = ''
+        self.token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.status = 'ERROR'
+        self.status_message = message
+
+    def end(self, error: Optional[BaseException] = None):
+        if self.end_ns is not None:
+            return
+        if error is not None:
+            self.status = 'ERROR'
+            self.status_message = f"{type(error).__name__}: {error}"
+        elif self.status == 'UNSET':
+            self.status = 'OK'
+        self.end_ns = time.time_ns()
+        self.tracer.export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "STATUS_CODE_" + self.status, "message": self.status_message},
+        }
+
+
+class _NoopSpan:
+    """Span hors trace : rien n'est enregistré."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+    def end(self, error: Optional[BaseException] = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _result_error(result) -> Optional[str]:
+    """Erreur portée par un résultat de service : {"success": False, "error": ...}, {"error": ...} ou (False, message)."""
+    if isinstance(result, tuple) and len(result) == 2 and result[0] is False:
+        return str(result[1])
+    if isinstance(result, dict) and (result.get("success") is False or ("error" in result and "success" not in result)):
+        return str(result.get("error"))
+    return None
+
+
+class _FileExporter:
+    """Écrit les spans terminés en JSON, une ligne par span, depuis un thread dédié."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        threading.Thread(target=self._run, name='TraceExporter', daemon=True).start()
+
+    def put(self, span: dict):
+        self._queue.put(span)
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            while not self._queue.empty():
+                spans.append(self._queue.get())
+            try:
+                with open(self.path, 'a') as f:
+                    f.writelines(json.dumps(span, default=str) + '\n' for span in spans)
+            except OSError as e:
+                logger.warning("Écriture des traces impossible dans %s: %s", self.path, e)
+
+
+class Tracer:
+    """
+    Traces par requête : la route ouvre la trace (start_trace), chaque couche ajoute ses
+    spans (span / traced), la bibliothèque samsungtvws reçoit le tracer en hook
+    (start_span, appelé hors trace il ne coûte rien).
+    Les spans terminés vont dans un tampon circulaire en mémoire et, si TRACE_FILE
+    est défini, dans un fichier JSON lines.
+    """
+
+    def __init__(self, buffer_size: int = 5000, path: Optional[str] = None):
+        self.spans: collections.deque = collections.deque(maxlen=buffer_size)
+        self._exporter = _FileExporter(path) if path else None
+
+    # Création des spans
+    def start_trace(self, name: str, request_id: Optional[str] = None, traceparent: Optional[str] = None,
+                    **attributes) -> Span:
+        """Span racine d'une requête, rendu courant. À terminer avec end_trace."""
+        match = _TRACEPARENT.match(traceparent or '')
+        trace_id, parent_id = match.groups() if match else (uuid.uuid4().hex, None)
+        request_id = request_id or trace_id
+        span = Span(self, name, trace_id, parent_id, dict(attributes, **{"request.id": request_id}))
+        span.token = _current_span.set(span)
+        return span
+
+    def end_trace(self, span: Span, error: Optional[BaseException] = None):
+        span.end(error)
+        if span.token is not None:
+            try:
+                _current_span.reset(span.token)
+            except ValueError:  # contexte différent (réponse en streaming)
+                pass
+            span.token = None
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """Span enfant du span courant, sans le rendre courant (hook de la bibliothèque)."""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Span enfant du span courant, courant pendant le bloc."""
+        span = self.start_span(name, attributes)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def traced(self, name: str):
+        """
+        Décorateur de méthode async : un span par appel, avec la TV (ip_address) en attribut.
+        Un résultat d'échec (voir _result_error) passe le span en erreur.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(self_, *args, **kwargs):
+                attributes = {}
+                tv = getattr(self_, 'ip_address', None) or (args[0] if args and isinstance(args[0], str) else None)
+                if tv:
+                    attributes["tv"] = tv
+                with self.span(name, **attributes) as span:
+                    result = await func(self_, *args, **kwargs)
+                    error = _result_error(result)
+                    if error is not None:
+                        span.set_error(error)
+                    return result
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    # Export et consultation
+    def export(self, span: Span):
+        self.spans.append(span)
+        if self._exporter:
+            self._exporter.put(span.to_dict())
+
+    def get_traces(self, limit: int = 50) -> List[dict]:
+        """Dernières traces terminées (span racine), de la plus récente à la plus ancienne."""
+        roots = [span for span in reversed(self.spans) if "request.id" in span.attributes]
+        return [
+            {
+                "trace_id": span.trace_id,
+                "request_id": span.attributes["request.id"],
+                "name": span.name,
+                "status": span.status,
+                "duration_ms": round(span.duration_ms, 3),
+                "start": span.start_ns / 1e9,
+            }
+            for span in roots[:limit]
+        ]
+
+    def get_waterfall(self, trace_or_request_id: str) -> Optional[dict]:
+        """Spans d'une trace, dans l'ordre de début, avec décalage et profondeur."""
+        trace_id = next(
+            (span.trace_id for span in self.spans
+             if span.trace_id == trace_or_request_id or span.attributes.get("request.id") == trace_or_request_id),
+            None
+        )
+        if trace_id is None:
+            return None
+        spans = sorted((span for span in self.spans if span.trace_id == trace_id), key=lambda span: span.start_ns)
+        parents = {span.span_id: span.parent_id for span in spans}
+        origin = spans[0].start_ns
+
+        def depth(span_id):
+            level = 0
+            while parents.get(span_id) in parents:
+                span_id = parents[span_id]
+                level += 1
+            return level
+
+        return {
+            "trace_id": trace_id,
+            "duration_ms": round(max((span.end_ns or origin) - origin for span in spans) / 1e6, 3),
+            "spans": [
+                dict(span.to_dict(), depth=depth(span.span_id),
+                     offset_ms=round((span.start_ns - origin) / 1e6, 3), duration_ms=round(span.duration_ms, 3))
+                for span in spans
+            ],
+        }
+
+
+class TraceContextFilter(logging.Filter):
+    """Ajoute trace_id et span_id aux messages émis pendant une trace."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+tracer = Tracer(
+    buffer_size=int(os.environ.get('TRACE_BUFFER_SIZE', 5000)),
+    path=os.environ.get('TRACE_FILE') or None
+)
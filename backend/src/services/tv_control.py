@@ -1,27 +1,35 @@
 import json
 import logging
 import asyncio
+import contextvars
+import functools
 import socket
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pathlib import Path
 from lib.samsungtvws.async_remote import SamsungTVWSAsyncRemote
 from lib.samsungtvws.rest import SamsungTVRest
 from lib.samsungtvws.remote import SendRemoteKey
 from lib.samsungtvws.async_art import SamsungTVAsyncArt
+from .upload_queue import UploadQueue
+from .art_catalog import ArtCatalog, MY_PICTURES_CATEGORY, deleted_content_ids
+from .thumbnail_cache import Thumbnail, ThumbnailCache
+from .thumbnail_prewarmer import ThumbnailPrewarmer, DEFAULT_BANDWIDTH as DEFAULT_PREWARM_BANDWIDTH
+from .logging_service import log_perf
+from .connection_journal import connection_journal
+from .event_bus import event_bus
+from .metrics import metrics
+from .tracing import tracer
 import time
 import random
 
-# Configuration des logs
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('TVControl')
 
 class TVControl:
     _slideshow_task = None  # Singleton pour la tâche de diaporama
 
-    def __init__(self, ip_address: str, port: int = 8002, token_file: Optional[str] = None):
+    def __init__(self, ip_address: str, port: int = 8002, token_file: Optional[str] = None,
+                 thumbnail_cache: Optional[ThumbnailCache] = None, prewarm_bandwidth: int = DEFAULT_PREWARM_BANDWIDTH,
+                 art_request_timeouts: Optional[Dict[str, float]] = None):
         self.ip_address = ip_address
         self.port = port
         self.tv: Optional[SamsungTVWSAsyncRemote] = None
@@ -32,6 +40,17 @@ class TVControl:
         self.token_file = str(token_file)
         self._stop_slideshow = False  # Flag pour arrêter le diaporama
         self.slideshow_task = None  # Tâche de diaporama
+        self.upload_queue = UploadQueue(ip_address, self._upload_now)  # Uploads sérialisés
+        self.catalog = ArtCatalog(ip_address, self._fetch_catalog)  # Catalogue des œuvres en mémoire
+        if thumbnail_cache is None:
+            thumbnail_cache = ThumbnailCache(Path(__file__).parent.parent / 'config' / 'thumbnails')
+        self.thumbnail_cache = thumbnail_cache
+        self._thumbnail_fetches: Dict[str, asyncio.Future] = {}  # Téléchargements de miniatures en cours
+        self.prewarmer = ThumbnailPrewarmer(self, bandwidth=prewarm_bandwidth)
+        self._connected_once = False  # Les connexions suivantes sont comptées comme reconnexions
+        self._rest_failed = False  # Le prochain appel REST réussi est journalisé comme reconnexion
+        self.art_request_timeouts = art_request_timeouts or {}  # Timeouts par type de requête Art
+        self.catalog.listeners.append(self.prewarmer.enqueue)
 
     def _check_network_connectivity(self) -> tuple[bool, str]:
         """
@@ -60,18 +79,22 @@ class TVControl:
         except Exception as e:
             return False, f"Erreur lors de la connexion à la TV: {str(e)}"
 
+    @tracer.traced("TVControl.connect")
     async def connect(self) -> tuple[bool, str]:
         start = time.time()
-        logger.info(f"[PERF] TVControl.connect({self.ip_address}) - start")
+        logger.debug("[PERF] TVControl.connect(%s) - start", self.ip_address)
         try:
-            logger.info(f"Tentative de connexion à la TV {self.ip_address}:{self.port}")
+            logger.info("Tentative de connexion à la TV %s:%s", self.ip_address, self.port)
             
             # Vérification de la connectivité réseau
-            success, error_msg = self._check_network_connectivity()
+            with tracer.span("TVControl.check_network"):
+                success, error_msg = self._check_network_connectivity()
             if not success:
                 logger.error(error_msg)
-                duration = time.time() - start
-                logger.info(f"[PERF] TVControl.connect({self.ip_address}) - done in {duration:.3f}s (FAILED)")
+                log_perf(logger, "TVControl.connect", start, tv=self.ip_address, outcome="failed")
+                self._observe("connect", start, "failed")
+                connection_journal.record(self.ip_address, "tv", "failure", time.time() - start, error_msg)
+                event_bus.update_state(self.ip_address, connected=False)
                 return False, error_msg
             
             # Créer l'instance pour les commandes
@@ -81,26 +104,47 @@ class TVControl:
                 token_file=self.token_file,
                 name="Samsung TV Controller"
             )
-            await self.tv.start_listening()
+            self.tv.on_connection_event = functools.partial(self._on_connection_event, "remote")
+            with tracer.span("TVControl.open_remote"):
+                await self.tv.start_listening()
             
             # Créer l'instance pour l'état
             self.tv_rest = SamsungTVRest(
                 host=self.ip_address,
                 port=8001  # Port REST différent
             )
+            connection_journal.record(self.ip_address, "rest", "open")
+            self._rest_failed = False
             
             # Créer l'instance pour le mode art
             self.tv_art = SamsungTVAsyncArt(
                 host=self.ip_address,
                 token_file=self.token_file,
-                port=self.port
+                port=self.port,
+                metrics=metrics,
+                tracer=tracer,
+                request_timeouts=self.art_request_timeouts
             )
-            await self.tv_art.start_listening()
+            self.tv_art.on_connection_event = functools.partial(self._on_connection_event, "art")
+            with tracer.span("TVControl.open_art"):
+                await self.tv_art.start_listening()
+            for art_event in ("image_added", "image_deleted", "favorite_changed"):
+                self.tv_art.set_callback(art_event, self._on_art_event)
+            self.tv_art.set_callback("*", self._publish_art_event)
+            if self.catalog.loaded:
+                # Des événements ont pu être manqués pendant la déconnexion
+                self.catalog.schedule_reconcile(0)
             
             # On attend un peu pour s'assurer que la connexion est bien établie
             logger.info("Connexion établie avec succès")
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.connect({self.ip_address}) - done in {duration:.3f}s")
+            if self._connected_once:
+                metrics.reconnect(self.ip_address)
+            self._connected_once = True
+            metrics.set_connected(self.ip_address, True)
+            log_perf(logger, "TVControl.connect", start, tv=self.ip_address)
+            self._observe("connect", start, "ok")
+            connection_journal.record(self.ip_address, "tv", "open", time.time() - start)
+            event_bus.update_state(self.ip_address, connected=True)
             return True, ""
         except Exception as e:
             error_msg = str(e)
@@ -108,37 +152,146 @@ class TVControl:
                 error_msg = f"La TV n'est pas accessible sur le réseau actuel. Vérifiez que vous êtes sur le même sous-réseau que la TV ({self.ip_address})"
             elif "ms.channel.timeOut" in error_msg:
                 error_msg = f"La TV Samsung a rejeté la connexion. Les TV Samsung exigent d'être sur exactement le même sous-réseau (même si un ping fonctionne). Vérifiez que votre appareil est sur le même sous-réseau que la TV ({self.ip_address})"
-            logger.error(f"Erreur lors de la connexion: {error_msg}")
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.connect({self.ip_address}) - done in {duration:.3f}s (FAILED)")
+            logger.error("Erreur lors de la connexion: %s", error_msg)
+            log_perf(logger, "TVControl.connect", start, tv=self.ip_address, outcome="failed")
+            self._observe("connect", start, "failed")
+            connection_journal.record(self.ip_address, "tv", "failure", time.time() - start, error_msg)
+            event_bus.update_state(self.ip_address, connected=False)
             return False, error_msg
 
+    async def _art_supported(self) -> bool:
+        with tracer.span("TVControl.art_supported"):
+            return await self.tv_art.supported()
+
+    def _rest(self, method: str):
+        """Appel REST synchrone (port 8001), les échecs et le rétablissement sont journalisés."""
+        start = time.time()
+        try:
+            result = getattr(self.tv_rest, method)()
+        except Exception as e:
+            self._rest_failed = True
+            connection_journal.record(self.ip_address, "rest", "failure", time.time() - start, f"{method}: {e}")
+            raise
+        if self._rest_failed:
+            self._rest_failed = False
+            connection_journal.record(self.ip_address, "rest", "open", time.time() - start)
+        return result
+
+    def get_connection_state(self) -> dict:
+        """État instantané des canaux, à rapprocher du journal des connexions."""
+        return {
+            "remote": "open" if self.tv and self.tv.is_alive() else "closed",
+            "art": "open" if self.tv_art and self.tv_art.is_alive() else "closed",
+            "art_pending_requests": len(self.tv_art.pending_requests) if self.tv_art else 0,
+            "rest": "failed" if self._rest_failed else ("open" if self.tv_rest else "closed"),
+        }
+
+    def get_frames(self, limit: Optional[int] = None) -> dict:
+        """Dernières trames websocket de chaque canal et derniers timeouts du canal art avec leurs trames."""
+        channels = {}
+        for channel, connection in (("remote", self.tv), ("art", self.tv_art)):
+            if connection:
+                channels[channel] = connection.recorder.dump(limit)
+        return {
+            "channels": channels,
+            "art_timeouts": list(self.tv_art.timeouts) if self.tv_art else [],
+        }
+
+    def _observe(self, operation: str, start: float, outcome: str):
+        metrics.observe(operation, self.ip_address, outcome, time.time() - start)
+        if operation == "connect" and outcome == "failed":
+            metrics.set_connected(self.ip_address, False)
+
+    def _on_art_event(self, event, response):
+        self.catalog.on_art_event(event, response)
+        data = json.loads(response["data"])
+        if data.get("event") == "image_deleted":
+            content_ids = deleted_content_ids(data)
+            self.prewarmer.discard(content_ids)
+            for content_id in content_ids:
+                self.thumbnail_cache.invalidate(self.ip_address, content_id)
+
+    def _on_connection_event(self, channel: str, event: str, details: dict):
+        """Hook on_connection_event des canaux remote et art : journal des connexions et flux d'événements."""
+        connection_journal.connection_event(self.ip_address, channel, event, details)
+        event_bus.publish(self.ip_address, "connection", dict(details, channel=channel, event=event))
+        if channel == "art" and event in ("open", "close", "failure"):
+            # Le canal art porte les événements de la TV : sans lui, l'état publié n'est plus suivi
+            event_bus.update_state(self.ip_address, connected=event == "open")
+
+    def _publish_art_event(self, event, response):
+        """Callback "*" du canal art : changements d'état et de contenu publiés aux abonnés (SSE)."""
+        data = json.loads(response["data"])
+        sub_event = data.get("event", "")
+        if sub_event in ("artmode_status", "art_mode_changed"):
+            event_bus.update_state(self.ip_address, art_mode=self.tv_art.art_mode)
+        elif sub_event == "go_to_standby":
+            event_bus.update_state(self.ip_address, tv_on=False, art_mode=False)
+        elif "wakeup" in sub_event:
+            event_bus.update_state(self.ip_address, tv_on=True)
+        elif sub_event == "image_selected":
+            event_bus.update_state(self.ip_address, current_artwork=data.get("content_id"))
+        elif sub_event in ("image_added", "image_deleted", "favorite_changed"):
+            content_ids = deleted_content_ids(data) if sub_event == "image_deleted" else [data.get("content_id")]
+            content = {"event": sub_event, "content_ids": content_ids}
+            if sub_event == "favorite_changed":
+                content["favourite"] = data.get("status") == "on"
+            event_bus.publish(self.ip_address, "content", content)
+
+    async def listen_events(self) -> bool:
+        """
+        Garde le canal art ouvert pour recevoir les événements de la TV (flux SSE),
+        en le rouvrant s'il a été fermé. Aucune requête tant qu'il reste ouvert.
+        """
+        if self.tv_art and self.tv_art.is_alive():
+            return True
+        success, _ = await self.ensure_connected()
+        if not success:
+            return False
+        try:
+            await self.tv_art.start_listening()
+            return True
+        except Exception as e:
+            logger.warning("Canal art indisponible pour les événements de %s: %s", self.ip_address, e)
+            return False
+
+    async def get_current_artwork(self) -> Optional[str]:
+        """content_id de l'œuvre affichée, None si la TV ne répond pas."""
+        try:
+            await self.tv_art.start_listening()
+            return (await self.tv_art.get_current()).get("content_id")
+        except Exception as e:
+            logger.warning("Œuvre affichée inconnue pour %s: %s", self.ip_address, e)
+            return None
+
     async def disconnect(self):
         if self.tv:
             try:
                 await self.tv.close()
                 logger.info("Déconnexion réussie")
             except Exception as e:
-                logger.error(f"Erreur lors de la déconnexion: {e}")
+                logger.error("Erreur lors de la déconnexion: %s", e)
         if self.tv_art:
             try:
                 await self.tv_art.close()
                 logger.info("Déconnexion du mode art réussie")
             except Exception as e:
-                logger.error(f"Erreur lors de la déconnexion du mode art: {e}")
+                logger.error("Erreur lors de la déconnexion du mode art: %s", e)
+        metrics.set_connected(self.ip_address, False)
 
     async def ensure_connected(self) -> tuple[bool, str]:
         if not self.tv or not self.tv_rest or not self.tv_art:
             return await self.connect()
         return True, ""
 
+    @tracer.traced("TVControl.get_status")
     async def get_status(self) -> Dict[str, Any]:
         start = time.time()
-        logger.info(f"[PERF] TVControl.get_status({self.ip_address}) - start")
+        logger.debug("[PERF] TVControl.get_status(%s) - start", self.ip_address)
         success, error_msg = await self.ensure_connected()
         if not success:
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.get_status({self.ip_address}) - done in {duration:.3f}s (FAILED)")
+            log_perf(logger, "TVControl.get_status", start, tv=self.ip_address, outcome="failed")
+            self._observe("get_status", start, "failed")
             return {
                 "success": False, 
                 "error": error_msg,
@@ -147,7 +300,8 @@ class TVControl:
 
         try:
             # Récupération des informations détaillées de la TV
-            device_info = self.tv_rest.rest_device_info()
+            with tracer.span("TVControl.rest_device_info"):
+                device_info = self._rest("rest_device_info")
             
             # État de la TV (allumée/éteinte)
             tv_on = device_info.get('device', {}).get('PowerState', 'off') == 'on'
@@ -156,14 +310,15 @@ class TVControl:
             art_mode = False
             try:
                 await self.tv_art.start_listening()
-                if await self.tv_art.supported():
+                if await self._art_supported():
                     art_mode = (await self.tv_art.get_artmode()) == "on"
-                    logger.info(f"art_mode: {art_mode}")
+                    logger.debug("art_mode: %s", art_mode)
             except Exception as e:
-                logger.warning(f"Erreur lors de la détection du mode art: {e}")
+                logger.warning("Erreur lors de la détection du mode art: %s", e)
 
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.get_status({self.ip_address}) - done in {duration:.3f}s")
+            log_perf(logger, "TVControl.get_status", start, tv=self.ip_address)
+            self._observe("get_status", start, "ok")
+            event_bus.update_state(self.ip_address, tv_on=tv_on, art_mode=art_mode)
             return {
                 "success": True,
                 "data": {
@@ -178,9 +333,9 @@ class TVControl:
                 error_msg = f"La TV n'est pas accessible sur le réseau actuel. Vérifiez que vous êtes sur le même sous-réseau que la TV ({self.ip_address})"
             elif "ms.channel.timeOut" in error_msg:
                 error_msg = f"La TV Samsung a rejeté la connexion. Les TV Samsung exigent d'être sur exactement le même sous-réseau (même si un ping fonctionne). Vérifiez que votre appareil est sur le même sous-réseau que la TV ({self.ip_address})"
-            logger.error(f"Erreur lors de la récupération de l'état: {error_msg}")
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.get_status({self.ip_address}) - done in {duration:.3f}s (FAILED)")
+            logger.error("Erreur lors de la récupération de l'état: %s", error_msg)
+            log_perf(logger, "TVControl.get_status", start, tv=self.ip_address, outcome="failed")
+            self._observe("get_status", start, "failed")
             return {
                 "success": False, 
                 "error": error_msg,
@@ -192,26 +347,28 @@ class TVControl:
         if not self.tv:
             return {"success": False, "error": "Impossible de se connecter à la TV"}
         try:
-            logger.info(f"Envoi de la commande {key}")
+            logger.info("Envoi de la commande %s", key)
             await self.tv.send_command(SendRemoteKey.click(key))
             return {"success": True, "message": f"Commande {key} envoyée avec succès"}
         except Exception as e:
-            logger.error(f"Erreur lors de l'envoi de la commande: {e}")
+            logger.error("Erreur lors de l'envoi de la commande: %s", e)
             return {"success": False, "error": str(e)}
 
+    @tracer.traced("TVControl.power_control")
     async def power_control(self, action: str = "toggle"):
         start = time.time()
-        logger.info(f"[PERF] TVControl.power_control({self.ip_address}, {action}) - start")
+        logger.debug("[PERF] TVControl.power_control(%s, %s) - start", self.ip_address, action)
         await self.ensure_connected()
         if not self.tv or not self.tv_rest:
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.power_control({self.ip_address}, {action}) - done in {duration:.3f}s (FAILED)")
+            log_perf(logger, "TVControl.power_control", start, tv=self.ip_address, action=action, outcome="failed")
+            self._observe("power", start, "failed")
             return {"success": False, "error": "Impossible de se connecter à la TV"}
         try:
             # On récupère l'état actuel de la TV
-            tv_on = self.tv_rest.rest_power_state()
-            logger.info(f"État actuel de la TV (valeur brute): {tv_on}")
-            logger.info(f"État actuel de la TV: {'allumée' if tv_on else 'éteinte'}")
+            with tracer.span("TVControl.rest_power_state"):
+                tv_on = self._rest("rest_power_state")
+            logger.debug("État actuel de la TV (valeur brute): %s", tv_on)
+            logger.info("État actuel de la TV: %s", 'allumée' if tv_on else 'éteinte')
             
             # On détermine si on doit envoyer une commande
             should_send_command = False
@@ -235,14 +392,17 @@ class TVControl:
             # Si on doit envoyer une commande
             if should_send_command:
                 logger.info("Envoi de la commande power (hold 3s)...")
-                await self.tv.send_command(SendRemoteKey.hold("KEY_POWER", seconds=3))
+                with tracer.span("TVControl.send_key", key="KEY_POWER", hold=3):
+                    await self.tv.send_command(SendRemoteKey.hold("KEY_POWER", seconds=3))
                 # Récupérer le nouvel état
-                tv_on = self.tv_rest.rest_power_state()
-                logger.info(f"Nouvel état de la TV (valeur brute): {tv_on}")
-                logger.info(f"Nouvel état de la TV: {'allumée' if tv_on else 'éteinte'}")
+                with tracer.span("TVControl.rest_power_state"):
+                    tv_on = self._rest("rest_power_state")
+                logger.debug("Nouvel état de la TV (valeur brute): %s", tv_on)
+                logger.info("Nouvel état de la TV: %s", 'allumée' if tv_on else 'éteinte')
             
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.power_control({self.ip_address}, {action}) - done in {duration:.3f}s")
+            log_perf(logger, "TVControl.power_control", start, tv=self.ip_address, action=action)
+            self._observe("power", start, "ok")
+            event_bus.update_state(self.ip_address, tv_on=tv_on)
             return {
                 "success": True,
                 "data": {
@@ -250,33 +410,35 @@ class TVControl:
                 }
             }
         except Exception as e:
-            logger.error(f"Erreur lors de l'envoi de la commande power: {e}")
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.power_control({self.ip_address}, {action}) - done in {duration:.3f}s (FAILED)")
+            logger.error("Erreur lors de l'envoi de la commande power: %s", e)
+            log_perf(logger, "TVControl.power_control", start, tv=self.ip_address, action=action, outcome="failed")
+            self._observe("power", start, "failed")
             return {"success": False, "error": str(e)}
 
+    @tracer.traced("TVControl.art_mode_control")
     async def art_mode_control(self, action: str = "toggle"):
         """
         Contrôle le mode art de la TV (toggle, on, off)
         """
         start = time.time()
-        logger.info(f"[PERF] TVControl.art_mode_control({self.ip_address}, {action}) - start")
+        logger.debug("[PERF] TVControl.art_mode_control(%s, %s) - start", self.ip_address, action)
         await self.ensure_connected()
         if not self.tv:
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.art_mode_control({self.ip_address}, {action}) - done in {duration:.3f}s (FAILED)")
+            log_perf(logger, "TVControl.art_mode_control", start, tv=self.ip_address, action=action, outcome="failed")
+            self._observe("art_mode", start, "failed")
             return {"success": False, "error": "Impossible de se connecter à la TV"}
         try:
             # On récupère l'état actuel du mode art
             art_mode = False
             try:
-                if self.tv_art and await self.tv_art.supported():
-                    art_mode = (await self.tv_art.get_artmode()) == "on"
+                with tracer.span("TVControl.detect_art_mode"):
+                    if self.tv_art and await self._art_supported():
+                        art_mode = (await self.tv_art.get_artmode()) == "on"
             except Exception as e:
-                logger.warning(f"Erreur lors de la détection du mode art: {e}")
+                logger.warning("Erreur lors de la détection du mode art: %s", e)
 
             should_send_command = False
-            logger.info(f"État détecté du mode art avant action '{action}': {art_mode}")
+            logger.info("État détecté du mode art avant action '%s': %s", action, art_mode)
             if action == "on":
                 if not art_mode:
                     should_send_command = True
@@ -295,25 +457,27 @@ class TVControl:
 
             if should_send_command:
                 logger.info("Envoi de la commande KEY_POWER pour le mode art...")
-                await self.tv.send_command(SendRemoteKey.click("KEY_POWER"))
+                with tracer.span("TVControl.send_key", key="KEY_POWER"):
+                    await self.tv.send_command(SendRemoteKey.click("KEY_POWER"))
                 # On récupère le nouvel état
                 art_mode = False
                 try:
-                    if self.tv_art and await self.tv_art.supported():
-                        art_mode = (await self.tv_art.get_artmode()) == "on"
+                    with tracer.span("TVControl.refresh_art_mode"):
+                        if self.tv_art and await self._art_supported():
+                            art_mode = (await self.tv_art.get_artmode()) == "on"
                 except Exception as e:
-                    logger.warning(f"Erreur lors de la détection du mode art après commande: {e}")
-                duration = time.time() - start
-                logger.info(f"[PERF] TVControl.art_mode_control({self.ip_address}, {action}) - done in {duration:.3f}s")
+                    logger.warning("Erreur lors de la détection du mode art après commande: %s", e)
+                log_perf(logger, "TVControl.art_mode_control", start, tv=self.ip_address, action=action)
+                self._observe("art_mode", start, "ok")
                 return {"success": True, "art_mode": art_mode}
             else:
-                duration = time.time() - start
-                logger.info(f"[PERF] TVControl.art_mode_control({self.ip_address}, {action}) - done in {duration:.3f}s")
+                log_perf(logger, "TVControl.art_mode_control", start, tv=self.ip_address, action=action)
+                self._observe("art_mode", start, "ok")
                 return {"success": True, "art_mode": art_mode}
         except Exception as e:
-            logger.error(f"Erreur lors du contrôle du mode art: {e}")
-            duration = time.time() - start
-            logger.info(f"[PERF] TVControl.art_mode_control({self.ip_address}, {action}) - done in {duration:.3f}s (FAILED)")
+            logger.error("Erreur lors du contrôle du mode art: %s", e)
+            log_perf(logger, "TVControl.art_mode_control", start, tv=self.ip_address, action=action, outcome="failed")
+            self._observe("art_mode", start, "failed")
             return {"success": False, "error": str(e)}
 
     async def set_volume(self, volume: int):
@@ -327,7 +491,7 @@ class TVControl:
             else:
                 return await self.send_command("KEY_VOLUP")
         except Exception as e:
-            logger.error(f"Erreur lors du réglage du volume: {e}")
+            logger.error("Erreur lors du réglage du volume: %s", e)
             return {"success": False, "error": str(e)}
 
     async def set_channel(self, channel: int):
@@ -344,7 +508,7 @@ class TVControl:
             # Confirmer avec ENTER
             return await self.send_command("KEY_ENTER")
         except Exception as e:
-            logger.error(f"Erreur lors du changement de chaîne: {e}")
+            logger.error("Erreur lors du changement de chaîne: %s", e)
             return {"success": False, "error": str(e)}
 
     async def power_on(self):
@@ -392,43 +556,88 @@ class TVControl:
     async def close(self):
         """Ferme proprement la connexion à la TV"""
         start = time.time()
-        logger.info(f"[PERF] TVControl.close({self.ip_address}) - start")
+        logger.debug("[PERF] TVControl.close(%s) - start", self.ip_address)
+        await self.upload_queue.close()
+        await self.catalog.stop()
+        await self.prewarmer.stop()
         if self.tv:
             try:
                 await self.tv.close()
-                self.tv = None
-                self.tv_rest = None
                 logger.info("Connexion fermée avec succès")
             except Exception as e:
-                logger.error(f"Erreur lors de la fermeture de la connexion: {e}")
-        duration = time.time() - start
-        logger.info(f"[PERF] TVControl.close({self.ip_address}) - done in {duration:.3f}s")
+                logger.error("Erreur lors de la fermeture de la connexion: %s", e)
+        if self.tv_art:
+            # Ferme aussi la session HTTP (aiohttp) du canal art
+            try:
+                await self.tv_art.close()
+                logger.info("Connexion du mode art fermée avec succès")
+            except Exception as e:
+                logger.error("Erreur lors de la fermeture de la connexion du mode art: %s", e)
+        if self.tv_rest:
+            connection_journal.record(self.ip_address, "rest", "close", cause="fermeture demandée")
+        if self.tv or self.tv_art:
+            connection_journal.record(self.ip_address, "tv", "close", time.time() - start, "fermeture demandée")
+        self.tv = None
+        self.tv_rest = None
+        self.tv_art = None
+        metrics.set_connected(self.ip_address, False)
+        log_perf(logger, "TVControl.close", start, tv=self.ip_address)
+
+    async def upload_photo(self, file, file_type="png", matte="", portrait_matte="flexible_black", name=None):
+        """
+        Ajoute une image à la file d'upload de la TV et attend le résultat.
+        Les transferts sont sérialisés (un seul transfert d2d à la fois par TV)
+        et l'image suivante est préparée pendant le transfert en cours.
+        """
+        return await self.upload_queue.submit(file, file_type, matte, portrait_matte, name)
+
+    def get_upload_queue_status(self) -> dict:
+        return self.upload_queue.get_status()
 
-    async def upload_photo(self, file_bytes, file_type="png", matte="", portrait_matte="flexible_black"):
+    @tracer.traced("TVControl.upload")
+    async def _upload_now(self, file, file_type="png", matte="", portrait_matte="flexible_black"):
+        """
+        Envoie une image sur la TV.
+        file peut être un contenu en mémoire (bytes), une ArtImage déjà préparée
+        ou le chemin d'un fichier sur disque, envoyé sans être chargé en mémoire (sendfile/mmap).
+        La réponse contient la durée de chaque phase (négociation, transfert, confirmation)
+        et le débit du transfert.
+        """
         await self.ensure_connected()
         if not self.tv_art:
             return {"success": False, "error": "Impossible de se connecter au canal Art"}
         try:
-            # On fait l'upload de manière asynchrone
-            upload_task = asyncio.create_task(self.tv_art.upload(
-                file=file_bytes,
+            report = await self.tv_art.upload_image(
+                file,
                 matte=matte,
                 portrait_matte=portrait_matte,
                 file_type=file_type
-            ))
-            
-            # On vérifie que l'image a bien été uploadée avec un polling
+            )
+            upload_info = {
+                "phases": {phase: round(duration, 3) for phase, duration in report["phases"].items()},
+                "negotiate_attempts": report["negotiate_attempts"],
+                "bytes": report["bytes"],
+                "throughput": round(report["throughput"]) if report["throughput"] else None,
+                "duration": round(report["duration"], 3)
+            }
+            logger.info("[PERF] TVControl.upload_photo(%s) - %.3fs", self.ip_address, upload_info["duration"], extra={"event": "perf.TVControl.upload_photo", "tv": self.ip_address, **upload_info})
+            if report["content_id"]:
+                return {"success": True, "content_id": report["content_id"], "upload": upload_info}
+
+            if report["failed_phase"] != "confirm":
+                return {
+                    "success": False,
+                    "error": f"Erreur lors de l'upload ({report['failed_phase']}) : {report['error']}",
+                    "failed_phase": report["failed_phase"],
+                    "upload": upload_info
+                }
+
+            # Le fichier a été transmis mais la TV n'a pas envoyé image_added :
+            # on vérifie dans la liste des images avec un polling
             max_attempts = 5
             attempt = 0
             while attempt < max_attempts:
-                # On vérifie d'abord si l'upload est terminé
-                if upload_task.done():
-                    try:
-                        await upload_task  # On attend la fin de l'upload si ce n'est pas déjà fait
-                    except Exception as e:
-                        return {"success": False, "error": f"Erreur lors de l'upload: {str(e)}"}
-                
-                images_result = await self.list_art_images()
+                images_result = await self.list_art_images(refresh=True)
                 if not images_result.get("success"):
                     return {"success": False, "error": "Impossible de vérifier l'upload"}
                     
@@ -439,53 +648,199 @@ class TVControl:
                     return {
                         "success": True,
                         "content_id": latest_image.get('content_id'),
-                        "image_details": latest_image
+                        "image_details": latest_image,
+                        "upload": upload_info
                     }
                 
                 attempt += 1
                 if attempt < max_attempts:
                     await asyncio.sleep(0.5)  # Attente courte entre les tentatives
             
-            return {"success": False, "error": "L'image n'a pas été trouvée après l'upload"}
+            return {"success": False, "error": "L'image n'a pas été trouvée après l'upload", "upload": upload_info}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    async def list_art_images(self):
-        import logging
-        logger = logging.getLogger("TVControl.list_art_images")
+    @tracer.traced("TVControl.fetch_catalog")
+    async def _fetch_catalog(self):
+        """
+        Récupère la liste complète des œuvres (toutes catégories) pour le catalogue.
+        """
+        await self.ensure_connected()
+        if not self.tv_art:
+            raise ConnectionError("Impossible de se connecter au canal Art")
+        start = time.time()
+        try:
+            items = await self.tv_art.available()
+        except Exception:
+            self._observe("list", start, "failed")
+            raise
+        self._observe("list", start, "ok")
+        return items
+
+    async def _load_catalog(self, refresh=False) -> Optional[str]:
+        """
+        Charge le catalogue des œuvres si nécessaire (ou le recharge si refresh=True).
+        Retourne un message d'erreur, ou None si le catalogue est disponible.
+        """
+        if self.catalog.loaded and not refresh:
+            return None
         await self.ensure_connected()
         if not self.tv_art:
             logger.error("Impossible de se connecter au canal Art")
-            return {"success": False, "error": "Impossible de se connecter au canal Art"}
+            return "Impossible de se connecter au canal Art"
+        await self.tv_art.start_listening()
+        supported = await self.tv_art.supported()
+        logger.info("Canal Art supporté : %s", supported)
+        if not supported:
+            return "Le canal Art n'est pas supporté ou la TV n'est pas en mode Art"
+        if refresh:
+            await self.catalog.reconcile()
+        else:
+            await self.catalog.ensure_loaded()
+        self.catalog.start()
+        return None
+
+    async def list_art_images(self, refresh=False):
+        """
+        Liste les images personnelles depuis le catalogue en mémoire.
+        La TV n'est interrogée qu'au premier appel, ou si refresh=True.
+        """
         try:
-            logger.info("Démarrage de start_listening sur le canal Art...")
-            await self.tv_art.start_listening()
-            logger.info("Vérification du support du canal Art...")
-            supported = await self.tv_art.supported()
-            logger.info(f"Canal Art supporté : {supported}")
-            if not supported:
-                return {"success": False, "error": "Le canal Art n'est pas supporté ou la TV n'est pas en mode Art"}
-            logger.info("Appel à available(category='MY-C0002') pour lister les images personnelles...")
-            images = await self.tv_art.available(category='MY-C0002')
-            logger.info(f"Images récupérées : {images}")
+            error = await self._load_catalog(refresh)
+            if error:
+                return {"success": False, "error": error}
+            images = self.catalog.list(MY_PICTURES_CATEGORY)
+            logger.info("%s images personnelles sur la TV %s", len(images), self.ip_address)
             return {"success": True, "images": images}
         except Exception as e:
-            logger.error(f"Erreur lors de la récupération des images Art Mode : {e}")
+            logger.error("Erreur lors de la récupération des images Art Mode : %s", e)
             return {"success": False, "error": str(e)}
 
-    async def delete_art_images(self, content_ids):
+    async def query_art_images(self, **query) -> dict:
+        """
+        Renvoie une page d'images du catalogue (pagination par curseur, tri, filtres, projection).
+        Voir ArtCatalog.query pour les paramètres.
+        """
         try:
-            if not content_ids:
-                return {"success": False, "error": "Aucun ID d'image spécifié"}
-            
+            error = await self._load_catalog()
+            if error:
+                return {"success": False, "error": error}
+            return {"success": True, **self.catalog.query(**query)}
+        except Exception as e:
+            logger.error("Erreur lors de la récupération des images Art Mode : %s", e)
+            return {"success": False, "error": str(e)}
+
+    @tracer.traced("TVControl.delete_art_images")
+    async def delete_art_images(self, content_ids=None, chunk_size=50, delete_all=False):
+        """
+        Supprime des images par lots, chaque lot étant confirmé par l'événement
+        image_deleted de la TV avant l'envoi du suivant.
+        Avec delete_all, supprime toutes les images de "Mes images" (depuis le catalogue).
+        Le catalogue et le cache des miniatures sont mis à jour après chaque lot.
+        """
+        start = time.time()
+        try:
+            if delete_all:
+                error = await self._load_catalog()
+                if error:
+                    return {"success": False, "error": error}
+                content_ids = self.catalog.content_ids(MY_PICTURES_CATEGORY)
             if isinstance(content_ids, str):
                 content_ids = [content_ids]
-            
-            result = await self.tv_art.delete_list(content_ids)
-            return {"success": True, "data": result}
+            if not content_ids:
+                return {"success": False, "error": "Aucun ID d'image spécifié"}
+
+            await self.ensure_connected()
+            if not self.tv_art:
+                return {"success": False, "error": "Impossible de se connecter au canal Art"}
+
+            def on_chunk(outcomes):
+                # Les images en timeout, erreur ou non supprimées restent sur la TV
+                for content_id, outcome in outcomes.items():
+                    if outcome == "deleted":
+                        self.catalog.remove(content_id)
+                        self.thumbnail_cache.invalidate(self.ip_address, content_id)
+                        self.prewarmer.discard([content_id])
+
+            results = await self.tv_art.delete_images(content_ids, chunk_size=chunk_size, on_chunk=on_chunk)
+            deleted = sum(1 for outcome in results.values() if outcome == "deleted")
+            log_perf(logger, "TVControl.delete_art_images", start, tv=self.ip_address, deleted=deleted, failed=len(results) - deleted)
+            return {
+                "success": deleted == len(results),
+                "deleted": deleted,
+                "failed": len(results) - deleted,
+                "results": results
+            }
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def art_busy(self) -> bool:
+        """Vrai si du trafic interactif occupe le canal Art (requêtes, uploads, miniatures)."""
+        if self.tv_art and (self.tv_art.pending_requests or self.tv_art.upload_lock.locked()):
+            return True
+        return bool(self._thumbnail_fetches or self.upload_queue.current or self.upload_queue.jobs)
+
+    def get_prewarm_status(self) -> dict:
+        return self.prewarmer.get_status()
+
+    async def get_thumbnails(self, content_ids: List[str]) -> Dict[str, Thumbnail]:
+        return {content_id: thumbnail async for content_id, thumbnail in self.iter_thumbnails(content_ids)}
+
+    async def iter_thumbnails(self, content_ids: List[str]):
+        """
+        Itérateur asynchrone sur les couples (content_id, Thumbnail) demandés.
+        Les miniatures en cache sont renvoyées immédiatement, les manquantes sont
+        lues une par une sur une seule connexion d2d (get_thumbnail_list) au fur et
+        à mesure de leur arrivée. Une miniature déjà en cours de téléchargement
+        n'est pas redemandée à la TV. Les miniatures introuvables sont omises.
+        """
+        missing = []
+        for content_id in content_ids:
+            thumbnail = await self.thumbnail_cache.get(self.ip_address, content_id)
+            if thumbnail:
+                yield content_id, thumbnail
+            else:
+                missing.append(content_id)
+
+        in_flight = {content_id: self._thumbnail_fetches[content_id] for content_id in missing if content_id in self._thumbnail_fetches}
+        to_fetch = [content_id for content_id in missing if content_id not in in_flight]
+        if to_fetch:
+            async for content_id, thumbnail in self._stream_thumbnails(to_fetch):
+                yield content_id, thumbnail
+        for content_id, future in in_flight.items():
+            thumbnail = await future
+            if thumbnail:
+                yield content_id, thumbnail
+
+    async def _stream_thumbnails(self, content_ids: List[str]):
+        loop = asyncio.get_running_loop()
+        futures = {content_id: loop.create_future() for content_id in content_ids}
+        self._thumbnail_fetches.update(futures)
+        start = time.time()
+        first = None
+        try:
+            await self.ensure_connected()
+            if not self.tv_art:
+                raise ConnectionError("Impossible de se connecter au canal Art")
+            async for filename, data in self.tv_art.iter_thumbnail_list(content_ids):
+                content_id = filename.rsplit('.', 1)[0]
+                thumbnail = await self.thumbnail_cache.put(self.ip_address, content_id, data)
+                if content_id in futures and not futures[content_id].done():
+                    futures[content_id].set_result(thumbnail)
+                if first is None:
+                    first = time.time() - start
+                yield content_id, thumbnail
+            log_perf(logger, "TVControl._stream_thumbnails", start, tv=self.ip_address, thumbnails=len(content_ids), first=round(first or 0, 3))
+            self._observe("thumbnail", start, "ok")
+        except Exception as e:
+            logger.error("Erreur lors de la récupération des miniatures : %s", e)
+            self._observe("thumbnail", start, "failed")
+        finally:
+            for content_id, future in futures.items():
+                if not future.done():
+                    future.set_result(None)
+                self._thumbnail_fetches.pop(content_id, None)
+
     async def set_auto_rotation(self, duration: int, shuffle: bool, category: int) -> dict:
         """
         Configure la rotation automatique des images.
@@ -525,7 +880,8 @@ class TVControl:
                 return {"success": False, "error": "Le mode Art n'est pas activé. Activez d'abord le mode Art."}
             
             # Vérifier si la catégorie existe
-            available_categories = await self.tv_art.available(category=f"MY-C000{category}")
+            await self.catalog.ensure_loaded()
+            available_categories = self.catalog.list(f"MY-C000{category}")
             if not available_categories:
                 return {"success": False, "error": f"Aucune image trouvée dans la catégorie {category}"}
             
@@ -535,7 +891,7 @@ class TVControl:
             
             # Vérifier le statut actuel
             current_status = await self.tv_art.get_auto_rotation_status()
-            logger.info(f"Statut actuel de la rotation : {current_status}")
+            logger.debug("Statut actuel de la rotation : %s", current_status)
             
             # Utiliser set_auto_rotation_status avec l'événement de confirmation
             data = await self.tv_art._send_art_request(
@@ -551,15 +907,15 @@ class TVControl:
             if not data:
                 return {"success": False, "error": "La TV n'a pas confirmé le changement"}
             
-            logger.info(f"Résultat de la configuration : {data}")
+            logger.debug("Résultat de la configuration : %s", data)
             
             # Vérifier le nouveau statut
             new_status = await self.tv_art.get_auto_rotation_status()
-            logger.info(f"Nouveau statut de la rotation : {new_status}")
+            logger.debug("Nouveau statut de la rotation : %s", new_status)
             
             return {"success": True, "data": new_status}
         except Exception as e:
-            logger.error(f"Erreur lors de la configuration du diaporama : {str(e)}")
+            logger.error("Erreur lors de la configuration du diaporama : %s", str(e))
             return {"success": False, "error": str(e)}
 
     async def get_auto_rotation_status(self) -> dict:
@@ -606,7 +962,7 @@ class TVControl:
             
             return await self.tv_art.supported()
         except Exception as e:
-            logger.error(f"Erreur lors de la vérification du support du mode art: {str(e)}")
+            logger.error("Erreur lors de la vérification du support du mode art: %s", str(e))
             return False
 
     async def custom_slideshow(self, duration: int, shuffle: bool, category: int) -> dict:
@@ -659,7 +1015,7 @@ class TVControl:
             if not images:
                 return {"success": False, "error": "Aucune image trouvée dans la catégorie spécifiée"}
             
-            logger.info(f"Nombre d'images trouvées : {len(images)}")
+            logger.info("Nombre d'images trouvées : %s", len(images))
             
             # Mélanger les images si demandé
             if shuffle:
@@ -675,13 +1031,13 @@ class TVControl:
                     pass
             
             # Créer et démarrer la nouvelle tâche
-            self.slideshow_task = asyncio.create_task(self._run_slideshow_loop(images, duration))
+            self.slideshow_task = asyncio.create_task(self._run_slideshow_loop(images, duration), context=contextvars.Context())
             logger.info("Tâche de diaporama créée et démarrée")
             
             return {"success": True, "message": "Diaporama démarré"}
             
         except Exception as e:
-            logger.error(f"Erreur lors du démarrage du diaporama: {str(e)}")
+            logger.error("Erreur lors du démarrage du diaporama: %s", str(e))
             return {"success": False, "error": str(e)}
 
     async def _run_slideshow_loop(self, images: list, duration: int):
@@ -704,16 +1060,16 @@ class TVControl:
                         return
                     
                     # Afficher l'image
-                    logger.info(f"Affichage de l'image {i}/{len(images)} (ID: {image['content_id']})")
+                    logger.debug("Affichage de l'image %s/%s (ID: %s)", i, len(images), image['content_id'])
                     try:
                         await self.tv_art.select_image(image['content_id'])
-                        logger.info(f"Image {image['content_id']} affichée avec succès")
+                        logger.debug("Image %s affichée avec succès", image['content_id'])
                     except Exception as e:
-                        logger.error(f"Erreur lors de l'affichage de l'image {image['content_id']}: {str(e)}")
+                        logger.error("Erreur lors de l'affichage de l'image %s: %s", image['content_id'], str(e))
                         continue
                     
                     # Attendre la durée spécifiée
-                    logger.info(f"Attente de {duration} secondes avant la prochaine image...")
+                    logger.debug("Attente de %s secondes avant la prochaine image...", duration)
                     await asyncio.sleep(duration)
                 
                 logger.info("Fin du cycle, redémarrage du diaporama...")
@@ -722,7 +1078,7 @@ class TVControl:
             logger.info("Tâche de diaporama annulée")
             raise
         except Exception as e:
-            logger.error(f"Erreur inattendue dans la tâche de diaporama: {str(e)}")
+            logger.error("Erreur inattendue dans la tâche de diaporama: %s", str(e))
             raise
         finally:
             self._stop_slideshow = False  # Réinitialiser le flag à la fin
@@ -731,7 +1087,7 @@ class TVControl:
         """
         Arrête le diaporama en cours.
         """
-        logger.info(f"Arrêt du diaporama pour la TV {self.ip_address}")
+        logger.info("Arrêt du diaporama pour la TV %s", self.ip_address)
         self._stop_slideshow = True  # Activer le flag d'arrêt
         
         # Annuler la tâche si elle existe
@@ -1,19 +1,43 @@
 import json
 import os
 import logging
+import math
 import socket
 from pathlib import Path
 from .tv_control import TVControl
 import asyncio
+import contextvars
 import time
 from .config_service import ConfigService
+from .connection_journal import connection_journal
+from .event_bus import event_bus
+from lib.samsungtvws.async_art import ArtImage
+from .folder_sync import FolderSyncService
+from .thumbnail_cache import ThumbnailCache
+from .logging_service import log_perf
+from .tracing import tracer
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('TVService')
 
+
+def parse_timeouts(spec: str) -> dict:
+    """
+    Timeouts par type de requête Art, "requête=secondes,..." (ex. "get_content_list=6,send_image=3").
+    Une règle invalide est ignorée avec un avertissement.
+    """
+    timeouts = {}
+    for rule in filter(None, (part.strip() for part in spec.split(','))):
+        request, _, seconds = rule.partition('=')
+        try:
+            timeout = float(seconds)
+        except ValueError:
+            timeout = None
+        if not request.strip() or timeout is None or not math.isfinite(timeout) or timeout <= 0:
+            logger.warning("ART_REQUEST_TIMEOUTS : règle '%s' ignorée (attendu requête=secondes, secondes > 0)", rule)
+            continue
+        timeouts[request.strip()] = timeout
+    return timeouts
+
 class SlideshowStateService:
     def __init__(self):
         self.slideshow_states = {}
@@ -25,6 +49,7 @@ class SlideshowStateService:
             "shuffle": shuffle,
             "category": category
         }
+        event_bus.update_state(ip_address, slideshow=self.slideshow_states[ip_address])
 
     def get_state(self, ip_address: str) -> dict:
         return self.slideshow_states.get(ip_address, {
@@ -40,9 +65,24 @@ class TVService:
         self.config_service = ConfigService()
         self.tokens_dir = Path(__file__).parent.parent / 'config' / 'tokens'
         self.tokens_dir.mkdir(exist_ok=True)
+        self.sync_dir = Path(__file__).parent.parent / 'config' / 'sync'
+        self.thumbnail_cache = ThumbnailCache(
+            os.environ.get('THUMBNAIL_CACHE_DIR') or Path(__file__).parent.parent / 'config' / 'thumbnails',
+            memory_limit=int(os.environ.get('THUMBNAIL_MEMORY_CACHE_MB', 32)) * 1024 * 1024,
+            disk_limit=int(os.environ.get('THUMBNAIL_DISK_CACHE_MB', 512)) * 1024 * 1024
+        )
+        # Budget de débit du préchauffage des miniatures, par TV
+        self.prewarm_bandwidth = int(os.environ.get('THUMBNAIL_PREWARM_KBPS', 256)) * 1024
+        # Timeouts du canal Art ajustés par type de requête (cf. /api/v1/admin/art-requests)
+        self.art_request_timeouts = parse_timeouts(os.environ.get('ART_REQUEST_TIMEOUTS', ''))
         self.load_config()
         self.tv_controls = {}  # Nouveau : {ip: TVControl}
+        self.folder_syncs = {}  # {ip: FolderSyncService}
         self.slideshow_state_service = SlideshowStateService()
+        self.watchers = {}  # {ip: [tâche, nombre d'abonnés]} : TVs suivies pour les flux d'événements
+        # Vérification locale du canal art des TVs suivies, délai doublé à chaque échec de réouverture
+        self.watch_interval = float(os.environ.get('EVENTS_WATCH_INTERVAL', 5))
+        self.watch_max_interval = float(os.environ.get('EVENTS_WATCH_MAX_INTERVAL', 60))
 
     def load_config(self):
         if not self.config_path.exists():
@@ -66,63 +106,78 @@ class TVService:
     def get_tv_control(self, ip_address: str) -> TVControl:
         if ip_address not in self.tv_controls:
             token_file = self._get_token_file(ip_address)
-            self.tv_controls[ip_address] = TVControl(ip_address, token_file=token_file)
+            self.tv_controls[ip_address] = TVControl(
+                ip_address,
+                token_file=token_file,
+                thumbnail_cache=self.thumbnail_cache,
+                prewarm_bandwidth=self.prewarm_bandwidth,
+                art_request_timeouts=self.art_request_timeouts
+            )
         return self.tv_controls[ip_address]
 
+    def get_folder_sync(self, ip_address: str, folder: str, extensions: tuple) -> FolderSyncService:
+        folder_sync = self.folder_syncs.get(ip_address)
+        if folder_sync is None or folder_sync.folder != folder or folder_sync.extensions != extensions:
+            if folder_sync and folder_sync.watch_task:
+                folder_sync.watch_task.cancel()
+            manifest_path = self.sync_dir / f"manifest_{ip_address.replace('.', '_')}.json"
+            folder_sync = FolderSyncService(self.get_tv_control(ip_address), folder, extensions, manifest_path)
+            self.folder_syncs[ip_address] = folder_sync
+        return folder_sync
+
+    @tracer.traced("TVService.get_tv_status")
     async def get_tv_status(self, ip_address: str) -> dict:
         start = time.time()
-        logger.info(f"[PERF] get_tv_status({ip_address}) - start")
-        logger.info(f"Récupération de l'état de la TV {ip_address}")
+        logger.debug("[PERF] get_tv_status(%s) - start", ip_address)
+        logger.info("Récupération de l'état de la TV %s", ip_address)
         tv_control = self.get_tv_control(ip_address)
         result = await tv_control.get_status()
         
         if result.get("success", False):
-            logger.info(f"État de la TV {ip_address} récupéré avec succès")
+            logger.info("État de la TV %s récupéré avec succès", ip_address)
             # Mise à jour de la config via ConfigService
             self.config_service.update_tv_status(ip_address, result["data"])
-            duration = time.time() - start
-            logger.info(f"[PERF] get_tv_status({ip_address}) - done in {duration:.3f}s")
+            log_perf(logger, "get_tv_status", start, tv=ip_address)
             return result["data"]
         
         error_msg = result.get('error', 'Erreur inconnue')
-        logger.error(f"Échec de la récupération de l'état de la TV {ip_address}: {error_msg}")
-        duration = time.time() - start
-        logger.info(f"[PERF] get_tv_status({ip_address}) - done in {duration:.3f}s")
+        logger.error("Échec de la récupération de l'état de la TV %s: %s", ip_address, error_msg)
+        log_perf(logger, "get_tv_status", start, tv=ip_address, outcome="failed")
         return {
             "error": error_msg,
             "error_type": "network_error" if "sous-réseau" in error_msg.lower() or "accessible" in error_msg.lower() else "unknown_error"
         }
 
+    @tracer.traced("TVService.power_control")
     async def power_control(self, ip_address, action: str):
         start = time.time()
-        logger.info(f"[PERF] power_control({ip_address}, {action}) - start")
-        logger.info(f"Tentative de contrôle de l'alimentation de la TV {ip_address} (action={action})")
+        logger.debug("[PERF] power_control(%s, %s) - start", ip_address, action)
+        logger.info("Tentative de contrôle de l'alimentation de la TV %s (action=%s)", ip_address, action)
         tv_control = self.get_tv_control(ip_address)
         result = await tv_control.power_control(action)
         
         if result["success"]:
-            logger.info(f"Contrôle de l'alimentation réussi pour la TV {ip_address}")
+            logger.info("Contrôle de l'alimentation réussi pour la TV %s", ip_address)
             # On attend un peu pour laisser le temps à la TV de changer d'état
             await asyncio.sleep(3)
             # On récupère le nouveau statut
             status = await self.get_tv_status(ip_address)
-            duration = time.time() - start
-            logger.info(f"[PERF] power_control({ip_address}, {action}) - done in {duration:.3f}s")
+            log_perf(logger, "power_control", start, tv=ip_address, action=action)
             return {"success": True, "data": status}
             
         error_msg = result.get('error', 'Erreur inconnue')
-        logger.error(f"Échec du contrôle de l'alimentation pour la TV {ip_address}: {error_msg}")
-        duration = time.time() - start
-        logger.info(f"[PERF] power_control({ip_address}, {action}) - done in {duration:.3f}s")
+        logger.error("Échec du contrôle de l'alimentation pour la TV %s: %s", ip_address, error_msg)
+        log_perf(logger, "power_control", start, tv=ip_address, action=action, outcome="failed")
         return {
             "error": error_msg,
             "error_type": "network_error" if "sous-réseau" in error_msg.lower() or "accessible" in error_msg.lower() else "unknown_error"
         }
 
+    @tracer.traced("TVService.set_art_mode")
     async def set_art_mode(self, ip_address, action: str):
         start = time.time()
-        logger.info(f"[PERF] set_art_mode({ip_address}, {action}) - start")
-        logger.info(f"Tentative de contrôle du mode Art pour la TV {ip_address} (action={action})")
+        logger.debug("[PERF] set_art_mode(%s, %s) - start", ip_address, action)
+        logger.info("Tentative de contrôle du mode Art pour la TV %s (action=%s)", ip_address, action)
         tv_control = self.get_tv_control(ip_address)
         
         result = await tv_control.art_mode_control(action)
@@ -130,38 +185,192 @@ class TVService:
             return {"error": result["error"]}
         # On récupère le nouveau statut complet pour la réponse API
         status = await self.get_tv_status(ip_address)
-        duration = time.time() - start
-        logger.info(f"[PERF] set_art_mode({ip_address}, {action}) - done in {duration:.3f}s")
+        log_perf(logger, "set_art_mode", start, tv=ip_address, action=action)
         return {"success": True, "data": status}
 
     async def close_all(self):
         start = time.time()
-        logger.info(f"[PERF] close_all - start")
+        logger.debug("[PERF] close_all - start")
         logger.info("Fermeture de toutes les connexions aux TVs")
+        await asyncio.gather(
+            *(folder_sync.stop_watching() for folder_sync in self.folder_syncs.values()),
+            return_exceptions=True
+        )
+        for task, _ in self.watchers.values():
+            task.cancel()
+        self.watchers.clear()
         awaitables = []
         for ip, tv_control in self.tv_controls.items():
             try:
                 awaitables.append(tv_control.close())
-                logger.info(f"Connexion fermée pour la TV {ip}")
+                logger.info("Connexion fermée pour la TV %s", ip)
             except Exception as e:
-                logger.error(f"Erreur lors de la fermeture de la connexion pour la TV {ip}: {e}")
+                logger.error("Erreur lors de la fermeture de la connexion pour la TV %s: %s", ip, e)
         await asyncio.gather(*awaitables, return_exceptions=True)
         self.tv_controls.clear()
-        duration = time.time() - start
-        logger.info(f"[PERF] close_all - done in {duration:.3f}s")
+        log_perf(logger, "close_all", start)
+
+    @tracer.traced("TVService.upload_photo")
+    async def upload_photo(self, ip_address, file, file_type="png", matte="none", portrait_matte="flexible_black", name=None):
+        tv_control = self.get_tv_control(ip_address)
+        return await tv_control.upload_photo(file, file_type, matte, portrait_matte, name)
+
+    def get_upload_queue_status(self, ip_address):
+        tv_control = self.get_tv_control(ip_address)
+        return tv_control.get_upload_queue_status()
 
-    async def upload_photo(self, ip_address, file_bytes, file_type="png", matte="none", portrait_matte="flexible_black"):
+    def watch(self, ip_address: str):
+        """Un abonné de plus aux événements de la TV : la suit tant qu'il en reste un."""
+        watcher = self.watchers.get(ip_address)
+        if watcher is None:
+            watcher = self.watchers[ip_address] = [None, 0]
+        if watcher[0] is None or watcher[0].done():
+            # Contexte vierge : le suivi survit à la requête qui l'a démarré et ne s'ajoute pas à sa trace
+            watcher[0] = asyncio.create_task(self._watch_tv(ip_address), name=f"watch {ip_address}", context=contextvars.Context())
+        watcher[1] += 1
+
+    def unwatch(self, ip_address: str):
+        watcher = self.watchers.get(ip_address)
+        if watcher is None:
+            return
+        watcher[1] -= 1
+        if watcher[1] <= 0:
+            watcher[0].cancel()
+            del self.watchers[ip_address]
+
+    async def _watch_tv(self, ip_address: str):
+        """
+        Alimente le flux d'événements d'une TV : état initial (une seule interrogation, si inconnu),
+        puis canal art maintenu ouvert ; les changements arrivent par ses événements.
+        Une erreur n'arrête pas le suivi : il reprend après un délai croissant, jusqu'au départ
+        du dernier abonné (unwatch).
+        """
+        tv_control = self.get_tv_control(ip_address)
+        delay = self.watch_interval
+        while True:
+            try:
+                state = event_bus.get_state(ip_address)
+                if "tv_on" not in state:
+                    await self.get_tv_status(ip_address)
+                if "current_artwork" not in state and tv_control.tv_art:
+                    event_bus.update_state(ip_address, current_artwork=await tv_control.get_current_artwork())
+                if "slideshow" not in state:
+                    event_bus.update_state(ip_address, slideshow=self.slideshow_state_service.get_state(ip_address))
+                await asyncio.sleep(delay)
+                if await tv_control.listen_events():
+                    delay = self.watch_interval
+                else:
+                    delay = min(delay * 2, self.watch_max_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Suivi des événements de la TV %s en erreur, nouvel essai dans %.1fs: %s", ip_address, delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.watch_max_interval)
+
+    def get_connection_status(self, ip_address, limit=None):
+        """Journal des connexions de la TV et, si elle est suivie, état actuel de ses canaux."""
+        tv_control = self.tv_controls.get(ip_address)
+        return dict(
+            connection_journal.get(ip_address, limit),
+            state=tv_control.get_connection_state() if tv_control else None
+        )
+
+    def get_thumbnail_status(self, ip_address):
         tv_control = self.get_tv_control(ip_address)
-        return await tv_control.upload_photo(file_bytes, file_type, matte, portrait_matte)
+        return {"cache": self.thumbnail_cache.get_stats(), "prewarm": tv_control.get_prewarm_status()}
+
+    @tracer.traced("TVService.broadcast_upload")
+    async def broadcast_upload(self, ip_addresses, file_bytes, file_type="png", matte="none",
+                               portrait_matte="flexible_black", max_concurrency=5) -> dict:
+        """
+        Envoie la même image sur plusieurs TVs.
+        L'image est préparée une seule fois puis transmise en parallèle,
+        avec au plus max_concurrency transferts simultanés.
+        """
+        start = time.time()
+        logger.debug("[PERF] broadcast_upload(%s TVs, concurrency=%s) - start", len(ip_addresses), max_concurrency)
+        image = ArtImage(data=file_bytes, file_type=file_type)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def upload_to(ip_address):
+            async with semaphore:
+                upload_start = time.time()
+                try:
+                    await self.stop_custom_slideshow(ip_address)
+                    result = await self.upload_photo(ip_address, image, image.file_type, matte, portrait_matte)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+                return {
+                    "ip": ip_address,
+                    "success": result.get("success", False),
+                    "content_id": result.get("content_id"),
+                    "error": result.get("error"),
+                    "duration": round(time.time() - upload_start, 3),
+                    "upload": result.get("upload")
+                }
+
+        results = await asyncio.gather(*(upload_to(ip) for ip in ip_addresses))
+        duration = time.time() - start
+        log_perf(logger, "broadcast_upload", start, tvs=len(ip_addresses))
+        return {
+            "success": all(result["success"] for result in results),
+            "results": results,
+            "duration": round(duration, 3)
+        }
+
+    @tracer.traced("TVService.sync_folder")
+    async def sync_folder(self, ip_address: str, folder: str, extensions: tuple) -> dict:
+        """
+        Lance une passe de synchronisation incrémentale du dossier vers la TV.
+        """
+        folder_sync = self.get_folder_sync(ip_address, folder, extensions)
+        return await folder_sync.sync()
+
+    async def watch_folder(self, ip_address: str, folder: str, extensions: tuple, enabled: bool) -> dict:
+        """
+        Active ou désactive la synchronisation continue (surveillance du dossier).
+        """
+        folder_sync = self.get_folder_sync(ip_address, folder, extensions)
+        if enabled:
+            logger.info("Démarrage de la synchronisation continue de %s vers la TV %s", folder, ip_address)
+            folder_sync.start_watching()
+        else:
+            logger.info("Arrêt de la synchronisation continue vers la TV %s", ip_address)
+            await folder_sync.stop_watching()
+        return folder_sync.get_status()
+
+    def get_folder_sync_status(self, ip_address: str) -> dict:
+        folder_sync = self.folder_syncs.get(ip_address)
+        if folder_sync is None:
+            return {"watching": False, "tracked_files": 0, "last_result": None}
+        return folder_sync.get_status()
 
     async def list_art_images(self, ip_address):
         tv_control = self.get_tv_control(ip_address)
         return await tv_control.list_art_images()
 
-    async def delete_art_images(self, ip_address, content_ids):
+    @tracer.traced("TVService.query_art_images")
+    async def query_art_images(self, ip_address, **query):
+        tv_control = self.get_tv_control(ip_address)
+        return await tv_control.query_art_images(**query)
+
+    @tracer.traced("TVService.get_thumbnail")
+    async def get_thumbnail(self, ip_address, content_id):
+        tv_control = self.get_tv_control(ip_address)
+        thumbnails = await tv_control.get_thumbnails([content_id])
+        return thumbnails.get(content_id)
+
+    def iter_thumbnails(self, ip_address, content_ids):
         tv_control = self.get_tv_control(ip_address)
-        return await tv_control.delete_art_images(content_ids)
+        return tv_control.iter_thumbnails(content_ids)
 
+    @tracer.traced("TVService.delete_art_images")
+    async def delete_art_images(self, ip_address, content_ids, delete_all=False):
+        tv_control = self.get_tv_control(ip_address)
+        return await tv_control.delete_art_images(content_ids, delete_all=delete_all)
+
+    @tracer.traced("TVService.set_auto_rotation")
     async def set_auto_rotation(self, ip_address: str, duration: int, shuffle: bool, category: int) -> dict:
         """
         Configure la rotation automatique des images.
@@ -173,21 +382,19 @@ class TVService:
             category: 2=mes images, 4=favoris, 8=store
         """
         start = time.time()
-        logger.info(f"[PERF] set_auto_rotation({ip_address}, duration={duration}, shuffle={shuffle}, category={category}) - start")
+        logger.debug("[PERF] set_auto_rotation(%s, duration=%s, shuffle=%s, category=%s) - start", ip_address, duration, shuffle, category)
         
         tv_control = self.get_tv_control(ip_address)
         result = await tv_control.set_auto_rotation(duration, shuffle, category)
         
         if result.get("success", False):
-            logger.info(f"Rotation automatique configurée avec succès pour la TV {ip_address}")
-            duration = time.time() - start
-            logger.info(f"[PERF] set_auto_rotation - done in {duration:.3f}s")
+            logger.info("Rotation automatique configurée avec succès pour la TV %s", ip_address)
+            log_perf(logger, "set_auto_rotation", start, tv=ip_address)
             return {"success": True, "data": result.get("data", {})}
         
         error_msg = result.get('error', 'Erreur inconnue')
-        logger.error(f"Échec de la configuration de la rotation automatique pour la TV {ip_address}: {error_msg}")
-        duration = time.time() - start
-        logger.info(f"[PERF] set_auto_rotation - done in {duration:.3f}s")
+        logger.error("Échec de la configuration de la rotation automatique pour la TV %s: %s", ip_address, error_msg)
+        log_perf(logger, "set_auto_rotation", start, tv=ip_address, outcome="failed")
         return {"success": False, "error": error_msg}
 
     async def get_auto_rotation_status(self, ip_address: str) -> dict:
@@ -198,23 +405,22 @@ class TVService:
             ip_address: Adresse IP de la TV
         """
         start = time.time()
-        logger.info(f"[PERF] get_auto_rotation_status({ip_address}) - start")
+        logger.debug("[PERF] get_auto_rotation_status(%s) - start", ip_address)
         
         tv_control = self.get_tv_control(ip_address)
         result = await tv_control.get_auto_rotation_status()
         
         if result.get("success", False):
-            logger.info(f"Statut de la rotation automatique récupéré avec succès pour la TV {ip_address}")
-            duration = time.time() - start
-            logger.info(f"[PERF] get_auto_rotation_status - done in {duration:.3f}s")
+            logger.info("Statut de la rotation automatique récupéré avec succès pour la TV %s", ip_address)
+            log_perf(logger, "get_auto_rotation_status", start, tv=ip_address)
             return {"success": True, "data": result.get("data", {})}
         
         error_msg = result.get('error', 'Erreur inconnue')
-        logger.error(f"Échec de la récupération du statut de la rotation automatique pour la TV {ip_address}: {error_msg}")
-        duration = time.time() - start
-        logger.info(f"[PERF] get_auto_rotation_status - done in {duration:.3f}s")
+        logger.error("Échec de la récupération du statut de la rotation automatique pour la TV %s: %s", ip_address, error_msg)
+        log_perf(logger, "get_auto_rotation_status", start, tv=ip_address, outcome="failed")
         return {"success": False, "error": error_msg}
 
+    @tracer.traced("TVService.custom_slideshow")
     async def custom_slideshow(self, ip_address: str, duration: int, shuffle: bool, category: int) -> dict:
         """
         Gère le diaporama des images depuis le serveur.
@@ -226,18 +432,17 @@ class TVService:
             category: 2=mes images, 4=favoris, 8=store
         """
         start = time.time()
-        logger.info(f"[PERF] custom_slideshow({ip_address}, duration={duration}, shuffle={shuffle}, category={category}) - start")
+        logger.debug("[PERF] custom_slideshow(%s, duration=%s, shuffle=%s, category=%s) - start", ip_address, duration, shuffle, category)
         
         tv_control = self.get_tv_control(ip_address)
         
         # Lancer le diaporama en arrière-plan
-        asyncio.create_task(self._run_slideshow(tv_control, duration, shuffle, category))
+        asyncio.create_task(self._run_slideshow(tv_control, duration, shuffle, category), context=contextvars.Context())
         
         # Mettre à jour l'état du diaporama
         self.slideshow_state_service.set_state(ip_address, True, duration, shuffle, category)
         
-        duration = time.time() - start
-        logger.info(f"[PERF] custom_slideshow - done in {duration:.3f}s")
+        log_perf(logger, "custom_slideshow", start, tv=ip_address)
         return {"success": True, "message": "Diaporama démarré en arrière-plan"}
 
     async def _run_slideshow(self, tv_control: TVControl, duration: int, shuffle: bool, category: int):
@@ -247,10 +452,10 @@ class TVService:
         try:
             result = await tv_control.custom_slideshow(duration, shuffle, category)
             if not result.get("success", False):
-                logger.error(f"Erreur lors de l'exécution du diaporama: {result.get('error', 'Erreur inconnue')}")
+                logger.error("Erreur lors de l'exécution du diaporama: %s", result.get('error', 'Erreur inconnue'))
                 self.slideshow_state_service.set_state(tv_control.ip_address, False, 0, False, 0)
         except Exception as e:
-            logger.error(f"Erreur inattendue lors de l'exécution du diaporama: {str(e)}")
+            logger.error("Erreur inattendue lors de l'exécution du diaporama: %s", str(e))
             self.slideshow_state_service.set_state(tv_control.ip_address, False, 0, False, 0)
 
     async def get_custom_slideshow_status(self, ip_address: str) -> dict:
@@ -262,8 +467,9 @@ class TVService:
         """
         return self.slideshow_state_service.get_state(ip_address)
 
+    @tracer.traced("TVService.stop_custom_slideshow")
     async def stop_custom_slideshow(self, ip_address: str):
-        logger.info(f"Arrêt du diaporama pour la TV {ip_address}")
+        logger.info("Arrêt du diaporama pour la TV %s", ip_address)
         self.slideshow_state_service.set_state(ip_address, False, 0, False, 0)
         # Annuler les tâches asynchrones en cours pour le diaporama
         tv_control = self.get_tv_control(ip_address)
@@ -0,0 +1,184 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from lib.samsungtvws.async_art import ArtImage
+
+logger = logging.getLogger('UploadQueue')
+
+# Valeurs initiales de l'estimation, affinées par moyenne glissante après chaque upload
+DEFAULT_THROUGHPUT = 2 * 1024 * 1024  # octets/s
+DEFAULT_OVERHEAD = 1.5  # secondes (négociation + confirmation)
+EWMA_ALPHA = 0.3
+
+
+class UploadJob:
+    _ids = itertools.count(1)
+
+    def __init__(self, file, file_type: str, matte: str, portrait_matte: str, name: Optional[str] = None):
+        self.id = next(self._ids)
+        self.file = file
+        self.file_type = file_type
+        self.matte = matte
+        self.portrait_matte = portrait_matte
+        self.name = name or (os.path.basename(file) if isinstance(file, str) else f"upload-{self.id}")
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Contexte de l'appelant : la préparation et l'upload sont tracés sous sa requête
+        self.context = contextvars.copy_context()
+        self.prepare_task: Optional[asyncio.Task] = None
+        if isinstance(file, ArtImage):
+            self.size = file.file_size
+        elif isinstance(file, str):
+            self.size = os.path.getsize(file)
+        else:
+            self.size = len(file)
+        self.state = "queued"
+        self.enqueued_at = time.time()
+        self.started_at: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "bytes": self.size,
+            "state": self.state,
+            "enqueued_at": self.enqueued_at,
+            "started_at": self.started_at
+        }
+
+
+def _prepare_image(job: UploadJob) -> ArtImage:
+    """
+    Prépare l'image d'un job (hors de la boucle d'événements).
+    Pour un fichier sur disque, demande au noyau de le précharger en cache
+    afin que le transfert (sendfile) ne soit pas ralenti par le disque.
+    """
+    if isinstance(job.file, ArtImage):
+        return job.file
+    if not isinstance(job.file, str):
+        return ArtImage(data=job.file, file_type=job.file_type)
+    image = ArtImage(path=job.file)
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(job.file, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    return image
+
+
+class UploadQueue:
+    """
+    File d'upload d'une TV : les TVs Frame n'acceptent qu'un transfert d2d à la fois,
+    les uploads sont donc sérialisés, mais la préparation de l'image suivante
+    est lancée pendant le transfert de l'image en cours.
+    """
+
+    def __init__(self, ip_address: str, upload: Callable[..., Awaitable[dict]]):
+        self.ip_address = ip_address
+        self._upload = upload
+        self.jobs: deque = deque()
+        self.current: Optional[UploadJob] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.throughput = DEFAULT_THROUGHPUT
+        self.overhead = DEFAULT_OVERHEAD
+        self.completed = 0
+        self.failed = 0
+
+    async def submit(self, file, file_type="png", matte="", portrait_matte="flexible_black", name=None) -> dict:
+        """
+        Ajoute un upload à la file et attend son résultat.
+        """
+        job = UploadJob(file, file_type, matte, portrait_matte, name)
+        self.jobs.append(job)
+        if len(self.jobs) == 1 and self.current is not None:
+            # Préchargement du prochain élément pendant le transfert en cours
+            self._prefetch(job)
+        if self.worker is None or self.worker.done():
+            # Contexte vierge : le worker sert les jobs de plusieurs requêtes
+            self.worker = asyncio.create_task(self._run(), context=contextvars.Context())
+        logger.info("Upload %s ajouté à la file de la TV %s (profondeur %s)", job.name, self.ip_address, len(self.jobs))
+        return await asyncio.shield(job.future)
+
+    def _prefetch(self, job: UploadJob):
+        if job.prepare_task is None:
+            job.state = "preparing"
+            job.prepare_task = asyncio.create_task(asyncio.to_thread(_prepare_image, job), context=job.context)
+            job.prepare_task.add_done_callback(lambda task: setattr(job, 'state', 'ready'))
+
+    async def _run(self):
+        while self.jobs:
+            job = self.jobs.popleft()
+            self.current = job
+            try:
+                self._prefetch(job)
+                image = await job.prepare_task
+                job.size = image.file_size
+                if self.jobs:
+                    self._prefetch(self.jobs[0])
+                job.state = "uploading"
+                job.started_at = time.time()
+                result = await asyncio.create_task(
+                    self._upload(image, image.file_type, job.matte, job.portrait_matte), context=job.context
+                )
+                self._update_estimates(result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.set_result({"success": False, "error": "Upload annulé"})
+                raise
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            finally:
+                self.current = None
+            if result.get("success"):
+                self.completed += 1
+            else:
+                self.failed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def _update_estimates(self, result: dict):
+        upload = result.get("upload") or {}
+        phases = upload.get("phases", {})
+        if upload.get("throughput"):
+            self.throughput += EWMA_ALPHA * (upload["throughput"] - self.throughput)
+        if "negotiate" in phases and "confirm" in phases:
+            overhead = phases["negotiate"] + phases["confirm"]
+            self.overhead += EWMA_ALPHA * (overhead - self.overhead)
+
+    def _estimate(self, job: UploadJob) -> float:
+        return self.overhead + (job.size or 0) / self.throughput
+
+    def get_status(self) -> dict:
+        eta = sum(self._estimate(job) for job in self.jobs)
+        if self.current:
+            elapsed = time.time() - (self.current.started_at or time.time())
+            eta += max(self._estimate(self.current) - elapsed, 0)
+        return {
+            "depth": len(self.jobs) + (1 if self.current else 0),
+            "current": self.current.as_dict() if self.current else None,
+            "queued": [job.as_dict() for job in self.jobs],
+            "eta_seconds": round(eta, 1),
+            "throughput": round(self.throughput),
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    async def close(self):
+        if self.worker and not self.worker.done():
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+        while self.jobs:
+            job = self.jobs.popleft()
+            if job.prepare_task:
+                job.prepare_task.cancel()
+            if not job.future.done():
+                job.future.set_result({"success": False, "error": "File d'upload fermée"})
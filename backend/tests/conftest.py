@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(BACKEND_DIR / 'src'), str(BACKEND_DIR / 'src' / 'lib'), str(BACKEND_DIR / 'tools')]
+
+from tv_simulator import TVFleet  # noqa: E402
+
+LIBRARY_SIZE = 25
+
+
+@pytest.fixture(scope='module')
+def fleet():
+    """Une TV Frame simulée (127.0.0.2), dans sa propre boucle d'événements."""
+    fleet = TVFleet(1, library_size=LIBRARY_SIZE, latency=0.005).start_in_thread()
+    yield fleet
+    fleet.stop_thread()
@@ -0,0 +1,99 @@
+"""
+Test de fumée de lib.samsungtvws et des services contre une TV simulée (tools/tv_simulator.py) :
+canal art complet (connexion, liste, upload, miniatures, suppression), pagination du
+catalogue et ordre de la file d'upload.
+"""
+import asyncio
+import json
+
+from conftest import LIBRARY_SIZE
+from lib.samsungtvws.async_art import SamsungTVAsyncArt
+from services.art_catalog import MY_PICTURES_CATEGORY, ArtCatalog
+from services.upload_queue import UploadQueue
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 4096
+
+
+async def _art(fleet, tmp_path) -> SamsungTVAsyncArt:
+    art = SamsungTVAsyncArt(fleet.hosts[0], port=8001, token_file=str(tmp_path / 'token.txt'))
+    await art.start_listening()
+    return art
+
+
+def test_art_channel_round_trip(fleet, tmp_path):
+    async def run():
+        art = await _art(fleet, tmp_path)
+        try:
+            assert await art.supported()
+            before = await art.available(MY_PICTURES_CATEGORY)
+            assert len(before) >= LIBRARY_SIZE // 2
+
+            added = []
+            art.set_callback('image_added', lambda event, response: added.append(json.loads(response["data"])["content_id"]))
+            report = await art.upload_image(PNG, file_type='png')
+            assert report["failed_phase"] is None, report
+            content_id = report["content_id"]
+            await asyncio.sleep(0.05)
+            assert added == [content_id]
+            assert content_id in {item["content_id"] for item in await art.available(MY_PICTURES_CATEGORY)}
+
+            thumbnails = [name async for name, data in art.iter_thumbnail_list([before[0]["content_id"], content_id]) if data]
+            assert len(thumbnails) == 2
+
+            outcomes = await art.delete_images([content_id, before[0]["content_id"]])
+            assert outcomes == {content_id: "deleted", before[0]["content_id"]: "deleted"}
+            remaining = {item["content_id"] for item in await art.available(MY_PICTURES_CATEGORY)}
+            assert content_id not in remaining and before[0]["content_id"] not in remaining
+        finally:
+            await art.close()
+    asyncio.run(run())
+
+
+def test_catalog_query_pagination(fleet, tmp_path):
+    async def run():
+        art = await _art(fleet, tmp_path)
+        try:
+            catalog = ArtCatalog(fleet.hosts[0], art.available)
+            await catalog.ensure_loaded()
+        finally:
+            await art.close()
+        expected = sorted(
+            ((item.get('image_date') or '', item['content_id']) for item in catalog.list(MY_PICTURES_CATEGORY)),
+            reverse=True
+        )
+        pages, cursor = [], None
+        while True:
+            page = catalog.query(category=MY_PICTURES_CATEGORY, cursor=cursor, limit=4, fields=['content_id'])
+            pages.append([image['content_id'] for image in page["images"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert [content_id for ids in pages for content_id in ids] == [content_id for _, content_id in expected]
+        assert all(len(ids) == 4 for ids in pages[:-1])
+        assert page["total"] == len(expected)
+    asyncio.run(run())
+
+
+def test_upload_queue_keeps_submission_order(fleet, tmp_path):
+    async def run():
+        art = await _art(fleet, tmp_path)
+        order = []
+
+        async def upload(image, file_type, matte, portrait_matte):
+            report = await art.upload_image(image, file_type=file_type)
+            order.append(report["content_id"])
+            return {"success": report["content_id"] is not None, "content_id": report["content_id"], "upload": report}
+
+        queue = UploadQueue(fleet.hosts[0], upload)
+        try:
+            results = await asyncio.gather(*(
+                queue.submit(PNG + bytes([index]), 'png', name=f"image-{index}") for index in range(3)
+            ))
+        finally:
+            await queue.close()
+            await art.close()
+        assert all(result["success"] for result in results)
+        # les jobs sont servis dans l'ordre de soumission, un transfert à la fois
+        assert [result["content_id"] for result in results] == order
+        assert queue.completed == 3 and queue.failed == 0
+    asyncio.run(run())
@@ -0,0 +1,629 @@
+"""
+Simulateur asyncio de TVs Samsung Frame, pour les tests et les mesures de performance.
+
+Chaque TV simulée expose, sur son adresse, les surfaces utilisées par lib.samsungtvws :
+- REST /api/v2/ (informations de l'appareil, PowerState, FrameTVSupport)
+- websockets /api/v2/channels/samsung.remote.control et /api/v2/channels/com.samsung.art-app :
+  ms.channel.connect (avec émission d'un jeton), ms.channel.ready, requêtes art_app_request
+  et réponses/événements d2d_service_message
+- sockets d2d TCP (TLS si le canal est sécurisé) pour les envois d'images et les miniatures
+
+Le port 8001 est en clair, le port 8002 en TLS (certificat auto-signé généré au démarrage).
+L'application se connectant toujours aux ports 8001/8002, chaque TV a sa propre adresse de
+boucle locale : 127.0.0.2, 127.0.0.3... (natif sous Linux ; sous macOS, créer les alias avec
+"sudo ifconfig lo0 alias 127.0.0.N").
+
+Latence des réponses, bande passante d2d et taille de la bibliothèque sont configurables.
+
+Usage : python backend/tools/tv_simulator.py --count 4 --latency 0.05 --bandwidth-kbps 2048 --library-size 500
+Utilisable aussi en interne : async with TVFleet(4) as fleet: ... fleet.hosts
+ou, à côté de code qui bloque la boucle (SamsungTVRest, SamsungTVWS utilisent requests) :
+fleet.start_in_thread() ... fleet.stop_thread()
+"""
+import argparse
+import asyncio
+import datetime
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import random
+import ssl
+import tempfile
+import threading
+import uuid
+from http import HTTPStatus
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import websockets
+
+logger = logging.getLogger('TVSimulator')
+
+REMOTE_CHANNEL = "samsung.remote.control"
+ART_CHANNEL = "com.samsung.art-app"
+MY_PICTURES_CATEGORY = "MY-C0002"
+FAVORITES_CATEGORY = "MY-C0004"
+D2D_CHUNK_SIZE = 64 * 1024
+D2D_ACCEPT_TIMEOUT = 30
+MATTE_TYPES = ["none", "modernthin", "modern", "modernwide", "flexible", "shadowbox", "panoramic", "triptych", "mix", "squares"]
+MATTE_COLORS = ["black", "neutral", "antique", "warm", "polar", "sand", "seafoam", "sage", "burgandy", "navy", "apricot", "byzantine", "lavender", "redorange", "skyblue", "turquoise"]
+PHOTO_FILTERS = ["None", "Aqua", "ArtDeco", "Ink", "Wash", "Pastel", "Feuve"]
+
+_server_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def server_ssl_context() -> ssl.SSLContext:
+    """Contexte TLS serveur partagé, avec un certificat auto-signé (comme celui des TVs)."""
+    global _server_ssl_context
+    if _server_ssl_context is None:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "SmartViewSDK")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=365))
+            .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_network("127.0.0.0/8"))]), critical=False)
+            .sign(key, hashes.SHA256())
+        )
+        # load_cert_chain n'accepte que des fichiers
+        with tempfile.TemporaryDirectory() as directory:
+            cert_file = os.path.join(directory, 'cert.pem')
+            key_file = os.path.join(directory, 'key.pem')
+            with open(cert_file, 'wb') as f:
+                f.write(certificate.public_bytes(serialization.Encoding.PEM))
+            with open(key_file, 'wb') as f:
+                f.write(key.private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.TraditionalOpenSSL,
+                    serialization.NoEncryption()
+                ))
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert_file, key_file)
+        _server_ssl_context = context
+    return _server_ssl_context
+
+
+class SimulatedFrameTV:
+    """
+    Une TV Frame simulée sur une adresse (ports 8001 et 8002 par défaut).
+
+    latency : délai (s) avant chaque réponse du canal Art, plus un aléa uniforme de ±jitter
+    bandwidth : débit (octets/s) des transferts d2d, 0 pour ne pas limiter
+    library_size : nombre d'images de "My Pictures" au démarrage (un quart en favoris)
+    drop_rate : proportion de requêtes Art laissées sans réponse (pour provoquer des timeouts)
+    """
+
+    def __init__(self, host: str = "127.0.0.2", ports=(8001, 8002), latency: float = 0.02, jitter: float = 0.0,
+                 bandwidth: int = 0, library_size: int = 100, thumbnail_size: int = 16 * 1024,
+                 drop_rate: float = 0.0, power_on: bool = True, art_mode: bool = True, name: Optional[str] = None):
+        self.host = host
+        self.ports = tuple(ports)
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.thumbnail_size = thumbnail_size
+        self.drop_rate = drop_rate
+        self.power_on = power_on
+        self.art_mode = art_mode
+        self.name = name or f"[TV] Simulated Frame {host}"
+        self.device_id = "uuid:" + str(uuid.uuid5(uuid.NAMESPACE_DNS, host))
+        self.token = str(random.randrange(10 ** 7, 10 ** 8))
+
+        self.library: Dict[str, dict] = {}
+        self._next_image = 1
+        for _ in range(library_size):
+            self._add_image(favorite=self._next_image % 4 == 0)
+        self.current = next(iter(self.library), None)
+        self.settings = {"brightness": "5", "color_temperature": "0"}
+        self.slideshow = {"value": "off", "category_id": MY_PICTURES_CATEGORY, "type": "slideshow"}
+        self.auto_rotation = dict(self.slideshow)
+
+        self.stats = {"rest": 0, "connections": 0, "keys": 0, "art_requests": 0, "dropped": 0,
+                      "thumbnails": 0, "uploads": 0, "uploaded_bytes": 0}
+        self._servers = []
+        self._art_clients = set()
+        self._tasks = set()
+
+    # Bibliothèque
+    def _add_image(self, favorite: bool = False, file_type: str = "jpg", matte: str = "none",
+                   portrait_matte: str = "flexible_black", image_date: Optional[str] = None) -> str:
+        content_id = f"MY_F{self._next_image:04d}"
+        self._next_image += 1
+        self.library[content_id] = {
+            "content_id": content_id,
+            "category_id": MY_PICTURES_CATEGORY,
+            "content_type": "mobile",
+            "file_type": file_type,
+            "width": "3840",
+            "height": "2160",
+            "matte_id": matte,
+            "portrait_matte_id": portrait_matte,
+            "image_date": image_date or datetime.datetime.now().strftime("%Y:%m:%d %H:%M:%S"),
+            "favorite": favorite,
+        }
+        return content_id
+
+    def _content_list(self, category: Optional[str]) -> List[dict]:
+        items = []
+        for item in self.library.values():
+            entry = {key: value for key, value in item.items() if key != "favorite"}
+            if category in (None, MY_PICTURES_CATEGORY):
+                items.append(entry)
+            if item["favorite"] and category in (None, FAVORITES_CATEGORY):
+                items.append(dict(entry, category_id=FAVORITES_CATEGORY))
+        return items
+
+    def thumbnail(self, content_id: str) -> bytes:
+        """Fausse miniature JPEG, distincte et stable pour chaque image."""
+        body = hashlib.sha256(content_id.encode()).digest()
+        filler = body * (max(self.thumbnail_size - 4, len(body)) // len(body))
+        return b"\xff\xd8" + filler + b"\xff\xd9"
+
+    # Cycle de vie
+    async def start(self):
+        for port in self.ports:
+            server = await websockets.serve(
+                self._handle_websocket, self.host, port,
+                ssl=server_ssl_context() if port == 8002 else None,
+                process_request=self._process_request,
+                max_size=None,
+            )
+            self._servers.append(server)
+        logger.info("TV simulée %s prête (ports %s)", self.host, ", ".join(map(str, self.ports)))
+        return self
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # REST
+    def device_info(self) -> dict:
+        return {
+            "id": self.device_id,
+            "name": self.name,
+            "type": "Samsung SmartTV",
+            "uri": f"http://{self.host}:8001/api/v2/",
+            "version": "2.0.25",
+            "isSupport": json.dumps({"DMP_DRM_PLAYREADY": "false", "EDEN_available": "true", "remote_available": "true"}),
+            "device": {
+                "FrameTVSupport": "true",
+                "GamePadSupport": "true",
+                "PowerState": "on" if self.power_on else "standby",
+                "TokenAuthSupport": "true",
+                "VoiceSupport": "true",
+                "OS": "Tizen",
+                "modelName": "QE55LS03BAUXXN",
+                "model": "22_PONTUSM_FTV",
+                "name": self.name,
+                "id": self.device_id,
+                "ip": self.host,
+                "networkType": "wired",
+                "wifiMac": "00:00:00:00:00:00",
+                "resolution": "3840x2160",
+                "type": "Samsung SmartTV",
+            },
+        }
+
+    async def _process_request(self, path, request_headers):
+        if request_headers.get("Upgrade", "").lower() == "websocket":
+            return None
+        self.stats["rest"] += 1
+        route = urlsplit(path).path
+        if route.rstrip('/') == "/api/v2":
+            body = json.dumps(self.device_info()).encode()
+            return HTTPStatus.OK, [("Content-Type", "application/json")], body
+        if route.startswith("/api/v2/applications/"):
+            body = json.dumps({"id": route.rsplit('/', 1)[-1], "running": False, "visible": False}).encode()
+            return HTTPStatus.OK, [("Content-Type", "application/json")], body
+        return HTTPStatus.NOT_FOUND, [("Content-Type", "application/json")], b'{"message":"not found"}'
+
+    # Websockets
+    async def _handle_websocket(self, websocket):
+        url = urlsplit(websocket.path)
+        channel = url.path.rsplit('/', 1)[-1]
+        if channel not in (REMOTE_CHANNEL, ART_CHANNEL):
+            await websocket.close(1008, "unknown channel")
+            return
+        self.stats["connections"] += 1
+        token = parse_qs(url.query).get("token", [None])[0]
+        if token != self.token:
+            logger.debug("Jeton émis pour %s : %s", self.host, self.token)
+        client_id = str(uuid.uuid4())
+        await websocket.send(json.dumps({
+            "event": "ms.channel.connect",
+            "data": {
+                "id": client_id,
+                "clients": [{"id": client_id, "isHost": False, "connectTime": 0, "attributes": {}}],
+                "token": self.token,
+            },
+        }))
+        if channel == REMOTE_CHANNEL:
+            await self._remote_loop(websocket)
+            return
+
+        await websocket.send(json.dumps({"event": "ms.channel.ready", "data": {}}))
+        secured = websocket.secure
+        self._art_clients.add(websocket)
+        try:
+            async for message in websocket:
+                self._spawn(self._handle_art_message(websocket, message, secured))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._art_clients.discard(websocket)
+
+    async def _remote_loop(self, websocket):
+        try:
+            async for message in websocket:
+                params = json.loads(message).get("params", {})
+                self.stats["keys"] += 1
+                # Click, ou fin d'un appui long (hold = Press puis Release)
+                if params.get("DataOfCmd") == "KEY_POWER" and params.get("Cmd") in ("Click", "Release"):
+                    self.power_on = not self.power_on
+                    logger.debug("TV %s : %s", self.host, "allumée" if self.power_on else "en veille")
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _handle_art_message(self, websocket, message: str, secured: bool):
+        frame = json.loads(message)
+        params = frame.get("params", {})
+        if frame.get("method") != "ms.channel.emit" or params.get("event") != "art_app_request":
+            return
+        request = json.loads(params["data"])
+        self.stats["art_requests"] += 1
+        if self.drop_rate and random.random() < self.drop_rate:
+            self.stats["dropped"] += 1
+            return
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        handler = getattr(self, "_art_" + request.get("request", ""), None)
+        if handler is None:
+            reply = self._error(request)
+        else:
+            reply = await handler(request, secured)
+        if reply is not None:
+            await self._send_d2d_message(websocket, request, reply)
+
+    async def _send_d2d_message(self, websocket, request: dict, data: dict):
+        data.setdefault("request_id", request.get("request_id", request.get("id")))
+        data.setdefault("id", data["request_id"])
+        data.setdefault("target_client_id", request.get("id"))
+        try:
+            await websocket.send(json.dumps({"event": "d2d_service_message", "data": json.dumps(data)}))
+        except websockets.ConnectionClosed:
+            pass
+
+    def _broadcast(self, data: dict):
+        """Événement non sollicité, envoyé à tous les clients du canal Art."""
+        frame = json.dumps({"event": "d2d_service_message", "data": json.dumps(data)})
+        websockets.broadcast(self._art_clients, frame)
+
+    @staticmethod
+    def _error(request: dict, error_code: str = "-1") -> dict:
+        return {"event": "error", "error_code": error_code, "request_data": json.dumps(request)}
+
+    # Requêtes art_app_request : chaque méthode renvoie les champs de la réponse (ou None)
+    async def _art_get_api_version(self, request, secured):
+        return {"event": request["request"], "version": "4.3.4.0"}
+
+    _art_api_version = _art_get_api_version
+
+    async def _art_get_device_info(self, request, secured):
+        return {"event": "get_device_info", "FrameTVSupport": "true", "model": "22_PONTUSM_FTV", "id": self.device_id}
+
+    async def _art_get_artmode_status(self, request, secured):
+        return {"event": "artmode_status", "value": "on" if self.art_mode else "off"}
+
+    async def _art_set_artmode_status(self, request, secured):
+        self.art_mode = request.get("value") == "on"
+        self._broadcast({"event": "art_mode_changed", "status": "on" if self.art_mode else "off"})
+        return {"event": "set_artmode_status", "value": request.get("value")}
+
+    async def _art_get_content_list(self, request, secured):
+        return {"event": "get_content_list", "content_list": json.dumps(self._content_list(request.get("category")))}
+
+    async def _art_get_current_artwork(self, request, secured):
+        item = self.library.get(self.current, {})
+        return {"event": "get_current_artwork", "content_id": self.current, "category_id": item.get("category_id"),
+                "matte_id": item.get("matte_id"), "portrait_matte_id": item.get("portrait_matte_id")}
+
+    async def _art_select_image(self, request, secured):
+        if request.get("content_id") not in self.library:
+            return self._error(request, "-8")
+        self.current = request["content_id"]
+        self._broadcast({"event": "image_selected", "content_id": self.current, "is_shown": "Yes"})
+        return {"event": "select_image", "content_id": self.current}
+
+    async def _art_change_favorite(self, request, secured):
+        item = self.library.get(request.get("content_id"))
+        if item is None:
+            return self._error(request, "-8")
+        item["favorite"] = request.get("status") == "on"
+        return {"event": "favorite_changed", "content_id": item["content_id"], "status": request.get("status")}
+
+    async def _art_get_artmode_settings(self, request, secured):
+        settings = [{"item": item, "value": value, "min": "0", "max": "10", "valid_values": []}
+                    for item, value in self.settings.items()]
+        return {"event": "get_artmode_settings", "data": json.dumps(settings)}
+
+    async def _art_get_brightness(self, request, secured):
+        return {"event": "get_brightness", "value": self.settings["brightness"]}
+
+    async def _art_set_brightness(self, request, secured):
+        self.settings["brightness"] = str(request.get("value"))
+        return {"event": "set_brightness", "value": self.settings["brightness"]}
+
+    async def _art_get_color_temperature(self, request, secured):
+        return {"event": "get_color_temperature", "value": self.settings["color_temperature"]}
+
+    async def _art_set_color_temperature(self, request, secured):
+        self.settings["color_temperature"] = str(request.get("value"))
+        return {"event": "set_color_temperature", "value": self.settings["color_temperature"]}
+
+    async def _art_get_slideshow_status(self, request, secured):
+        return dict(self.slideshow, event="get_slideshow_status")
+
+    async def _art_set_slideshow_status(self, request, secured):
+        self.slideshow = {key: request.get(key) for key in ("value", "category_id", "type")}
+        return dict(self.slideshow, event="set_slideshow_status")
+
+    async def _art_get_auto_rotation_status(self, request, secured):
+        return dict(self.auto_rotation, event="get_auto_rotation_status")
+
+    async def _art_set_auto_rotation_status(self, request, secured):
+        self.auto_rotation = {key: request.get(key) for key in ("value", "category_id", "type")}
+        return dict(self.auto_rotation, event="set_auto_rotation_status")
+
+    async def _art_get_current_rotation(self, request, secured):
+        return {"event": "get_current_rotation", "current_rotation_status": 1}
+
+    async def _art_get_photo_filter_list(self, request, secured):
+        return {"event": "get_photo_filter_list",
+                "filter_list": json.dumps([{"filter_id": name, "filter_name": name.upper()} for name in PHOTO_FILTERS])}
+
+    async def _art_set_photo_filter(self, request, secured):
+        return {"event": "set_photo_filter", "content_id": request.get("content_id"), "filter_id": request.get("filter_id")}
+
+    async def _art_get_matte_list(self, request, secured):
+        return {"event": "get_matte_list",
+                "matte_type_list": json.dumps([{"matte_type": name} for name in MATTE_TYPES]),
+                "matte_color_list": json.dumps([{"color": color} for color in MATTE_COLORS])}
+
+    async def _art_change_matte(self, request, secured):
+        item = self.library.get(request.get("content_id"))
+        if item is None:
+            return self._error(request, "-8")
+        item["matte_id"] = request.get("matte_id", "none")
+        if request.get("portrait_matte_id"):
+            item["portrait_matte_id"] = request["portrait_matte_id"]
+        return {"event": "change_matte", "content_id": item["content_id"]}
+
+    async def _art_delete_image_list(self, request, secured):
+        deleted = []
+        for entry in request.get("content_id_list", []):
+            if self.library.pop(entry.get("content_id"), None) is not None:
+                deleted.append({"content_id": entry["content_id"]})
+        if self.current not in self.library:
+            self.current = next(iter(self.library), None)
+        return {"event": "image_deleted", "content_id_list": json.dumps(deleted)}
+
+    async def _art_get_thumbnail_list(self, request, secured):
+        content_ids = [entry.get("content_id") for entry in request.get("content_id_list", [])]
+        content_ids = [content_id for content_id in content_ids if content_id in self.library]
+        if not content_ids:
+            return self._error(request, "-8")
+        return await self._d2d_reply("get_thumbnail_list", request, secured, self._serve_thumbnails, content_ids)
+
+    async def _art_get_thumbnail(self, request, secured):
+        if request.get("content_id") not in self.library:
+            return self._error(request, "-8")
+        return await self._d2d_reply("get_thumbnail", request, secured, self._serve_thumbnails, [request["content_id"]])
+
+    async def _art_send_image(self, request, secured):
+        key = uuid.uuid4().hex
+        return await self._d2d_reply("ready_to_use", request, secured, self._receive_image, request, key, key=key)
+
+    # d2d
+    async def _d2d_reply(self, event: str, request: dict, secured: bool, serve, *args, key: str = "") -> dict:
+        """Ouvre un socket d2d à usage unique et renvoie la réponse portant son conn_info."""
+        accepted = asyncio.get_running_loop().create_future()
+
+        async def on_connection(reader, writer):
+            if accepted.done():
+                writer.close()
+                return
+            accepted.set_result(None)
+            try:
+                await serve(reader, writer, *args)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                logger.debug("Transfert d2d interrompu sur %s : %s", self.host, e)
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(on_connection, self.host, 0, ssl=server_ssl_context() if secured else None)
+        port = server.sockets[0].getsockname()[1]
+
+        async def close_when_done():
+            try:
+                await asyncio.wait_for(asyncio.shield(accepted), D2D_ACCEPT_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            server.close()
+
+        self._spawn(close_when_done())
+        conn_info = {"d2d_mode": "socket", "connection_id": request.get("conn_info", {}).get("connection_id"),
+                     "request_id": request.get("request_id"), "id": request.get("id"),
+                     "ip": self.host, "port": str(port), "key": key, "secured": secured}
+        return {"event": event, "conn_info": json.dumps(conn_info)}
+
+    async def _write_throttled(self, writer, data: bytes):
+        for offset in range(0, len(data), D2D_CHUNK_SIZE):
+            chunk = data[offset:offset + D2D_CHUNK_SIZE]
+            writer.write(chunk)
+            await writer.drain()
+            if self.bandwidth:
+                await asyncio.sleep(len(chunk) / self.bandwidth)
+
+    async def _serve_thumbnails(self, reader, writer, content_ids: List[str]):
+        for num, content_id in enumerate(content_ids):
+            data = self.thumbnail(content_id)
+            header = json.dumps({"num": num, "total": len(content_ids), "fileLength": len(data),
+                                 "fileID": content_id, "fileType": "jpg"}).encode()
+            writer.write(len(header).to_bytes(4, "big") + header)
+            await self._write_throttled(writer, data)
+            self.stats["thumbnails"] += 1
+        await writer.drain()
+
+    async def _receive_image(self, reader, writer, request: dict, key: str):
+        header_length = int.from_bytes(await reader.readexactly(4), "big")
+        header = json.loads(await reader.readexactly(header_length))
+        if header.get("secKey") != key:
+            logger.warning("Clé d2d invalide pour %s", self.host)
+            return
+        remaining = int(header["fileLength"])
+        while remaining:
+            chunk = await reader.read(min(remaining, D2D_CHUNK_SIZE))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(chunk)
+            if self.bandwidth:
+                await asyncio.sleep(len(chunk) / self.bandwidth)
+        self.stats["uploads"] += 1
+        self.stats["uploaded_bytes"] += int(header["fileLength"])
+        content_id = self._add_image(
+            file_type=header.get("fileType", request.get("file_type", "jpg")),
+            matte=request.get("matte_id", "none"),
+            portrait_matte=request.get("portrait_matte_id", "flexible_black"),
+            image_date=request.get("image_date"),
+        )
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        self._broadcast({"event": "image_added", "content_id": content_id, "category_id": MY_PICTURES_CATEGORY,
+                         "request_id": request.get("request_id"), "id": request.get("id")})
+
+
+class TVFleet:
+    """
+    Plusieurs TVs simulées sur des adresses consécutives (127.0.0.2, 127.0.0.3...).
+    Les options sont transmises à chaque SimulatedFrameTV.
+    """
+
+    def __init__(self, count: int = 1, first_host: str = "127.0.0.2", **options):
+        first = ipaddress.ip_address(first_host)
+        self.tvs = [SimulatedFrameTV(host=str(first + index), **options) for index in range(count)]
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def hosts(self) -> List[str]:
+        return [tv.host for tv in self.tvs]
+
+    def get(self, host: str) -> Optional[SimulatedFrameTV]:
+        return next((tv for tv in self.tvs if tv.host == host), None)
+
+    async def start(self):
+        await asyncio.gather(*(tv.start() for tv in self.tvs))
+        return self
+
+    async def stop(self):
+        await asyncio.gather(*(tv.stop() for tv in self.tvs))
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start_in_thread(self):
+        """
+        Démarre la flotte dans sa propre boucle d'événements, sur un thread dédié :
+        les appels REST synchrones de la bibliothèque ne bloquent alors pas les TVs simulées.
+        """
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                return
+            finally:
+                started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="TVFleet", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop_thread(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def get_stats(self) -> dict:
+        return {tv.host: dict(tv.stats) for tv in self.tvs}
+
+
+async def _serve(args):
+    fleet = TVFleet(
+        args.count, first_host=args.first_host, latency=args.latency, jitter=args.jitter,
+        bandwidth=args.bandwidth_kbps * 1024, library_size=args.library_size,
+        thumbnail_size=args.thumbnail_kb * 1024, drop_rate=args.drop_rate,
+    )
+    async with fleet:
+        logger.info("%d TV(s) simulée(s) : %s", len(fleet.tvs), ", ".join(fleet.hosts))
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1, help="nombre de TVs")
+    parser.add_argument('--first-host', default="127.0.0.2", help="adresse de la première TV")
+    parser.add_argument('--latency', type=float, default=0.02, help="délai des réponses du canal Art (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="aléa ajouté à la latence (s)")
+    parser.add_argument('--bandwidth-kbps', type=int, default=0, help="débit d2d en Ko/s (0 = illimité)")
+    parser.add_argument('--library-size', type=int, default=100, help="images dans My Pictures")
+    parser.add_argument('--thumbnail-kb', type=int, default=16, help="taille des miniatures (Ko)")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="proportion de requêtes sans réponse")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
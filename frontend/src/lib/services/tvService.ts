@@ -22,6 +22,24 @@ export type TVStatus = {
   [key: string]: any;
 };
 
+export type SlideshowStatus = {
+  category: number;
+  duration: number;
+  running: boolean;
+  shuffle: boolean;
+};
+
+// Champs modifiés, reçus par le flux d'événements de la TV
+export type TVStateEvent = {
+  tv: string;
+  ts?: number;
+  tv_on?: boolean;
+  art_mode?: boolean;
+  current_artwork?: string | null;
+  slideshow?: SlideshowStatus;
+  connected?: boolean;
+};
+
 export type APIError = {
   error: string;
   error_type: string;
@@ -58,6 +76,15 @@ export class TVService {
     }
   }
 
+  // Flux SSE : l'état connu (snapshot) puis chaque changement, sans interroger la TV
+  subscribeToEvents(ip: string, onState: (state: TVStateEvent) => void): () => void {
+    const source = new EventSource(`${BASE_URL}/v1/tv/${ip}/events`);
+    const handler = (event: MessageEvent) => onState(JSON.parse(event.data));
+    source.addEventListener('snapshot', handler);
+    source.addEventListener('state', handler);
+    return () => source.close();
+  }
+
   async powerControl(ip: string, action: 'on' | 'off' | 'toggle'): Promise<any> {
     try {
       const res = await axios.put(`${BASE_URL}/v1/tv/${ip}/power`, null, {